@@ -0,0 +1,311 @@
+"""
+gRPC-Web-Scan Benchmark
+Generating synthetic grpc-web bundles and measuring scanner throughput
+"""
+
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from datetime import datetime
+
+SCANNER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gRPC-Web-scan.py')
+
+FIELD_TYPES = [
+    'Proto3StringField', 'Proto3IntField', 'Proto3BoolField', 'Proto3Int64Field',
+    'Proto3FloatField', 'Proto3DoubleField', 'Proto3BytesField', 'Proto3EnumField',
+]
+
+# 填充用的非gRPC代码，模拟bundle中的第三方依赖
+FILLER_SNIPPET = '''function vendor_{n}(items, callback) {{
+  var result = [];
+  for (var i = 0; i < items.length; i++) {{
+    if (items[i] && typeof items[i].value === "number") {{
+      result.push(callback(items[i].value * {n}));
+    }}
+  }}
+  return result;
+}}
+'''
+
+
+def load_scanner():
+    """按文件路径加载扫描器模块（文件名含连字符，无法直接import）"""
+    spec = importlib.util.spec_from_file_location('grpc_web_scan', SCANNER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['grpc_web_scan'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def generate_bundle(package, message_count, field_count, minify=0, filler_size=0, rng=None):
+    """生成protoc-gen-grpc-web风格的bundle
+
+    minify: 0为protoc原始输出，1去掉注释与空白，2在1的基础上缩短局部标识符。
+    filler_size: 追加的非gRPC代码字节数。
+    """
+    rng = rng or random.Random(0)
+    lines = []
+    methods = []
+    for index in range(message_count):
+        name = f'Op{index // 2}' + ('Request' if index % 2 == 0 else 'Response')
+        if index % 2 == 0:
+            methods.append(f'Op{index // 2}')
+        lines.append(f'proto.{package}.{name} = function(opt_data) {{\n'
+                     f'  jspb.Message.initialize(this, opt_data, 0, -1, null, null);\n}};')
+        for number in range(1, field_count + 1):
+            field_type = rng.choice(FIELD_TYPES)
+            lines.append(f'/**\n * @return {{string}}\n */\n'
+                         f'proto.{package}.{name}.prototype.getField{number} = function() {{\n'
+                         f'  return /** @type {{string}} */ (jspb.Message.getFieldWithDefault(this, {number}, ""));\n}};')
+            lines.append(f'/**\n * @param {{string}} value\n */\n'
+                         f'proto.{package}.{name}.prototype.setField{number} = function(value) {{\n'
+                         f'  return jspb.Message.set{field_type}(this, {number}, value);\n}};')
+
+    lines.append(f'proto.{package}.BenchServiceClient = function(hostname, credentials, options) {{\n'
+                 f'  this.client_ = new grpc.web.GrpcWebClientBase(options);\n'
+                 f'  this.hostname_ = hostname;\n}};')
+    for method in methods:
+        lines.append(f'const methodDescriptor_BenchService_{method} = new grpc.web.MethodDescriptor(\n'
+                     f'  "/{package}.BenchService/{method}",\n  grpc.web.MethodType.UNARY,\n'
+                     f'  proto.{package}.{method}Request,\n  proto.{package}.{method}Response);')
+        lines.append(f'proto.{package}.BenchServiceClient.prototype.{method[0].lower() + method[1:]} = '
+                     f'function(request, metadata, callback) {{\n'
+                     f'  return this.client_.rpcCall(this.hostname_ + "/{package}.BenchService/{method}",\n'
+                     f'    request, metadata || {{}}, methodDescriptor_BenchService_{method}, callback);\n}};')
+    lines.append('metadata.set("authorization", token);\nstatus.UNAVAILABLE;')
+
+    size = sum(len(line) for line in lines)
+    n = 0
+    while size < filler_size:
+        snippet = FILLER_SNIPPET.format(n=n)
+        lines.append(snippet)
+        size += len(snippet)
+        n += 1
+
+    content = '\n'.join(lines)
+    if minify >= 1:
+        content = re.sub(r'/\*\*.*?\*/\s*', '', content, flags=re.S)
+        content = re.sub(r'\s*\n\s*', '', content)
+        content = re.sub(r'\s*([=(){},;+<*|&])\s*', r'\1', content)
+    if minify >= 2:
+        content = content.replace('opt_data', 't').replace('value', 'e').replace('jspb.Message', 'n.Message')
+        content = re.sub(r'\bvendor_(\d+)', r'v\1', content)
+    return content
+
+
+def generate_corpus(corpus_dir, files, message_count, field_count, minify, filler_size, seed=0):
+    """生成基准语料目录，返回 (文件数, 总字节数)"""
+    rng = random.Random(seed)
+    os.makedirs(corpus_dir, exist_ok=True)
+    total_bytes = 0
+    for index in range(files):
+        content = generate_bundle(f'bench{index}', message_count, field_count, minify, filler_size, rng)
+        file_path = os.path.join(corpus_dir, f'bundle{index}_pb.js')
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        total_bytes += len(content.encode('utf-8'))
+    return files, total_bytes
+
+
+def peak_rss_mb():
+    """本进程与已结束子进程的峰值常驻内存（MB）"""
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024  # macOS以字节为单位，Linux为KB
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / (1024 * 1024)
+    children_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale / (1024 * 1024)
+    return round(self_rss, 1), round(children_rss, 1)
+
+
+def corpus_files(corpus_dir):
+    return sorted(os.path.join(corpus_dir, name) for name in os.listdir(corpus_dir) if name.endswith('.js'))
+
+
+def run_single_file_case(scanner, corpus_dir, options):
+    """逐个调用process_single_file，并单独统计各阶段耗时"""
+    stages = {'read': 0.0, 'beautify': 0.0, 'extract': 0.0, 'proto': 0.0}
+    files = corpus_files(corpus_dir)
+
+    start = time.perf_counter()
+    for file_path in files:
+        scanner.process_single_file(file_path, print_results=False, options=options)
+    elapsed = time.perf_counter() - start
+
+    # 按阶段重放同样的流程
+    for file_path in files:
+        t0 = time.perf_counter()
+        content = scanner.read_file(file_path)
+        t1 = time.perf_counter()
+        js_content = scanner.beautify_js_content(content) if options.beautify else content
+        t2 = time.perf_counter()
+        values = scanner.run_extractors(options.extractor_names(), js_content, not options.beautify)
+        t3 = time.perf_counter()
+        scanner.build_js_result(file_path, values)
+        t4 = time.perf_counter()
+        stages['read'] += t1 - t0
+        stages['beautify'] += t2 - t1
+        stages['extract'] += t3 - t2
+        stages['proto'] += t4 - t3
+    return elapsed, {stage: round(seconds, 4) for stage, seconds in stages.items()}
+
+
+def run_directory_case(scanner, corpus_dir, options, executor, workers):
+    start = time.perf_counter()
+    scanner.process_directory(corpus_dir, print_results=False, max_workers=workers,
+                              executor=executor, options=options)
+    return time.perf_counter() - start, None
+
+
+def run_case(case):
+    """在独立进程中执行单个基准用例，峰值内存互不影响"""
+    scanner = load_scanner()
+    options = scanner.ScanOptions(**case['options'])
+    with contextlib.redirect_stdout(io.StringIO()):
+        if case['name'] == 'single_file':
+            elapsed, stages = run_single_file_case(scanner, case['corpus_dir'], options)
+        else:
+            elapsed, stages = run_directory_case(scanner, case['corpus_dir'], options,
+                                                 case['executor'], case['workers'])
+    self_rss, children_rss = peak_rss_mb()
+    result = {
+        'name': case['name'],
+        'executor': case.get('executor'),
+        'workers': case.get('workers'),
+        'files': case['files'],
+        'bytes': case['bytes'],
+        'seconds': round(elapsed, 4),
+        'files_per_s': round(case['files'] / elapsed, 2),
+        'mb_per_s': round(case['bytes'] / elapsed / (1024 * 1024), 3),
+        'peak_rss_mb': self_rss,
+        'peak_children_rss_mb': children_rss,
+    }
+    if stages is not None:
+        result['stages'] = stages
+    return result
+
+
+def spawn_case(case):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--run-case', json.dumps(case)],
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True, text=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def case_key(result):
+    return result['name'], result.get('executor'), result.get('workers')
+
+
+def git_revision():
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(SCANNER_PATH),
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        return output.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_results(results, baseline=None):
+    from texttable import Texttable
+    table = Texttable(max_width=0)
+    columns = ['Case', 'Executor', 'Workers', 'Seconds', 'Files/s', 'MB/s', 'Peak RSS (MB)']
+    if baseline:
+        columns.append('vs baseline')
+    table.header(columns)
+    baseline_index = {case_key(result): result for result in (baseline or {}).get('cases', [])}
+    for result in results:
+        row = [result['name'], result['executor'] or '-', result['workers'] or '-', result['seconds'],
+               result['files_per_s'], result['mb_per_s'],
+               max(result['peak_rss_mb'], result['peak_children_rss_mb'])]
+        if baseline:
+            old = baseline_index.get(case_key(result))
+            row.append(f"{(result['mb_per_s'] / old['mb_per_s'] - 1) * 100:+.1f}%" if old else 'n/a')
+        table.add_row(row)
+    print(table.draw())
+    for result in results:
+        if 'stages' in result:
+            stages = ', '.join(f'{stage} {seconds}s' for stage, seconds in result['stages'].items())
+            print(f"Stages ({result['name']}): {stages}")
+
+
+def parse_int_list(value):
+    return [int(item) for item in value.split(',') if item]
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Benchmark gRPC-Web-Scan on synthetic grpc-web bundles')
+    parser.add_argument('--files', type=int, default=20, help='Number of generated bundles (default: 20)')
+    parser.add_argument('--messages', type=int, default=100, help='Messages per bundle (default: 100)')
+    parser.add_argument('--fields', type=int, default=8, help='Fields per message (default: 8)')
+    parser.add_argument('--minify', type=int, choices=[0, 1, 2], default=1,
+                        help='0: protoc output, 1: whitespace stripped, 2: also short identifiers (default: 1)')
+    parser.add_argument('--filler', type=int, default=256,
+                        help='Non-gRPC vendor code per bundle in KB (default: 256)')
+    parser.add_argument('--workers', type=parse_int_list, default=[1, 4, 8],
+                        help='Comma-separated worker counts for directory runs (default: 1,4,8)')
+    parser.add_argument('--executors', default='thread,process',
+                        help='Comma-separated executors for directory runs (default: thread,process)')
+    parser.add_argument('--no-beautify', action='store_true', default=False,
+                        help='Benchmark the minified-code path without jsbeautifier')
+    parser.add_argument('--corpus-dir', help='Keep the generated corpus in this directory')
+    parser.add_argument('--output', help='Save results as JSON (default: bench_YYYYMMDD_HHMMSS.json)')
+    parser.add_argument('--compare', help='Previous results JSON to compare MB/s against')
+    parser.add_argument('--run-case', help='Internal: run one case and print its JSON result')
+    args = parser.parse_args()
+
+    if args.run_case is not None:
+        print(json.dumps(run_case(json.loads(args.run_case))))
+        sys.exit(0)
+
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix='grpc_bench_')
+    try:
+        files, total_bytes = generate_corpus(corpus_dir, args.files, args.messages, args.fields,
+                                             args.minify, args.filler * 1024)
+        print(f'Generated {files} bundles, {total_bytes / (1024 * 1024):.1f} MB in {corpus_dir}')
+
+        base_case = {'corpus_dir': corpus_dir, 'files': files, 'bytes': total_bytes,
+                     'options': {'beautify': not args.no_beautify}}
+        cases = [dict(base_case, name='single_file')]
+        for executor in args.executors.split(','):
+            for workers in args.workers:
+                cases.append(dict(base_case, name='directory', executor=executor, workers=workers))
+
+        results = []
+        for case in cases:
+            print(f"Running {case['name']} {case.get('executor') or ''} {case.get('workers') or ''}".rstrip())
+            results.append(spawn_case(case))
+    finally:
+        if args.corpus_dir is None:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'corpus': {'files': args.files, 'messages': args.messages, 'fields': args.fields,
+                   'minify': args.minify, 'filler_kb': args.filler, 'bytes': total_bytes,
+                   'beautify': not args.no_beautify},
+        'cases': results,
+    }
+    output_path = args.output or f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f'\nResults saved to {output_path}')
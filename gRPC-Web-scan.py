@@ -5,22 +5,50 @@ Extracting Methods, Services and Messages (Routes) in JS files (grpc-web)
 
 import re
 from argparse import ArgumentParser
+from collections import deque
 import sys
 import jsbeautifier
 from texttable import Texttable
 import glob
 import os
 from datetime import datetime
-from dataclasses import dataclass, field
-from typing import List, Dict
+from dataclasses import dataclass, field, asdict
+from typing import Callable, List, Dict
 import json
+import functools
+import base64
+import bisect
+import contextlib
+import hashlib
+import heapq
+import html
+import importlib.util
+import io
+import mmap
+import posixpath
+import signal
+import sqlite3
+import struct
+import tarfile
+import threading
+import time
+import urllib.parse
+import zipfile
 from colorama import init, Fore, Style  # 添加颜色支持
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
 from tqdm import tqdm
 
+try:
+    import yaml  # 可选依赖，仅--patterns读取YAML规则文件时需要
+except ImportError:
+    yaml = None
+
 # 初始化colorama
 init()
 
+# 扫描器版本，参与缓存键计算，提取逻辑变化时需要更新
+SCANNER_VERSION = '1.3.1'
+
 # 在文件开头添加 HTML_TEMPLATE 的定义
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -251,6 +279,10 @@ HTML_TEMPLATE = """
                     <div class="stat-value">{total_messages}</div>
                     <div class="stat-label">消息类型数</div>
                 </div>
+                <div class="stat-item">
+                    <div class="stat-value">{total_skipped}</div>
+                    <div class="stat-label">跳过文件数（无gRPC特征）</div>
+                </div>
             </div>
         </div>
 
@@ -269,6 +301,116 @@ FILE_SECTION_TEMPLATE = """
 </div>
 """
 
+# 分页报告的索引页主体，文件区块与搜索索引以JSONP脚本按需加载（兼容file://打开）
+PAGED_REPORT_TEMPLATE = """
+<style>
+    .paged-toolbar {{ display: flex; gap: 12px; align-items: center; margin-bottom: var(--spacing); }}
+    .paged-toolbar input {{ flex: 1; }}
+    .search-results {{ list-style: none; padding: 0; margin-bottom: var(--spacing); }}
+    .search-results li {{ cursor: pointer; padding: 4px 0; }}
+    .search-kind {{ display: inline-block; min-width: 80px; color: var(--text-secondary); }}
+    .file-header {{ display: flex; justify-content: space-between; align-items: center; cursor: pointer; }}
+    .file-counts {{ color: var(--text-secondary); font-size: 0.9rem; }}
+</style>
+<div class="paged-toolbar">
+    <input id="search-box" class="form-control" placeholder="搜索服务、端点或消息名称">
+    <button id="prev-page" class="btn btn-outline-primary">上一页</button>
+    <span id="page-info"></span>
+    <button id="next-page" class="btn btn-outline-primary">下一页</button>
+</div>
+<ul id="search-results" class="search-results"></ul>
+<div id="file-list"></div>
+<script>
+    var shardDir = {shard_dir};
+    var pageSize = {page_size};
+    var files = [], search = [], shards = {{}}, pending = {{}}, page = 0;
+
+    function __grpcScanFiles(entries) {{ files = entries; renderPage(); }}
+    function __grpcScanSearch(entries) {{ search = entries; }}
+    function __grpcScanShard(id, sections) {{
+        shards[id] = sections;
+        (pending[id] || []).forEach(function (callback) {{ callback(sections); }});
+        delete pending[id];
+    }}
+
+    function loadShard(id, callback) {{
+        if (shards[id]) {{ callback(shards[id]); return; }}
+        if (pending[id]) {{ pending[id].push(callback); return; }}
+        pending[id] = [callback];
+        var script = document.createElement('script');
+        script.src = shardDir + '/shard_' + String(id).padStart(5, '0') + '.js';
+        document.body.appendChild(script);
+    }}
+
+    function toggleFile(index, body) {{
+        if (body.childElementCount) {{ body.innerHTML = ''; return; }}
+        var shard = files[index][1];
+        if (shard === null) {{ body.innerHTML = '<p class="text-secondary">无详细内容</p>'; return; }}
+        loadShard(shard, function (sections) {{ body.innerHTML = sections[index]; }});
+    }}
+
+    function renderPage() {{
+        var pages = Math.max(1, Math.ceil(files.length / pageSize));
+        page = Math.min(Math.max(page, 0), pages - 1);
+        document.getElementById('page-info').textContent = (page + 1) + ' / ' + pages;
+        var list = document.getElementById('file-list');
+        list.innerHTML = '';
+        files.slice(page * pageSize, (page + 1) * pageSize).forEach(function (entry, offset) {{
+            var index = page * pageSize + offset;
+            var item = document.createElement('div');
+            item.className = 'file-section';
+            item.id = 'file-' + index;
+            var header = document.createElement('div');
+            header.className = 'file-header';
+            var title = document.createElement('h3');
+            title.textContent = entry[0];
+            var counts = document.createElement('span');
+            counts.className = 'file-counts';
+            counts.textContent = entry[5] ? '错误' :
+                '端点 ' + entry[2] + ' · 服务 ' + entry[3] + ' · 消息 ' + entry[4];
+            header.appendChild(title);
+            header.appendChild(counts);
+            var body = document.createElement('div');
+            header.onclick = function () {{ toggleFile(index, body); }};
+            item.appendChild(header);
+            item.appendChild(body);
+            list.appendChild(item);
+        }});
+    }}
+
+    function showFile(index) {{
+        page = Math.floor(index / pageSize);
+        renderPage();
+        var item = document.getElementById('file-' + index);
+        toggleFile(index, item.lastChild);
+        item.scrollIntoView();
+    }}
+
+    document.getElementById('prev-page').onclick = function () {{ page--; renderPage(); }};
+    document.getElementById('next-page').onclick = function () {{ page++; renderPage(); }};
+    document.getElementById('search-box').oninput = function () {{
+        var query = this.value.toLowerCase();
+        var results = document.getElementById('search-results');
+        results.innerHTML = '';
+        if (!query) return;
+        for (var i = 0, shown = 0; i < search.length && shown < 100; i++) {{
+            if (search[i][1].toLowerCase().indexOf(query) === -1) continue;
+            var item = document.createElement('li');
+            var kind = document.createElement('span');
+            kind.className = 'search-kind';
+            kind.textContent = search[i][0];
+            item.appendChild(kind);
+            item.appendChild(document.createTextNode(search[i][1] + ' — ' + files[search[i][2]][0]));
+            item.onclick = showFile.bind(null, search[i][2]);
+            results.appendChild(item);
+            shown++;
+        }}
+    }};
+</script>
+<script src="{shard_src}/files.js"></script>
+<script src="{shard_src}/search.js"></script>
+"""
+
 @dataclass
 class FileResult:
     file_path: str
@@ -278,32 +420,258 @@ class FileResult:
     metadata: List[str] = field(default_factory=list)  # 新增：元数据
     error_handlers: List[str] = field(default_factory=list)  # 新增：错误处理
     interceptors: List[str] = field(default_factory=list)  # 新增：拦截器
+    wire_types: Dict[str, Dict[str, List[str]]] = field(default_factory=dict)  # 消息名 -> {字段编号: [proto类型, 字段名, oneof名]}
     error: str = None
     proto_content: str = None
+    cache_hit: bool = None  # 未启用缓存时为None
+    skipped: bool = False  # 预过滤未发现gRPC特征，未做提取
+    timings: Dict[str, Dict[str, List[float]]] = None  # --profile时记录的各阶段/各规则耗时
+    locations: Dict[str, str] = None  # --source-maps时各发现项在原始源码中的位置（源文件:行号）
+    modules: Dict[str, List[str]] = None  # --split-modules时含gRPC特征的模块及其中的消息
+    rpc_types: Dict[str, List[str]] = None  # .proto输入中各端点的 [请求类型, 响应类型]（全限定名，流式带stream前缀）
 
 @dataclass
 class ScanResult:
     timestamp: str = field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
     files: List[FileResult] = field(default_factory=list)
+    keep_files: bool = True  # 结果已流式写出时只保留计数器
+    counters: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(
+        ['files', 'endpoints', 'messages', 'services', 'skipped', 'cache_hits', 'cache_misses'], 0))
+    schedule: 'ScheduleStats' = None  # 并发扫描的调度统计
     
     def add_file_result(self, result: FileResult):
-        self.files.append(result)
+        if self.keep_files:
+            self.files.append(result)
+        counters = self.counters
+        counters['files'] += 1
+        if result.error is None:
+            counters['endpoints'] += len(result.endpoints)
+            counters['messages'] += len(result.messages)
+            counters['services'] += len(result.services)
+        if result.skipped:
+            counters['skipped'] += 1
+        if result.cache_hit is True:
+            counters['cache_hits'] += 1
+        elif result.cache_hit is False:
+            counters['cache_misses'] += 1
+        
+    @property
+    def total_skipped(self):
+        return self.counters['skipped']
+        
+    @property
+    def cache_hits(self):
+        return self.counters['cache_hits']
+        
+    @property
+    def cache_misses(self):
+        return self.counters['cache_misses']
         
     @property
     def total_files(self):
-        return len(self.files)
+        return self.counters['files']
         
     @property
     def total_endpoints(self):
-        return sum(len(f.endpoints) for f in self.files if f.error is None)
+        return self.counters['endpoints']
         
     @property
     def total_messages(self):
-        return sum(len(f.messages) for f in self.files if f.error is None)
+        return self.counters['messages']
         
     @property
     def total_services(self):
-        return sum(len(f.services) for f in self.files if f.error is None)
+        return self.counters['services']
+
+class ResultWriter:
+    """逐个写出FileResult，ndjson每行一个对象，json为单个数组"""
+    
+    def __init__(self, output_path, output_format='ndjson'):
+        self.output_format = output_format
+        self.count = 0
+        self.file = open(output_path, 'w', encoding='utf-8')
+        if output_format == 'json':
+            self.file.write('[\n')
+    
+    def write(self, result: FileResult):
+        line = json.dumps(asdict(result), ensure_ascii=False)
+        if self.output_format == 'json' and self.count:
+            line = ',\n' + line
+        elif self.output_format == 'ndjson':
+            line += '\n'
+        self.file.write(line)
+        self.file.flush()  # 便于下游工具实时tail
+        self.count += 1
+    
+    def close(self):
+        if self.output_format == 'json':
+            self.file.write('\n]\n' if self.count else ']\n')
+        self.file.close()
+
+class GlobalIndex:
+    """跨文件的全局索引：消息和服务按全限定名去重合并，并记录定义来源文件"""
+    
+    def __init__(self):
+        self.messages = {}  # 全限定消息名 -> {字段编号: 字段}
+        self.wire_types = {}  # 全限定消息名 -> {字段编号: [proto类型, 字段名, oneof名]}
+        self.services = {}  # 全限定服务名 -> {方法名}
+        self.rpc_types = {}  # 端点 -> [请求类型, 响应类型]，只有.proto输入提供
+        self.sources = {}  # 全限定名 -> {来源文件}
+        self.occurrences = 0  # 合并前的消息定义总数
+    
+    def write(self, result: FileResult):
+        if result.error is not None or result.skipped:
+            return
+        for endpoint in result.endpoints:
+            parts = endpoint.strip('/').split('/')
+            if len(parts) != 2 or not all(parts):
+                continue
+            service, method = parts
+            self.services.setdefault(service, set()).add(method)
+            self.sources.setdefault(service, set()).add(result.file_path)
+        for endpoint, types in (result.rpc_types or {}).items():
+            self.rpc_types.setdefault(endpoint, list(types))
+        for msg_name, msg_fields in result.messages.items():
+            self.occurrences += 1
+            merged = self.messages.setdefault(msg_name, {})
+            for msg_field in msg_fields:
+                # 同一编号的字段保留首次出现的定义；无编号时（TS接口字段的编号为'0'）按字段名合并
+                number = str(msg_field[2] or '')
+                key = number if number not in ('', '0') else ('', msg_field[0])
+                merged.setdefault(key, list(msg_field))
+            self.sources.setdefault(msg_name, set()).add(result.file_path)
+        for msg_name, wire_fields in result.wire_types.items():
+            # 只有线上类型的消息（如没有字段的Empty）也要输出定义
+            self.messages.setdefault(msg_name, {})
+            merged = self.wire_types.setdefault(msg_name, {})
+            for number, wire_field in wire_fields.items():
+                merged.setdefault(number, list(wire_field))
+            self.sources.setdefault(msg_name, set()).add(result.file_path)
+    
+    @staticmethod
+    def field_order(msg_field):
+        number = str(msg_field[2] or '')
+        return (0, int(number), '') if number.isdigit() else (1, 0, msg_field[0])
+    
+    def message_fields(self, msg_name):
+        return sorted(self.messages[msg_name].values(), key=self.field_order)
+    
+    def packages(self):
+        """按包名分组，返回 {包名: (消息名列表, 服务名列表)}"""
+        # 优先匹配端点中出现过的最长包名，嵌套消息才能归到正确的包
+        known = sorted({name.rpartition('.')[0] for name in self.services}, key=len, reverse=True)
+        packages = {}
+        for msg_name in sorted(self.messages):
+            package = next((p for p in known if p and msg_name.startswith(p + '.')),
+                           msg_name.rpartition('.')[0])
+            packages.setdefault(package, ([], []))[0].append(msg_name)
+        for service in sorted(self.services):
+            packages.setdefault(service.rpartition('.')[0], ([], []))[1].append(service)
+        return packages
+    
+    def write_protos(self, proto_dir):
+        """每个包输出一个去重后的.proto文件，并写出记录来源文件的index.json"""
+        os.makedirs(proto_dir, exist_ok=True)
+        written = []
+        for package, (msg_names, services) in sorted(self.packages().items()):
+            messages = {msg_name: self.message_fields(msg_name) for msg_name in msg_names}
+            sources = sorted(set().union(*(self.sources[name] for name in msg_names + services)))
+            wire_types = {msg_name: self.wire_types[msg_name] for msg_name in msg_names
+                          if msg_name in self.wire_types}
+            # 输出索引中的每个服务及其方法，不再按单个服务的启发式推断
+            service_methods = {service.rpartition('.')[2]: {method: self.rpc_types.get(f'/{service}/{method}')
+                                                           for method in sorted(self.services[service])}
+                               for service in services}
+            proto_content = generate_proto_content(
+                messages, list(service_methods), package or None, wire_types, service_methods)
+            proto_path = os.path.join(proto_dir, f"{package or 'default'}.proto")
+            with open(proto_path, 'w', encoding='utf-8') as f:
+                f.write(f'// Merged from {len(sources)} file(s), see index.json for sources\n')
+                f.write(proto_content)
+            written.append(proto_path)
+        
+        index = {
+            'messages': {name: {'fields': self.message_fields(name), 'wire_types': self.wire_types.get(name, {}),
+                                'files': sorted(self.sources[name])}
+                         for name in sorted(self.messages)},
+            'services': {name: {'methods': sorted(methods), 'files': sorted(self.sources[name])}
+                         for name, methods in sorted(self.services.items())},
+        }
+        with open(os.path.join(proto_dir, 'index.json'), 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+        return written
+
+class ProfileSummary:
+    """汇总--profile计时：各阶段、各正则的总耗时以及最慢的N个文件"""
+    
+    def __init__(self, top=10):
+        self.top = top
+        self.stages = {}
+        self.patterns = {}
+        self.slowest = []  # 最小堆，保留耗时最长的top个文件
+        self.files = 0
+    
+    def write(self, result: FileResult):
+        if not result.timings:
+            return
+        self.files += 1
+        stages = result.timings['stages']
+        for name, (wall, cpu) in stages.items():
+            totals = self.stages.setdefault(name, [0.0, 0.0])
+            totals[0] += wall
+            totals[1] += cpu
+        for key, (wall, count) in result.timings['patterns'].items():
+            totals = self.patterns.setdefault(key, [0.0, 0])
+            totals[0] += wall
+            totals[1] += count
+        
+        entry = (stages.get('total', [0.0])[0], result.file_path, stages)
+        if len(self.slowest) < self.top:
+            heapq.heappush(self.slowest, entry)
+        elif entry[0] > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+    
+    def slowest_files(self):
+        return [
+            {'file_path': file_path, 'wall': round(wall, 6), 'stages': stages}
+            for wall, file_path, stages in sorted(self.slowest, reverse=True)
+        ]
+    
+    def print_tables(self):
+        total = self.stages.get('total', [0.0, 0.0])[0] or 1.0
+        rows = [[name, f'{wall:.3f}', f'{cpu:.3f}', f'{wall / total * 100:.1f}%']
+                for name, (wall, cpu) in sorted(self.stages.items(), key=lambda item: -item[1][0])]
+        print(f"\n{Fore.CYAN}=== Stage Timings ({self.files} files) ==={Style.RESET_ALL}")
+        print(create_table(columns_list=['Stage', 'Wall (s)', 'CPU (s)', 'Share'], rows_list=rows))
+        
+        rows = [[pattern if len(pattern) <= 60 else pattern[:57] + '...', f'{wall:.4f}', count]
+                for pattern, (wall, count) in
+                sorted(self.patterns.items(), key=lambda item: -item[1][0])[:self.top]]
+        if rows:
+            print(f"\n{Fore.CYAN}=== Slowest Patterns ==={Style.RESET_ALL}")
+            print(create_table(columns_list=['Pattern', 'Wall (s)', 'Matches'], rows_list=rows))
+        
+        rows = []
+        for entry in self.slowest_files():
+            stages = {name: wall for name, (wall, _) in entry['stages'].items() if name != 'total'}
+            slowest_stage = max(stages, key=stages.get) if stages else '-'
+            rows.append([entry['file_path'], f"{entry['wall']:.3f}", slowest_stage])
+        if rows:
+            print(f"\n{Fore.CYAN}=== Slowest Files ==={Style.RESET_ALL}")
+            print(create_table(columns_list=['File', 'Wall (s)', 'Slowest Stage'], rows_list=rows))
+    
+    def save(self, output_path):
+        summary = {
+            'files': self.files,
+            'stages': {name: {'wall': round(wall, 6), 'cpu': round(cpu, 6)}
+                       for name, (wall, cpu) in self.stages.items()},
+            'patterns': {pattern: {'wall': round(wall, 6), 'matches': count}
+                         for pattern, (wall, count) in
+                         sorted(self.patterns.items(), key=lambda item: -item[1][0])},
+            'slowest_files': self.slowest_files(),
+        }
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
 
 @dataclass
 class ProtoResult:
@@ -313,6 +681,340 @@ class ProtoResult:
     messages: List[Dict[str, any]] = field(default_factory=list)
     imports: List[str] = field(default_factory=list)
     options: Dict[str, str] = field(default_factory=dict)
+    enums: List[Dict[str, any]] = field(default_factory=list)
+
+class Profiler:
+    """单个文件的计时器：按阶段记录墙钟时间和本线程CPU时间，按正则记录匹配耗时"""
+    
+    _local = threading.local()
+    
+    def __init__(self):
+        self.stages = {}  # 阶段名 -> [墙钟秒数, CPU秒数]
+        self.patterns = {}  # 正则 -> [墙钟秒数, 匹配数]
+    
+    @contextlib.contextmanager
+    def activate(self):
+        previous = getattr(self._local, 'current', None)
+        self._local.current = self
+        try:
+            yield self
+        finally:
+            self._local.current = previous
+    
+    @contextlib.contextmanager
+    def stage(self, name):
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            totals = self.stages.setdefault(name, [0.0, 0.0])
+            totals[0] += time.perf_counter() - wall
+            totals[1] += time.thread_time() - cpu
+    
+    def timed_matches(self, key, matches):
+        """包装匹配迭代器，只统计正则查找本身的耗时，不含调用方处理匹配的时间"""
+        elapsed = 0.0
+        count = 0
+        iterator = iter(matches)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    match = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - start
+                count += 1
+                yield match
+        finally:
+            totals = self.patterns.setdefault(key, [0.0, 0])
+            totals[0] += elapsed
+            totals[1] += count
+    
+    def report(self):
+        return {
+            'stages': {name: [round(wall, 6), round(cpu, 6)] for name, (wall, cpu) in self.stages.items()},
+            'patterns': {key: [round(wall, 6), count] for key, (wall, count) in self.patterns.items()},
+        }
+
+
+def current_profiler():
+    """当前线程上启用的计时器，未启用--profile时为None"""
+    return getattr(Profiler._local, 'current', None)
+
+
+NULL_STAGE = contextlib.nullcontext()
+
+
+def profile_stage(name):
+    """计时上下文，未启用计时时返回空上下文，开销只有一次线程局部变量查找"""
+    profiler = getattr(Profiler._local, 'current', None)
+    return NULL_STAGE if profiler is None else profiler.stage(name)
+
+
+class CodeProfiler:
+    """用cProfile或pyinstrument剖析整个扫描过程
+
+    cProfile只剖析调用enable的线程：线程池的每个工作线程在初始化时启用自己的cProfile，
+    报告时与主线程的结果合并。pyinstrument只剖析主线程，进程池中的工作进程都不包含在内。
+    """
+    
+    active = None  # 正在运行的剖析器，线程池初始化工作线程时使用
+    
+    def __init__(self, kind):
+        self.kind = kind
+        self.workers = []  # 各工作线程的cProfile
+        self._lock = threading.Lock()
+        if kind == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler as InstrumentProfiler
+            except ImportError:
+                raise ImportError("pyinstrument is not installed (pip install pyinstrument)")
+            self.profiler = InstrumentProfiler()
+        else:
+            import cProfile
+            self.profiler = cProfile.Profile()
+    
+    def start(self):
+        if self.kind == 'pyinstrument':
+            self.profiler.start()
+        else:
+            self.profiler.enable()
+        CodeProfiler.active = self
+    
+    def stop(self):
+        CodeProfiler.active = None
+        if self.kind == 'pyinstrument':
+            self.profiler.stop()
+        else:
+            self.profiler.disable()
+    
+    def start_worker(self):
+        """线程池工作线程的初始化函数：为当前线程启用独立的cProfile"""
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return  # 基于sys.monitoring的cProfile（3.12+）同一时刻只能启用一个，主剖析器已覆盖所有线程
+        with self._lock:
+            self.workers.append(profiler)
+    
+    def report(self):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if self.kind == 'pyinstrument':
+            output_path = f"grpc_pyinstrument_{timestamp}.html"
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(self.profiler.output_html())
+            print(self.profiler.output_text(unicode=True, color=True))
+        else:
+            import pstats
+            output_path = f"grpc_cprofile_{timestamp}.prof"
+            stats = pstats.Stats(self.profiler)
+            for profiler in self.workers:
+                stats.add(profiler)
+            stats.dump_stats(output_path)
+            stats.sort_stats('cumulative').print_stats(25)
+        print(f"\n{self.kind}结果已写入: {output_path}")
+
+class ScanTimeout(Exception):
+    """文件或提取器超出时间预算"""
+
+
+# 支持SIGALRM的平台上，线程的主线程（进程池工作进程、单文件扫描）可以抢占正在执行的正则和beautify
+PREEMPTIVE_BUDGETS = hasattr(signal, 'setitimer')
+
+_budgets = threading.local()
+
+
+def check_time_budget():
+    """协作式检查当前线程上最早到期的时间预算，已超时则抛出ScanTimeout"""
+    stack = getattr(_budgets, 'stack', None)
+    if stack:
+        deadline, label, seconds = min(stack)
+        if time.monotonic() >= deadline:
+            raise ScanTimeout(f"Timeout: {label} exceeded {seconds:g}s budget")
+
+
+def _arm_budget_timer(stack):
+    if stack:
+        remaining = min(stack)[0] - time.monotonic()
+        signal.setitimer(signal.ITIMER_REAL, max(remaining, 0.001))
+    else:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _budget_alarm(signum, frame):
+    # sre匹配循环会定期检查信号，异常从正在执行的正则中抛出
+    check_time_budget()
+    _arm_budget_timer(getattr(_budgets, 'stack', []))  # 定时器略早触发时重新计时
+
+
+@contextlib.contextmanager
+def time_budget(seconds, label):
+    """时间预算上下文，可嵌套（文件预算内再套提取器预算），seconds为空时不做任何事"""
+    if not seconds:
+        yield
+        return
+    stack = getattr(_budgets, 'stack', None)
+    if stack is None:
+        stack = _budgets.stack = []
+    entry = (time.monotonic() + seconds, label, seconds)
+    preemptive = PREEMPTIVE_BUDGETS and threading.current_thread() is threading.main_thread()
+    previous_handler = None
+    if preemptive and not stack:
+        previous_handler = signal.signal(signal.SIGALRM, _budget_alarm)
+    stack.append(entry)
+    if preemptive:
+        _arm_budget_timer(stack)
+    try:
+        yield
+    finally:
+        stack.remove(entry)
+        if preemptive:
+            _arm_budget_timer(stack)
+            if previous_handler is not None:
+                signal.signal(signal.SIGALRM, previous_handler)
+
+
+@dataclass
+class ScanOptions:
+    """扫描选项，随任务传递到工作线程/进程"""
+    prefilter: bool = True  # beautify前按gRPC特征字面量跳过无关文件
+    beautify: bool = True  # 关闭时直接在压缩代码上使用适配规则提取
+    stream: bool = False  # 按重叠窗口流式扫描JavaScript文件（不做beautify）
+    window_size: int = 4 * 1024 * 1024  # 流式窗口大小（字符数）
+    window_overlap: int = 64 * 1024  # 窗口重叠区，需不小于最长的单个匹配
+    mmap: bool = False  # 在mmap映射上直接运行bytes规则（不做beautify）
+    source_maps: bool = False  # 有source map时只扫描sourcesContent中grpc-web生成的原始模块
+    split_modules: bool = False  # 按webpack/Rollup模块边界切分，只处理含gRPC特征的模块
+    extractors: tuple = None  # 启用的JavaScript提取器名称，None表示全部
+    backend: str = 'regex'  # 消息提取后端：regex或tokens（单遍词法分析protoc-gen-js代码，不需要beautify）
+    profile: bool = False  # 记录每个文件各阶段和各规则的耗时
+    timeout: float = None  # 单个文件的时间预算（秒）
+    extractor_timeout: float = None  # 单个提取器的时间预算（秒）
+    pattern_files: tuple = ()  # --patterns加载的自定义规则文件，进程池工作进程启动时重新加载
+    plugin_files: tuple = ()  # --plugin加载的提取器插件
+    extension_digest: str = ''  # 自定义规则文件和插件内容的摘要
+    
+    def extractor_names(self):
+        return self.extractors or tuple(EXTRACTORS)
+    
+    def cache_tag(self):
+        """影响提取结果的选项，参与缓存键计算"""
+        if self.mmap:
+            tag = 'mmap'
+        elif self.stream:
+            tag = 'stream'
+        else:
+            tag = 'beautify' if self.beautify else 'raw'
+        if self.source_maps:
+            tag += '+sourcemap'
+        if self.split_modules:
+            tag += '+modules'
+        if self.backend != 'regex':
+            tag += '+' + self.backend
+        if self.extractors:
+            tag += '+' + ','.join(self.extractors)
+        return f'{tag}+{self.extension_digest}' if self.extension_digest else tag
+
+class ResultCache:
+    """基于内容哈希的持久化结果缓存（SQLite），用于增量重复扫描"""
+
+    # 缓存中保存的FileResult字段，文件路径和错误信息不缓存
+    CACHED_FIELDS = ('endpoints', 'messages', 'services', 'metadata',
+                     'error_handlers', 'interceptors', 'wire_types', 'proto_content', 'locations', 'modules',
+                     'rpc_types')
+
+    def __init__(self, cache_dir, max_size=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.db_path = os.path.join(cache_dir, 'grpc_web_scan_cache.sqlite3')
+        self._local = threading.local()
+        self._puts = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            'key TEXT PRIMARY KEY, data TEXT NOT NULL, '
+            'size INTEGER NOT NULL, last_access REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_last_access ON results(last_access)')
+        conn.commit()
+
+    def __getstate__(self):
+        # 连接对象不能跨进程传递，子进程中按需重新连接
+        state = self.__dict__.copy()
+        del state['_local']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(content, kind):
+        """缓存键：内容哈希 + 文件类型 + 扫描器版本"""
+        digest = hashlib.sha256(content.encode('utf-8', 'surrogatepass')).hexdigest()
+        return f"{digest}:{kind}:{SCANNER_VERSION}"
+
+    @staticmethod
+    def make_file_key(file_path, kind, chunk_size=1024 * 1024):
+        """流式计算文件内容哈希，不整体读入内存"""
+        sha = hashlib.sha256()
+        if is_archive_member(file_path):
+            sha.update(read_archive_member(file_path))
+            return f"{sha.hexdigest()}:{kind}:{SCANNER_VERSION}"
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                sha.update(chunk)
+        return f"{sha.hexdigest()}:{kind}:{SCANNER_VERSION}"
+
+    def get(self, key, file_path):
+        conn = self._connect()
+        row = conn.execute('SELECT data FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute('UPDATE results SET last_access = ? WHERE key = ?', (time.time(), key))
+        conn.commit()
+        return FileResult(file_path=file_path, cache_hit=True, **json.loads(row[0]))
+
+    def put(self, key, result):
+        data = json.dumps({name: getattr(result, name) for name in self.CACHED_FIELDS})
+        conn = self._connect()
+        conn.execute(
+            'INSERT OR REPLACE INTO results (key, data, size, last_access) VALUES (?, ?, ?, ?)',
+            (key, data, len(data), time.time())
+        )
+        conn.commit()
+        self._puts += 1
+        if self._puts % 100 == 0:
+            self.evict()
+
+    def evict(self):
+        """按最近访问时间淘汰，直到缓存总大小不超过上限"""
+        conn = self._connect()
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total <= self.max_size:
+            return
+        rows = conn.execute('SELECT key, size FROM results ORDER BY last_access').fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= self.max_size:
+                break
+            stale.append((key,))
+            total -= size
+        conn.executemany('DELETE FROM results WHERE key = ?', stale)
+        conn.commit()
 
 def create_table(columns_list, rows_list):
     table = Texttable()
@@ -328,68 +1030,305 @@ def create_table(columns_list, rows_list):
 
 
 def beautify_js_content(content):
+    """beautify失败时抛出ValueError，由调用方作为单个文件的错误处理，不终止整个扫描"""
     try:
         beautified = jsbeautifier.beautify(content)
 
     except Exception as e:
-        print('An error occurred in beautifying Javascript code: ' + str(e))
-        print('Enter valid javascript code. Do not copy js code '
-              'from browser dev tools directly! try to download it directly!')
-        print('If you are still getting this error, try to beautify Javascript code online and then use this tool!')
-        exit(1)
+        raise ValueError('An error occurred in beautifying Javascript code: ' + str(e) + '. '
+                         'Enter valid javascript code. Do not copy js code from browser dev tools directly! '
+                         'If you are still getting this error, try --no-beautify or beautify '
+                         'the code online and then use this tool!') from e
 
     return beautified
 
 
-def extract_endpoints(content):
-    """提取gRPC端点"""
-    patterns = [
-        # 基本端点模式
-        r'MethodDescriptor\("(\/[^"]+)"',  # 标准gRPC-web端
-        r'\.([a-zA-Z]+Service)\.([a-zA-Z]+)\s*=\s*{',  # 服务方法定义
-        r'\.unary\([\'"](.+?)[\'"]\s*,',  # unary调用
-        r'\.serverStreaming\([\'"](.+?)[\'"]\s*,',  # 流式调用
-        
-        # 新增：更多端点模
-        r'@rpc\.method\([\'"]([^\'\"]+)[\'"]\)',  # RPC方法装饰器
-        r'\.registerService\([\'"]([^\'\"]+)[\'"]\)',  # 服务注册
-        r'\.handleUnaryCall\([\'"]([^\'\"]+)[\'"]\)',  # 一元调用处理
-        r'\.handleServerStreamingCall\([\'"]([^\'\"]+)[\'"]\)',  # 服务端流式处理
-        r'\.handleClientStreamingCall\([\'"]([^\'\"]+)[\'"]\)',  # 客户端流式处理
-        r'\.handleBidiStreamingCall\([\'"]([^\'\"]+)[\'"]\)',  # 双向流式处理
-    ]
+class AnchorScanner:
+    """锚点扫描器：将所有规则的锚点字面量合并为一个正则交替式，
+    单次遍历内容得到出现过的锚点，未出现锚点的规则无需执行"""
+
+    def __init__(self, anchors):
+        # 长锚点优先，保证同一位置上匹配最长的锚点。
+        # 匹配文本本身就是锚点，不使用命名分组（命名分组会使re失去字面量前缀优化）
+        self.anchors = sorted(set(anchors), key=len, reverse=True)
+        self.regex = re.compile('|'.join(re.escape(anchor) for anchor in self.anchors))
+        # finditer为非重叠匹配：被其他锚点包含的锚点直接视为出现，
+        # 与其他锚点首尾重叠的锚点需要单独确认
+        self.contained = {
+            a: [b for b in self.anchors if b != a and b in a] for a in self.anchors
+        }
+        self.overlapping = {
+            a: [b for b in self.anchors
+                if b not in a and any(a.endswith(b[:k]) for k in range(1, len(b)))]
+            for a in self.anchors
+        }
+
+    @functools.cached_property
+    def bytes_regex(self):
+        return re.compile(b'|'.join(re.escape(anchor.encode('utf-8')) for anchor in self.anchors))
+
+    def scan(self, content):
+        """返回content中出现过的锚点集合，content可以是str、bytes或mmap"""
+        if isinstance(content, str):
+            found = {match.group() for match in self.regex.finditer(content)}
+        else:
+            found = {match.group().decode('utf-8') for match in self.bytes_regex.finditer(content)}
+        for anchor in list(found):
+            found.update(self.contained[anchor])
+        for anchor in list(found):
+            for other in self.overlapping[anchor]:
+                if other not in found and contains_literal(content, other):
+                    found.add(other)
+        return found
+
+
+def contains_literal(content, literal):
+    """判断content中是否包含字面量（mmap的in运算符按单字节判断，需用find）"""
+    if isinstance(content, str):
+        return literal in content
+    return content.find(literal.encode('utf-8')) != -1
+
+
+@functools.lru_cache(maxsize=None)
+def bytes_pattern(regex):
+    """将str规则编译为等价的bytes规则，用于直接扫描mmap映射"""
+    return re.compile(regex.pattern.encode('utf-8'), regex.flags & ~re.UNICODE)
+
+
+class DecodedMatch:
+    """bytes匹配结果的包装：只在访问分组时解码被匹配到的片段"""
+
+    __slots__ = ('match',)
+
+    def __init__(self, match):
+        self.match = match
+
+    @staticmethod
+    def _decode(value):
+        return None if value is None else value.decode('utf-8', errors='replace')
+
+    def group(self, *indexes):
+        value = self.match.group(*indexes)
+        if isinstance(value, tuple):
+            return tuple(self._decode(v) for v in value)
+        return self._decode(value)
+
+    def groups(self):
+        return tuple(self._decode(v) for v in self.match.groups())
+
+    @property
+    def lastgroup(self):
+        return self.match.lastgroup
+
+    def start(self, *args):
+        return self.match.start(*args)
+
+    def end(self, *args):
+        return self.match.end(*args)
+
+
+def compile_patterns(specs):
+    """编译规则表，每条规则为 (锚点字面量, 正则)，锚点必须出现在该规则的任何匹配中"""
+    return [(anchor, re.compile(pattern)) for anchor, pattern in specs]
+
+
+def iter_pattern_matches(patterns, content, anchors=None, window=None):
+    """按规则表顺序产出匹配结果，跳过锚点未出现的规则
+
+    content为bytes或mmap时使用对应的bytes规则，匹配结果按需解码。
+    """
+    binary = not isinstance(content, str)
+    profiler = current_profiler()
+    for anchor, regex in patterns:
+        if anchors is not None and anchor not in anchors:
+            continue
+        check_time_budget()
+        if binary:
+            matches = (DecodedMatch(match) for match in bytes_pattern(regex).finditer(content))
+        elif window is None:
+            matches = regex.finditer(content)
+        else:
+            matches = window.finditer(regex)
+        if profiler is not None:
+            matches = profiler.timed_matches(regex.pattern, matches)
+        yield from matches
+
+
+class ScanWindow:
+    """流式扫描中的一个窗口
+
+    窗口由本窗口负责的区间 [start, start + owned) 和其后的重叠区组成。
+    只接受起点落在负责区间内的匹配，并记录每条规则在全文中的续扫位置，
+    使逐窗口的结果与整段finditer一致（前提是单个匹配长度不超过重叠区）。
+    """
+
+    def __init__(self, text, start, owned, last, resume):
+        self.text = text
+        self.start = start
+        self.owned = owned
+        self.last = last
+        self.resume = resume  # 规则 -> 全文续扫位置，在窗口间共享
+
+    def finditer(self, regex):
+        pos = max(self.resume.get(regex, 0) - self.start, 0)
+        for match in regex.finditer(self.text, pos):
+            if not self.last and match.start() >= self.owned:
+                break  # 交给下一个窗口处理
+            self.resume[regex] = self.start + match.end()
+            yield match
+
+
+def iter_text_windows(file_path, window_size, overlap):
+    """按重叠窗口流式读取文本文件，内存占用只与窗口大小有关"""
+    if overlap >= window_size:
+        raise ValueError('window overlap must be smaller than window size')
+    step = window_size - overlap
+    resume = {}
+    start = 0
+    with open(file_path, 'r', encoding='utf-8') as f:
+        text = f.read(window_size)
+        while text:
+            tail = f.read(step)
+            yield ScanWindow(text, start, step, not tail, resume)
+            if not tail:
+                break
+            text = text[step:] + tail
+            start += step
+
+
+# 端点提取规则
+ENDPOINT_PATTERNS = compile_patterns([
+    # 基本端点模式
+    ('MethodDescriptor("', r'MethodDescriptor\("(\/[^"]+)"'),  # 标准gRPC-web端
+    ('Service.', r'\.([a-zA-Z]+Service)\.([a-zA-Z]+)\s*=\s*{'),  # 服务方法定义
+    ('.unary(', r'\.unary\([\'"](.+?)[\'"]\s*,'),  # unary调用
+    ('.serverStreaming(', r'\.serverStreaming\([\'"](.+?)[\'"]\s*,'),  # 流式调用
     
+    # 新增：更多端点模
+    ('@rpc.method(', r'@rpc\.method\([\'"]([^\'\"]+)[\'"]\)'),  # RPC方法装饰器
+    ('.registerService(', r'\.registerService\([\'"]([^\'\"]+)[\'"]\)'),  # 服务注册
+    ('.handleUnaryCall(', r'\.handleUnaryCall\([\'"]([^\'\"]+)[\'"]\)'),  # 一元调用处理
+    ('.handleServerStreamingCall(', r'\.handleServerStreamingCall\([\'"]([^\'\"]+)[\'"]\)'),  # 服务端流式处理
+    ('.handleClientStreamingCall(', r'\.handleClientStreamingCall\([\'"]([^\'\"]+)[\'"]\)'),  # 客户端流式处理
+    ('.handleBidiStreamingCall(', r'\.handleBidiStreamingCall\([\'"]([^\'\"]+)[\'"]\)'),  # 双向流式处理
+])
+
+# 未beautify的压缩代码使用的端点规则：括号内允许任意空白
+MINIFIED_ENDPOINT_PATTERNS = compile_patterns([
+    ('MethodDescriptor(', r'MethodDescriptor\(\s*"(\/[^"]+)"'),  # 标准gRPC-web端
+    ('Service.', r'\.([a-zA-Z]+Service)\.([a-zA-Z]+)\s*=\s*{'),  # 服务方法定义
+    ('.unary(', r'\.unary\(\s*[\'"](.+?)[\'"]\s*,'),  # unary调用
+    ('.serverStreaming(', r'\.serverStreaming\(\s*[\'"](.+?)[\'"]\s*,'),  # 流式调用
+    ('@rpc.method(', r'@rpc\.method\(\s*[\'"]([^\'\"]+)[\'"]\s*\)'),  # RPC方法装饰器
+    ('.registerService(', r'\.registerService\(\s*[\'"]([^\'\"]+)[\'"]\s*\)'),  # 服务注册
+    ('.handleUnaryCall(', r'\.handleUnaryCall\(\s*[\'"]([^\'\"]+)[\'"]\s*\)'),  # 一元调用处理
+    ('.handleServerStreamingCall(', r'\.handleServerStreamingCall\(\s*[\'"]([^\'\"]+)[\'"]\s*\)'),  # 服务端流式处理
+    ('.handleClientStreamingCall(', r'\.handleClientStreamingCall\(\s*[\'"]([^\'\"]+)[\'"]\s*\)'),  # 客户端流式处理
+    ('.handleBidiStreamingCall(', r'\.handleBidiStreamingCall\(\s*[\'"]([^\'\"]+)[\'"]\s*\)'),  # 双向流式处理
+])
+
+# 消息提取规则：setter模式单独处理，其余规则的第二个分组为字段定义
+MESSAGE_SETTER_PATTERNS = compile_patterns([
+    # 基本消息模式。每个分组都限定为标识符或单行内的参数，相邻分组不会争抢同一段文本；
+    # 函数体到set调用之间、各参数都限定在同一语句内且最多200个字符，每个候选位置的尝试长度有上限，
+    # 压缩成一行的bundle上匹配耗时仍与行长成线性关系（不限长度时会从每个候选位置扫描到行尾），
+    # 函数体中没有set调用的setter也不会匹配到后面的定义；
+    # 字面量前缀后的后行断言保证只从点号链的开头尝试，避免 proto.proto.proto... 这类文本产生平方级开销
+    # （断言放在字面量之后，re仍可按前缀快速定位候选位置）
+    ('.prototype.set', r'proto\.(?<![\w$.]proto\.)([\w$.]+)\.prototype\.set([\w$]+)\s*=\s*function\s*\([^)\n]{0,200}\)\s*{\s*'
+                       r'[^\n;{}]{0,200}?set([\w$]+)\([^,\n;]{0,200},([^,\n;]{0,200}),'),
+])
+
+# 未beautify的压缩代码使用的setter规则：不依赖换行，每个分组都限定在标识符/参数内，
+# 一行包含成千上万个定义时也不会跨定义匹配
+MINIFIED_MESSAGE_SETTER_PATTERNS = compile_patterns([
+    ('.prototype.set', r'proto\.(?<![\w$.]proto\.)([\w$.]+?)\.prototype\.set([\w$]+)\s*=\s*function\s*\([^)]*\)\s*{\s*'
+                       r'(?:return\s+)?[\w$.]*set([\w$]+)\(\s*[^,()]*,\s*([^,()]*?)\s*,'),
+])
+
+MESSAGE_PATTERNS = compile_patterns([
+    # 新增：更多消息模式
+    ('message', r'message\s+([a-zA-Z0-9_]+)\s*{([^}]+)}'),  # proto消息定义
+    ('protobuf.Message', r'class\s+([a-zA-Z0-9_]+)\s+extends\s+protobuf\.Message'),  # 继承自Message
+    ('@protobuf.Type(', r'@protobuf\.Type\([\'"]([^\'\"]+)[\'"]\)'),  # 类型装饰器
+    ('proto.', r'new\s+proto\.([a-zA-Z0-9_]+)\('),  # 消息实例化
+])
+
+MESSAGE_FIELD_PATTERN = re.compile(r'(\w+)\s+(\w+)\s*=\s*(\d+)')
+
+# 服务提取规则
+SERVICE_PATTERNS = compile_patterns([
+    ('Client', r'class\s+([a-zA-Z0-9_]+)Client\s*{'),  # Client class
+    ('Service', r'\.([a-zA-Z0-9_]+Service)\s*=\s*{'),  # Service definition
+    ('@protobuf.Service(', r'@protobuf\.Service\([\'"]([^\'\"]+)[\'"]\)'),  # Protobuf decorator
+    ('ServiceImpl', r'class\s+([a-zA-Z0-9_]+)ServiceImpl\s*'),  # Service implementation
+    ('Server', r'class\s+([a-zA-Z0-9_]+)Server\s*'),  # Server class
+    ('.addService(', r'\.addService\(([a-zA-Z0-9_]+)\.service\)'),  # Service addition
+    ('@Service(', r'@Service\([\'"]([^\'\"]+)[\'"]\)'),  # Service annotation
+    ('Service(', r'new\s+([a-zA-Z0-9_]+)Service\('),  # Service instantiation
+    ('proto.', r'proto\.([a-zA-Z0-9_]+)Service\s*='),  # Proto service definition
+    ('Service', r'var\s+([a-zA-Z0-9_]+)Service\s*='),  # Service variable
+    ('Service', r'const\s+([a-zA-Z0-9_]+)Service\s*='),  # Service constant
+    ('Service.service', r'([a-zA-Z0-9_]+)Service\.service\s*='),  # Service object
+    ('Client.service', r'([a-zA-Z0-9_]+)Client\.service\s*='),  # Client service
+    ('.ServiceClient', r'([a-zA-Z0-9_]+)\.ServiceClient\s*='),  # Service client definition
+])
+
+# 元数据提取规则
+METADATA_PATTERNS = compile_patterns([
+    ('.setMetadata(', r'\.setMetadata\([\'"]([^\'\"]+)[\'"]\s*,'),  # 设置元数据
+    ('.getMetadata(', r'\.getMetadata\([\'"]([^\'\"]+)[\'"]\)'),  # 获取元数据
+    ('metadata.set(', r'metadata\.set\([\'"]([^\'\"]+)[\'"]\s*,'),  # 设置metadata
+    ('metadata.get(', r'metadata\.get\([\'"]([^\'\"]+)[\'"]\)'),  # 获取metadata
+])
+
+# 错误处理提取规则
+ERROR_HANDLER_PATTERNS = compile_patterns([
+    ('.catch(', r'\.catch\(\s*function\s*\((.*?)\)'),  # 错误捕获
+    ('.on(', r'\.on\([\'"]error[\'"]\s*,'),  # 错误事件处理
+    ('Error(', r'new\s+Error\([\'"]([^\'\"]+)[\'"]\)'),  # 错误创建
+    ('status.', r'status\.([A-Z_]+)'),  # 状态码
+])
+
+# 拦截器提取规则
+INTERCEPTOR_PATTERNS = compile_patterns([
+    ('.addInterceptor(', r'\.addInterceptor\(([^)]+)\)'),  # 添加拦截器
+    ('.intercept(', r'\.intercept\([^)]+\)'),  # 拦截方法
+    ('Interceptor', r'class\s+([a-zA-Z0-9_]+)\s+implements\s+Interceptor'),  # 拦截器类
+    ('@Interceptor(', r'@Interceptor\([\'"]([^\'\"]+)[\'"]\)'),  # 拦截器装饰器
+])
+
+def extract_endpoints(content, anchors=None, minified=False, window=None):
+    """提取gRPC端点，minified为True时使用适配压缩代码的规则"""
+    patterns = MINIFIED_ENDPOINT_PATTERNS if minified else ENDPOINT_PATTERNS
     endpoints = set()
-    for pattern in patterns:
-        matches = re.finditer(pattern, content)
-        for match in matches:
-            endpoint = match.group(1)
-            if not endpoint.startswith('/'):
-                endpoint = f"/{endpoint}"
-            endpoints.add(endpoint)
-    
-    return list(endpoints)
-
-
-def extract_messages(content):
-    """提取gRPC消息定义"""
-    patterns = [
-        # 基本消息模式
-        r'proto\.(.*)\.prototype\.set(.*).*=.*function\(.*\).*{\s*.*set(.*)\(.*?,(.*?),',
-        
-        # 新增：更多消息模式
-        r'message\s+([a-zA-Z0-9_]+)\s*{([^}]+)}',  # proto消息定义
-        r'class\s+([a-zA-Z0-9_]+)\s+extends\s+protobuf\.Message',  # 继承自Message
-        r'@protobuf\.Type\([\'"]([^\'\"]+)[\'"]\)',  # 类型装饰器
-        r'new\s+proto\.([a-zA-Z0-9_]+)\(',  # 消息实例化
-    ]
+    for match in iter_pattern_matches(patterns, content, anchors, window):
+        endpoint = match.group(1)
+        if not endpoint.startswith('/'):
+            endpoint = f"/{endpoint}"
+        endpoints.add(endpoint)
     
-    message_list = {}
+    return sorted(endpoints)
+
+
+def extract_messages(content, anchors=None, minified=False, window=None, message_list=None, backend='regex'):
+    """提取gRPC消息定义，minified为True时使用适配压缩代码的规则
+
+    流式扫描时通过message_list在多个窗口间累积结果。backend为tokens时
+    protoc-gen-js生成的消息由extract_message_tokens提取，其余规则不变。
+    """
+    setter_patterns = MINIFIED_MESSAGE_SETTER_PATTERNS if minified else MESSAGE_SETTER_PATTERNS
+    if message_list is None:
+        message_list = {}
+    
+    if backend == 'tokens':
+        setter_patterns = ()
+        if anchors is None or 'proto.' in anchors:
+            extract_message_tokens(content, message_list)
     
     # 处理基本消息模式
-    basic_pattern = re.compile(patterns[0])
-    matched_items = basic_pattern.findall(content)
-    for m in matched_items:
+    for match in iter_pattern_matches(setter_patterns, content, anchors, window):
+        m = match.groups()
         if m[0].strip() not in message_list:
             message_list[m[0]] = []
         if m[1].strip() not in message_list[m[0].strip()]:
@@ -397,127 +1336,88 @@ def extract_messages(content):
             message_list[m[0]].append(temp_list)
     
     # 处理新增的消息模式
-    for pattern in patterns[1:]:
-        matches = re.finditer(pattern, content)
-        for match in matches:
-            msg_name = match.group(1)
-            if msg_name not in message_list:
-                message_list[msg_name] = []
-            # 尝试提取字段信息
-            if len(match.groups()) > 1:
-                fields_content = match.group(2)
-                field_pattern = r'(\w+)\s+(\w+)\s*=\s*(\d+)'
-                field_matches = re.finditer(field_pattern, fields_content)
-                for field_match in field_matches:
-                    field_type, field_name, field_number = field_match.groups()
-                    if [field_name, field_type, field_number] not in message_list[msg_name]:
-                        message_list[msg_name].append([field_name, field_type, field_number])
+    for match in iter_pattern_matches(MESSAGE_PATTERNS, content, anchors, window):
+        msg_name = match.group(1)
+        if msg_name not in message_list:
+            message_list[msg_name] = []
+        # 尝试提取字段信息
+        if len(match.groups()) > 1:
+            fields_content = match.group(2)
+            for field_match in MESSAGE_FIELD_PATTERN.finditer(fields_content):
+                field_type, field_name, field_number = field_match.groups()
+                if [field_name, field_type, field_number] not in message_list[msg_name]:
+                    message_list[msg_name].append([field_name, field_type, field_number])
     
     return message_list
 
 
-def extract_services(content):
+def extract_services(content, anchors=None, window=None):
     """Extract gRPC service definitions"""
-    patterns = [
-        r'class\s+([a-zA-Z0-9_]+)Client\s*{',  # Client class
-        r'\.([a-zA-Z0-9_]+Service)\s*=\s*{',  # Service definition
-        r'@protobuf\.Service\([\'"]([^\'\"]+)[\'"]\)',  # Protobuf decorator
-        r'class\s+([a-zA-Z0-9_]+)ServiceImpl\s*',  # Service implementation
-        r'class\s+([a-zA-Z0-9_]+)Server\s*',  # Server class
-        r'\.addService\(([a-zA-Z0-9_]+)\.service\)',  # Service addition
-        r'@Service\([\'"]([^\'\"]+)[\'"]\)',  # Service annotation
-        r'new\s+([a-zA-Z0-9_]+)Service\(',  # Service instantiation
-        r'proto\.([a-zA-Z0-9_]+)Service\s*=',  # Proto service definition
-        r'var\s+([a-zA-Z0-9_]+)Service\s*=',  # Service variable
-        r'const\s+([a-zA-Z0-9_]+)Service\s*=',  # Service constant
-        r'([a-zA-Z0-9_]+)Service\.service\s*=',  # Service object
-        r'([a-zA-Z0-9_]+)Client\.service\s*=',  # Client service
-        r'([a-zA-Z0-9_]+)\.ServiceClient\s*=',  # Service client definition
-    ]
-    
     services = set()
-    for pattern in patterns:
-        matches = re.finditer(pattern, content)
-        for match in matches:
-            service = match.group(1)
-            # Clean up service name
-            if service.endswith('Client'):
-                service = service[:-6]
-            elif service.endswith('ServiceImpl'):
-                service = service[:-11]
-            elif service.endswith('Server'):
-                service = service[:-6]
-            elif not service.endswith('Service'):
-                service = f"{service}Service"
-            services.add(service)
-    
-    return list(services)
-
-
-def extract_metadata(content):
-    """提取gRPC元数据处理"""
-    patterns = [
-        r'\.setMetadata\([\'"]([^\'\"]+)[\'"]\s*,',  # 设置元数据
-        r'\.getMetadata\([\'"]([^\'\"]+)[\'"]\)',  # 获取元数据
-        r'metadata\.set\([\'"]([^\'\"]+)[\'"]\s*,',  # 设置metadata
-        r'metadata\.get\([\'"]([^\'\"]+)[\'"]\)',  # 获取metadata
-    ]
+    for match in iter_pattern_matches(SERVICE_PATTERNS, content, anchors, window):
+        service = match.group(1)
+        # Clean up service name
+        if service.endswith('Client'):
+            service = service[:-6]
+        elif service.endswith('ServiceImpl'):
+            service = service[:-11]
+        elif service.endswith('Server'):
+            service = service[:-6]
+        elif not service.endswith('Service'):
+            service = f"{service}Service"
+        services.add(service)
     
+    return sorted(services)
+
+
+def extract_metadata(content, anchors=None, window=None):
+    """提取gRPC元数据处理"""
     metadata = set()
-    for pattern in patterns:
-        matches = re.finditer(pattern, content)
-        for match in matches:
-            metadata.add(match.group(1))
+    for match in iter_pattern_matches(METADATA_PATTERNS, content, anchors, window):
+        metadata.add(match.group(1))
     
-    return list(metadata)
+    return sorted(metadata)
 
 
-def extract_error_handlers(content):
+def extract_error_handlers(content, anchors=None, window=None):
     """提取gRPC错误处理"""
-    patterns = [
-        r'\.catch\(\s*function\s*\((.*?)\)',  # 错误捕获
-        r'\.on\([\'"]error[\'"]\s*,',  # 错误事件处理
-        r'new\s+Error\([\'"]([^\'\"]+)[\'"]\)',  # 错误创建
-        r'status\.([A-Z_]+)',  # 状态码
-    ]
-    
     error_handlers = set()
-    for pattern in patterns:
-        matches = re.finditer(pattern, content)
-        for match in matches:
-            if len(match.groups()) > 0:
-                error_handlers.add(match.group(1))
+    for match in iter_pattern_matches(ERROR_HANDLER_PATTERNS, content, anchors, window):
+        if len(match.groups()) > 0:
+            error_handlers.add(match.group(1))
     
-    return list(error_handlers)
+    return sorted(error_handlers)
 
 
-def extract_interceptors(content):
+def extract_interceptors(content, anchors=None, window=None):
     """提取gRPC拦截器"""
-    patterns = [
-        r'\.addInterceptor\(([^)]+)\)',  # 添加拦截器
-        r'\.intercept\([^)]+\)',  # 拦截方法
-        r'class\s+([a-zA-Z0-9_]+)\s+implements\s+Interceptor',  # 拦截器类
-        r'@Interceptor\([\'"]([^\'\"]+)[\'"]\)',  # 拦截器装饰器
-    ]
-    
     interceptors = set()
-    for pattern in patterns:
-        matches = re.finditer(pattern, content)
-        for match in matches:
-            if len(match.groups()) > 0:
-                interceptors.add(match.group(1))
+    for match in iter_pattern_matches(INTERCEPTOR_PATTERNS, content, anchors, window):
+        if len(match.groups()) > 0:
+            interceptors.add(match.group(1))
     
-    return list(interceptors)
+    return sorted(interceptors)
 
 
 def read_file(file):
-    try:
-        with open(file, 'r', encoding='utf-8') as file:
-            return file.read()
+    # 读取或解码失败时抛出异常，由调用方记录到FileResult.error，不中断整个扫描
+    if is_archive_member(file):
+        return read_archive_member(file).decode('utf-8')
+    with open(file, 'r', encoding='utf-8') as file:
+        return file.read()
 
-    except Exception as e:
-        print('Error occurred on opening file: ' + str(e))
-        exit(1)
+
+# 预过滤使用的gRPC特征字面量，原始字节中一个都不出现的文件直接跳过
+def has_grpc_markers(file_path, extractors=None):
+    """通过mmap在原始字节上查找启用提取器声明的gRPC特征，命中第一个即返回，无需解码整个文件"""
+    pattern = prefilter_pattern(extractors or tuple(EXTRACTORS))
+    if is_archive_member(file_path):
+        return pattern.search(read_archive_member(file_path)) is not None
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return pattern.search(mm) is not None
 
 
 def read_standard_input():
@@ -543,15 +1443,42 @@ def print_parser_help(prog):
 │                                                           │
 │  --file    Scan single JavaScript file                   │
 │  --dir     Recursively scan directory                    │
+│            (zip/apk/tar/asar archives as virtual dirs)   │
+│  --no-archives Do not descend into archives              │
 │  --stdin   Read from standard input                      │
 │                                                          │
 ├────────────────── Output Arguments ───────────────────┤
 │                                                           │
 │  --report  Generate HTML report (optional)               │
+│  --report-pages Paged report with lazily loaded shards   │
+│  --output-format ndjson|json  Stream results to disk     │
+│  --output  Output file of --output-format                │
+│  --proto-dir  Deduplicated .proto per package            │
 │                                                          │
 ├────────────────── Other Arguments ────────────────────┤
 │                                                           │
 │  --workers Number of concurrent threads (default: 10)     │
+│  --executor thread|process (default: thread)              │
+│  --schedule walk|size  Walk order or largest first (walk) │
+│  --batch-kb     Batch files below N KB (default: 256)     │
+│  --cache-dir  Persistent result cache directory           │
+│  --cache-size Cache size limit in MB (default: 512)       │
+│  --no-prefilter Scan files without gRPC markers too       │
+│  --no-beautify  Match minified code without jsbeautifier  │
+│  --stream       Scan JS in overlapping windows            │
+│  --window-size  Window size in MB (default: 4)            │
+│  --window-overlap Window overlap in KB (default: 64)      │
+│  --mmap         Bytes-level scanning of mapped JS files   │
+│  --source-maps  Scan grpc-web sources from .js.map files  │
+│  --split-modules Only process bundle modules with markers │
+│  --patterns     Extra patterns from YAML/JSON (repeatable)│
+│  --plugin       Python extractor plugin (repeatable)      │
+│  --extractors   e.g. endpoints,messages (default: all)    │
+│  --backend      regex|tokens (tokens: one-pass tokenizer) │
+│  --timeout      Per-file time budget in seconds           │
+│  --extractor-timeout Per-extractor time budget in seconds │
+│  --profile      Per-stage/per-pattern timing + slowest N  │
+│  --profiler     cprofile|pyinstrument whole-scan profile  │
 │  --help    Show this help message                        │
 │                                                           │
 ╰──────────────────────────────────────────────────────╯
@@ -598,322 +1525,2147 @@ def generate_example_data(message_fields):
     for field in message_fields:
         field_name, field_type, field_number = field
         example_value = generate_example_value(field_type)
-        # 添加HTML span标签用于样式
-        examples.append(f'<span class="field-number">{field_number}</span>: <span class="field-value">{example_value}</span>')
+        # 添加HTML span标签用于样式，字段编号来自扫描的代码，需要转义
+        examples.append(f'<span class="field-number">{html.escape(str(field_number), quote=False)}</span>: '
+                        f'<span class="field-value">{html.escape(str(example_value), quote=False)}</span>')
     return examples
 
-def process_single_file(file_path, print_results=True):
-    try:
-        content = read_file(file_path)
-        
-        # 根据文件类型选择处理方式
-        if file_path.endswith('.ts'):
-            # 处理TypeScript文件
-            ts_results = extract_typescript_grpc(content)
-            if print_results:
-                print(f"\n{Fore.CYAN}=== Processing TypeScript File: {file_path} ==={Style.RESET_ALL}")
-                
-                if ts_results['services']:
-                    print(f"\n{Fore.GREEN}Found Services:{Style.RESET_ALL}")
-                    for service in ts_results['services']:
-                        print(f"  {Fore.YELLOW}{service}{Style.RESET_ALL}")
-                
-                if ts_results['messages']:
-                    print(f"\n{Fore.GREEN}Found Messages:{Style.RESET_ALL}")
-                    for msg_name, fields in ts_results['messages'].items():
-                        print(f"\n{Fore.YELLOW}{msg_name}:{Style.RESET_ALL}")
-                        if fields:
-                            print(create_table(
-                                columns_list=['Field Name', 'Field Type', 'Field Number'],
-                                rows_list=fields
-                            ))
-                
-                if ts_results['methods']:
-                    print(f"\n{Fore.GREEN}Found Methods:{Style.RESET_ALL}")
-                    for method in ts_results['methods']:
-                        print(f"  {Fore.YELLOW}{method}{Style.RESET_ALL}")
-                        
-        else:
-            # 处理JavaScript文件
-            js_content = beautify_js_content(content)
-            endpoints = extract_endpoints(js_content)
-            messages = extract_messages(js_content)
-            services = extract_services(js_content)
-            metadata = extract_metadata(js_content)
-            error_handlers = extract_error_handlers(js_content)
-            interceptors = extract_interceptors(js_content)
-            
-            # 生成proto内容
-            proto_content = None
-            if messages:
-                proto_content = generate_proto_content(messages, services)
-            
-            if print_results:
-                print(f"\n{Fore.CYAN}=== Processing {file_path} ==={Style.RESET_ALL}")
-                
-                if endpoints:
-                    print(f"\n{Fore.GREEN}Found Endpoints:{Style.RESET_ALL}")
-                    for endpoint in endpoints:
-                        print(f"  {Fore.YELLOW}{endpoint}{Style.RESET_ALL}")
-                
-                if services:
-                    print(f"\n{Fore.GREEN}Found Services:{Style.RESET_ALL}")
-                    for service in services:
-                        print(f"  {Fore.YELLOW}{service}{Style.RESET_ALL}")
-                
-                if messages:
-                    print(f"\n{Fore.GREEN}Found Messages:{Style.RESET_ALL}")
-                    for msg_name, msg_fields in messages.items():
-                        print(f"\n{Fore.YELLOW}{msg_name}:{Style.RESET_ALL}")
-                        print(create_table(
-                            columns_list=['Field Name', 'Field Type', 'Field Number'],
-                            rows_list=msg_fields
-                        ))
-                        
-                        # 添加示例数据输出
-                        print(f"\n{Fore.BLUE}Example Data:{Style.RESET_ALL}")
-                        examples = generate_example_data(msg_fields)
-                        for example in examples:
-                            print(f"  {Fore.CYAN}{example}{Style.RESET_ALL}")
-                        print()  # 添加空行分隔
-                    
-                    # 添加proto文件内容输出
-                    if proto_content:
-                        print(f"\n{Fore.GREEN}Proto File Definition:{Style.RESET_ALL}")
-                        print(f"{Fore.CYAN}{proto_content}{Style.RESET_ALL}")
-            
-            return FileResult(
-                file_path=file_path,
-                endpoints=endpoints,
-                messages=messages,
-                services=services,
-                metadata=metadata,
-                error_handlers=error_handlers,
-                interceptors=interceptors,
-                proto_content=proto_content  # 确保设置proto内容
-            )
-            
-    except Exception as e:
-        error_msg = str(e)
-        if print_results:
-            print(f"{Fore.RED}Error processing file {file_path}: {error_msg}{Style.RESET_ALL}")
-        return FileResult(file_path=file_path, error=error_msg)
+def scan_js_content(content, file_path, options=None):
+    """对JavaScript内容执行beautify（可选）与启用的提取器，生成FileResult"""
+    options = options or ScanOptions()
+    if options.split_modules:
+        result = scan_js_modules(content, file_path, options)
+        if result is not None:
+            return result
+    minified = not options.beautify
+    with profile_stage('beautify'):
+        js_content = content if minified else beautify_js_content(content)
+    return extract_js_result(js_content, file_path, minified, options.extractors,
+                             options.extractor_timeout, options.backend)
 
-def process_directory(dir_path, print_results=True, max_workers=10):
-    """使用并发处理目录"""
-    if not os.path.exists(dir_path):
-        print(f"{Fore.RED}Directory not found: {dir_path}{Style.RESET_ALL}")
-        return ScanResult()  # 返回空的扫描结果而不是退出
-        
-    scan_result = ScanResult()
-    
-    if print_results:
-        print(f"\n{Fore.CYAN}=== Scanning directory: {dir_path} ==={Style.RESET_ALL}\n")
+def scan_js_mmap(file_path, options=None):
+    """mmap映射文件并直接运行bytes规则，避免整体解码和复制，只解码匹配到的片段"""
+    options = options or ScanOptions()
+    if is_archive_member(file_path):
+        # 归档成员已解压在内存中，直接在bytes上运行同一套规则
+        return extract_js_result(read_archive_member(file_path), file_path, True, options.extractors,
+                                 options.extractor_timeout, options.backend)
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return FileResult(file_path=file_path)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return extract_js_result(mm, file_path, True, options.extractors,
+                                     options.extractor_timeout, options.backend)
+
+def run_extractors(names, content, minified, window=None, values=None, extractor_timeout=None,
+                   backend='regex'):
+    """运行指定的提取器，按FileResult字段把结果累积到values中
+
+    提取器在backends中注册了backend对应的实现时使用该实现，否则使用extract。
+    """
+    if values is None:
+        values = {}
+    # 单次遍历得到出现的锚点，各提取器只执行锚点命中的规则
+    scanner = anchor_scanner(names)
+    with profile_stage('anchors'):
+        anchors = scanner.scan(content) if scanner is not None else set()
+    for name in names:
+        extractor = EXTRACTORS[name]
+        into = values.setdefault(extractor.field, {} if extractor.field in DICT_EXTRACTOR_FIELDS else set())
+        extract = extractor.backends.get(backend, extractor.extract)
+        with profile_stage(f'extract.{name}'), time_budget(extractor_timeout, f'extractor {name}'):
+            extract(content, anchors, minified, window, into)
+    return values
+
+def build_js_result(file_path, values):
+    """把提取器累积的结果整理为FileResult"""
+    result = FileResult(file_path=file_path)
+    for field_name, value in values.items():
+        setattr(result, field_name, value if field_name in DICT_EXTRACTOR_FIELDS else sorted(value))
     
-    # 集所有处理的文件
-    js_files = []
-    ts_files = []
-    proto_files = []
-    for root, dirs, files in os.walk(dir_path):
-        if 'node_modules' in dirs:
-            dirs.remove('node_modules')
-            
+    # 生成proto内容
+    if result.messages or result.wire_types:
+        with profile_stage('proto'):
+            result.proto_content = generate_proto_content(result.messages, result.services,
+                                                          wire_types=result.wire_types)
+    return result
+
+def extract_js_result(js_content, file_path, minified, extractors=None, extractor_timeout=None,
+                      backend='regex'):
+    """在（已beautify或压缩的）JavaScript内容上运行启用的提取器"""
+    values = run_extractors(extractors or tuple(EXTRACTORS), js_content, minified,
+                            extractor_timeout=extractor_timeout, backend=backend)
+    return build_js_result(file_path, values)
+
+def scan_js_stream(file_path, options=None):
+    """流式扫描JavaScript文件：按重叠窗口读取并逐窗口提取，峰值内存取决于窗口大小
+
+    流式模式不做beautify，使用适配压缩代码的规则。
+    """
+    options = options or ScanOptions()
+    names = options.extractor_names()
+    values = {}
+    for window in iter_text_windows(file_path, options.window_size, options.window_overlap):
+        run_extractors(names, window.text, True, window, values, options.extractor_timeout,
+                       options.backend)
+    return build_js_result(file_path, values)
+
+# bundle末尾的source map注释，//# 与旧式 //@ 两种写法
+SOURCE_MAPPING_URL = re.compile(rb'[#@]\s*sourceMappingURL=\s*(\S+)')
+
+# source map中需要扫描的原始源文件：protoc/grpc-web/connect生成的模块
+GRPC_SOURCE_PATTERN = re.compile(
+    r'(?:_pb|_grpc_web_pb|_grpc_pb|_pb_service|_connect|_connectweb|[._-]grpc[\w.-]*)\.(?:[cm]?js|tsx?)$',
+    re.IGNORECASE)
+
+
+def is_grpc_source(source):
+    """source map中的源文件路径是否为grpc-web生成的模块（忽略webpack附加的查询参数）"""
+    return GRPC_SOURCE_PATTERN.search(source.split('?', 1)[0]) is not None
+
+
+def read_file_tail(file_path, size):
+    """读取文件末尾至多size字节，返回 (内容, 是否已读到文件开头)"""
+    if is_archive_member(file_path):
+        data = read_archive_member(file_path)
+        return data[-size:], len(data) <= size
+    with open(file_path, 'rb') as f:
+        length = f.seek(0, os.SEEK_END)
+        f.seek(max(0, length - size))
+        return f.read(), length <= size
+
+
+def locate_source_map(file_path, tail_size=4096):
+    """根据bundle末尾的sourceMappingURL定位source map，返回 (map路径, 内联map内容)
+
+    内联的data URI可能长达数MB，末尾读取的片段内没有换行时按4倍扩大读取范围，
+    直到包含完整的最后一行。没有注释时尝试同目录下的 <文件名>.map，都找不到时返回None。
+    """
+    while True:
+        tail, whole = read_file_tail(file_path, tail_size)
+        if whole or b'\n' in tail.rstrip():
+            break
+        tail_size *= 4
+    matches = SOURCE_MAPPING_URL.findall(tail)
+    if not matches:
+        sibling = f'{file_path}.map'
+        if not is_archive_member(file_path) and os.path.isfile(sibling):
+            return sibling, None
+        return None
+    url = matches[-1].decode('utf-8', 'replace')
+    if url.startswith('data:'):
+        header, _, payload = url.partition(',')
+        if header.endswith(';base64'):
+            return None, base64.b64decode(payload)
+        return None, urllib.parse.unquote(payload).encode('utf-8')
+    if '://' in url:
+        return None  # 远程source map不下载
+    url = urllib.parse.unquote(url.split('?', 1)[0])
+    archive = split_archive_path(file_path)
+    if archive is not None:
+        archive_path, member = archive
+        member = posixpath.normpath(posixpath.join(posixpath.dirname(member), url))
+        map_path = f'{archive_path}{ARCHIVE_SEPARATOR}{member}'
+        # 发布产物常删掉.map而保留注释，成员不存在时与普通文件一样视为没有source map
+        return (map_path, None) if archive_member_exists(map_path) else None
+    map_path = os.path.join(os.path.dirname(file_path), url)
+    return (map_path, None) if os.path.isfile(map_path) else None
+
+
+class JsonStreamReader:
+    """按块读取JSON文本并逐个解码值，不把整个文档读入内存"""
+
+    NUMBER_TAIL = re.compile(r'[0-9.eE+-]*\Z')
+
+    def __init__(self, stream, chunk_size=1024 * 1024):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size=0):
+        """丢弃已消费的部分并追加读取，至少读取size个字符"""
+        if self.eof:
+            return False
+        chunk = self.stream.read(max(size, self.chunk_size))
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+        return bool(chunk)
+
+    def peek(self):
+        """跳过空白，返回下一个字符，文档结束时返回空字符串"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f'invalid source map: expected one of {chars!r}')
+        self.pos += 1
+        return char
+
+    def value(self):
+        """解码下一个完整的JSON值；值跨越缓冲区末尾时按当前缓冲区大小倍增读取后重试"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill(len(self.buffer)):
+                    raise
+                continue
+            # 数字延伸到缓冲区末尾时可能被截断（如 "1." 之后还有 "5"），补读后重新解码
+            if (self.eof or not isinstance(value, (int, float))
+                    or self.NUMBER_TAIL.match(self.buffer, end) is None):
+                self.pos = end
+                return value
+            self._fill(len(self.buffer))
+
+
+def iter_source_map_sources(stream, wanted):
+    """流式解析source map，逐个产出 (源文件路径, 原始源码)
+
+    只解码sourcesContent中路径满足wanted的源码，其余源码和mappings解析后立即丢弃。
+    sourcesContent出现在sources之前时先暂存，读到sources后再筛选。
+    """
+    reader = JsonStreamReader(stream)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    sources = None
+    pending = None
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        if key == 'sources':
+            sources = reader.value()
+        elif key == 'sourcesContent' and reader.peek() == '[':
+            reader.expect('[')
+            index = 0
+            if reader.peek() == ']':
+                reader.expect(']')
+            else:
+                while True:
+                    content = reader.value()
+                    if sources is None:
+                        pending = pending or []
+                        pending.append(content)
+                    elif index < len(sources) and isinstance(content, str) and wanted(sources[index]):
+                        yield sources[index], content
+                    index += 1
+                    if reader.expect(',]') == ']':
+                        break
+        else:
+            reader.value()
+        if reader.expect(',}') == '}':
+            break
+    if pending and sources:
+        for source, content in zip(sources, pending):
+            if isinstance(content, str) and wanted(source):
+                yield source, content
+
+
+def open_source_map(map_path, inline):
+    """以文本流打开source map：内联内容、归档成员或普通文件"""
+    if inline is None and is_archive_member(map_path):
+        inline = read_archive_member(map_path)
+    if inline is not None:
+        return io.TextIOWrapper(io.BytesIO(inline), encoding='utf-8')
+    return open(map_path, 'r', encoding='utf-8')
+
+
+def source_line(content, name):
+    """名称在原始源码中第一次出现的行号，找不到完整名称时依次尝试最后一段"""
+    for term in (name, name.rsplit('/', 1)[-1], name.rsplit('.', 1)[-1]):
+        index = content.find(term) if term else -1
+        if index != -1:
+            return content.count('\n', 0, index) + 1
+    return None
+
+
+def merge_extracted(values, found):
+    """把一段代码的提取结果合并到values，多处定义的同名消息合并字段并去重"""
+    for field_name, value in found.items():
+        if field_name == 'messages':
+            merged = values.setdefault(field_name, {})
+            for name, fields in value.items():
+                target = merged.setdefault(name, [])
+                target.extend(field for field in fields if field not in target)
+        elif field_name == 'wire_types':
+            merged = values.setdefault(field_name, {})
+            for name, fields in value.items():
+                target = merged.setdefault(name, {})
+                for number, wire_field in fields.items():
+                    target.setdefault(number, wire_field)
+        else:
+            values.setdefault(field_name, set()).update(value)
+
+
+def scan_js_source_map(file_path, map_path, inline, options=None):
+    """扫描source map的sourcesContent中grpc-web生成的原始模块，代替beautify整个bundle
+
+    各发现项记录首次出现的原始源文件和行号。没有匹配的原始源码时返回None，
+    由调用方回退到扫描bundle本身。
+    """
+    options = options or ScanOptions()
+    names = options.extractor_names()
+    minified = not options.beautify
+    values = {}
+    locations = {}
+    with open_source_map(map_path, inline) as stream:
+        for source, content in iter_source_map_sources(stream, is_grpc_source):
+            with profile_stage('beautify'):
+                js_content = content if minified else beautify_js_content(content)
+            found = run_extractors(names, js_content, minified,
+                                   extractor_timeout=options.extractor_timeout, backend=options.backend)
+            merge_extracted(values, found)
+            for value in found.values():
+                for name in sorted(value):
+                    if name not in locations:
+                        line = source_line(content, name)
+                        locations[name] = f'{source}:{line}' if line else source
+    if not locations and not values:
+        return None
+    result = build_js_result(file_path, values)
+    result.locations = locations
+    return result
+
+JS_CLOSERS = {'(': ')', '[': ']', '{': '}'}
+JS_STRING_LITERALS = {
+    '"': re.compile(r'"(?:[^"\\\n]|\\.)*"', re.S),
+    "'": re.compile(r"'(?:[^'\\\n]|\\.)*'", re.S),
+}
+# 模板字符串的一段：到结束的反引号或下一个 ${ 为止
+JS_TEMPLATE_PART = re.compile(r'(?:[^`\\$]|\\.|\$(?!\{))*(`|\$\{)', re.S)
+JS_REGEX_LITERAL = re.compile(r'/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*')
+# 斜杠前是这些字符或关键字时为正则字面量，否则为除号
+JS_REGEX_PRECEDERS = frozenset('(,=:[!&|?{};+-*%<>~^')
+JS_REGEX_KEYWORDS = frozenset(('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete',
+                               'void', 'throw', 'yield', 'await', 'instanceof'))
+
+
+@functools.lru_cache(maxsize=None)
+def js_scan_tokens(delimiters):
+    return re.compile('[' + re.escape('\'"`/{}()[]' + delimiters) + ']')
+
+
+def js_regex_allowed(content, index):
+    """index处的斜杠是否开始正则字面量：看前一个非空白字符或关键字"""
+    end = index
+    while end > 0 and content[end - 1].isspace():
+        end -= 1
+    if end == 0:
+        return True
+    char = content[end - 1]
+    if char in JS_REGEX_PRECEDERS:
+        return True
+    if char.isalnum() or char in '_$':
+        start = end - 1
+        while start > 0 and (content[start - 1].isalnum() or content[start - 1] in '_$'):
+            start -= 1
+        return content[start:end] in JS_REGEX_KEYWORDS
+    return False
+
+
+def skip_js_template(content, pos, stack):
+    """pos位于模板字符串内部，返回模板结束之后的位置；遇到 ${ 时压栈并返回表达式的起点"""
+    match = JS_TEMPLATE_PART.match(content, pos)
+    if match is None:
+        return len(content)
+    if match.group(1) == '${':
+        stack.append('`')
+    return match.end()
+
+
+def find_js_delimiter(content, pos, delimiters):
+    """从pos开始扫描JavaScript代码，返回第一个位于括号深度0的分隔符的位置
+
+    跳过字符串、模板字符串（含 ${} 嵌套）、注释和正则字面量，只用于切分代码块，
+    不做完整的语法分析。找不到分隔符或括号不匹配时返回-1。
+    """
+    tokens = js_scan_tokens(delimiters)
+    stack = []
+    while True:
+        match = tokens.search(content, pos)
+        if match is None:
+            return -1
+        index = match.start()
+        char = content[index]
+        pos = index + 1
+        if not stack and char in delimiters:
+            return index
+        if char in JS_CLOSERS:
+            stack.append(JS_CLOSERS[char])
+        elif char in ')]}':
+            if not stack:
+                return -1
+            expected = stack.pop()
+            if expected == '`' and char == '}':
+                pos = skip_js_template(content, pos, stack)
+            elif expected != char:
+                return -1
+        elif char in JS_STRING_LITERALS:
+            literal = JS_STRING_LITERALS[char].match(content, index)
+            if literal is not None:
+                pos = literal.end()
+        elif char == '`':
+            pos = skip_js_template(content, pos, stack)
+        elif char == '/':
+            following = content[pos:pos + 1]
+            if following == '/':
+                end = content.find('\n', pos)
+                pos = len(content) if end == -1 else end
+            elif following == '*':
+                end = content.find('*/', pos + 1)
+                pos = len(content) if end == -1 else end + 2
+            elif js_regex_allowed(content, index):
+                literal = JS_REGEX_LITERAL.match(content, index)
+                if literal is not None:
+                    pos = literal.end()
+
+
+def skip_js_template_literal(content, pos):
+    """pos位于模板字符串的反引号之后，返回整个模板字符串（含 ${} 中的表达式）结束之后的位置"""
+    stack = []
+    pos = skip_js_template(content, pos, stack)
+    while stack:
+        end = find_js_delimiter(content, pos, '}')
+        if end == -1:
+            return len(content)
+        stack.pop()
+        pos = skip_js_template(content, end + 1, stack)
+    return pos
+
+
+# tokens后端的词法单元：点号连接的标识符/数字链（jspb.Message.setField、this.getName、0.5）、
+# 字符串字面量或单个符号。空白由finditer的搜索跳过；斜杠和反引号（第1组）开始的注释、
+# 正则和模板字符串由iter_js_tokens处理后从其结束位置重新搜索
+JS_TOKEN = re.compile(r'[\w$]+(?:\.[\w$]+)*'
+                      r'|"[^"\\\n]*(?:\\.[^"\\\n]*)*"'
+                      r"|'[^'\\\n]*(?:\\.[^'\\\n]*)*'"
+                      r'|[^\s\w$/`]|(/[/*]?|`)')
+
+
+def iter_js_tokens(content, pos=0):
+    """单遍JavaScript词法分析，从pos开始逐个产出词法单元的文本
+
+    字符串和正则字面量产出完整的字面量文本，模板字符串只产出一个反引号，注释被跳过。
+    """
+    if not isinstance(content, str):
+        # mmap/bytes按latin-1解码：逐字节一一对应，不会因编码错误失败，关心的标识符都是ASCII
+        content = str(content, 'latin-1')
+    finditer = JS_TOKEN.finditer
+    previous = None
+    count = 0
+    while True:
+        for match in finditer(content, pos):
+            token = match.group()
+            count += 1
+            if not count & 0xFFFF:
+                check_time_budget()
+            if match.lastindex is None:
+                previous = token
+                yield token
+                continue
+            pos = match.end()
+            if token == '//':
+                end = content.find('\n', pos)
+                pos = len(content) if end == -1 else end
+                break
+            if token == '/*':
+                end = content.find('*/', pos)
+                pos = len(content) if end == -1 else end + 2
+                break
+            if token == '`':
+                pos = skip_js_template_literal(content, pos)
+                previous = token
+                yield token
+                break
+            if previous is None or previous in JS_REGEX_PRECEDERS or previous in JS_REGEX_KEYWORDS:
+                literal = JS_REGEX_LITERAL.match(content, pos - 1)
+                if literal is not None:
+                    pos = literal.end()
+                    previous = literal.group()
+                    yield previous
+                    break
+            previous = token
+            yield token
+        else:
+            return
+
+
+def read_js_function(tokens):
+    """tokens位于function关键字之后，读取 (参数名列表, 函数体的词法单元列表)，不是函数定义时返回None
+
+    函数体在内容末尾被截断时（流式窗口）返回已读到的部分。
+    """
+    token = next(tokens, None)
+    if token is not None and token != '(':
+        token = next(tokens, None)  # 具名函数表达式
+    if token != '(':
+        return None
+    params = []
+    for token in tokens:
+        if token == ')':
+            break
+        if token != ',':
+            params.append(token)
+    if next(tokens, None) != '{':
+        return None
+    body = []
+    depth = 1
+    for token in tokens:
+        if token == '{':
+            depth += 1
+        elif token == '}':
+            depth -= 1
+            if not depth:
+                break
+        body.append(token)
+    return params, body
+
+
+def js_call_args(body, index):
+    """body[index]为调用的左括号，返回 (各参数的词法单元列表, 右括号之后的下标)"""
+    args = [[]]
+    depth = 0
+    for i in range(index + 1, len(body)):
+        token = body[i]
+        if token in JS_CLOSERS:
+            depth += 1
+        elif token in (')', ']', '}'):
+            if not depth:
+                return (args if args != [[]] else []), i + 1
+            depth -= 1
+        elif token == ',' and not depth:
+            args.append([])
+            continue
+        args[-1].append(token)
+    return (args if args != [[]] else []), len(body)
+
+
+def iter_js_calls(body):
+    """产出函数体中的方法调用 (下标, 被调用的点号链, 参数列表)"""
+    for i in range(len(body) - 1):
+        if body[i + 1] == '(' and '.' in body[i]:
+            args, _ = js_call_args(body, i + 1)
+            yield i, body[i], args
+
+
+def js_number(tokens):
+    """参数是单个整数字面量时返回其文本，否则返回None"""
+    if len(tokens) == 1 and tokens[0].isdigit():
+        return tokens[0]
+    return None
+
+
+def jspb_getter_field(name):
+    """getter名对应的字段名：bytes字段的 getX_asB64 / getX_asU8 归到字段X"""
+    return name.rpartition('_as')[0] or name
+
+
+def proto_type_name(chain):
+    """proto.pkg.Msg.toObject这类点号链中的消息名（去掉proto.前缀和末尾的方法名）"""
+    chain = chain.rpartition('.')[0] if chain.endswith(
+        ('.toObject', '.serializeBinaryToWriter', '.deserializeBinaryFromReader')) else chain
+    return chain[6:] if chain.startswith('proto.') else chain
+
+
+# protoc-gen-js setter中调用的jspb.Message方法，字段编号都是第二个参数
+JSPB_SETTERS = frozenset(('setField', 'setOneofField', 'setWrapperField', 'setOneofWrapperField',
+                          'setRepeatedField', 'setRepeatedWrapperField'))
+
+# writer/reader方法名（去掉write/read前缀及Repeated/Packed）对应的proto标量类型。
+# tokens后端的字段类型和wire_types提取器的线上类型都由这张表得出，新增的writer方法只需在此登记
+JSPB_WRITER_TYPES = {
+    'String': 'string',
+    'StringRequireUtf8': 'string',
+    'Bytes': 'bytes',
+    'Bool': 'bool',
+    'Float': 'float',
+    'Double': 'double',
+    'Enum': 'enum',  # 枚举定义不在生成代码中，生成proto时按线上编码相同的int32输出
+}
+for _bits in ('32', '64'):
+    for _kind in ('Int', 'Sint', 'Uint', 'Fixed', 'Sfixed'):
+        JSPB_WRITER_TYPES[_kind + _bits] = f'{_kind.lower()}{_bits}'
+        if _bits == '64':
+            JSPB_WRITER_TYPES[_kind + _bits + 'String'] = f'{_kind.lower()}{_bits}'
+
+# proto标量类型对应的正则后端setter类型名
+JSPB_SETTER_TYPES = {
+    'string': 'Proto3StringField',
+    'bytes': 'Proto3BytesField',
+    'int32': 'Proto3IntField',
+    'sint32': 'Proto3IntField',
+    'sfixed32': 'Proto3IntField',
+    'uint32': 'Proto3UintField',
+    'fixed32': 'Proto3UintField',
+    'int64': 'Proto3Int64Field',
+    'sint64': 'Proto3Int64Field',
+    'sfixed64': 'Proto3Int64Field',
+    'uint64': 'Proto3Uint64Field',
+    'fixed64': 'Proto3Uint64Field',
+    'bool': 'Proto3BoolField',
+    'float': 'Proto3FloatField',
+    'double': 'Proto3DoubleField',
+    'enum': 'Proto3EnumField',
+}
+
+# getter默认值和jspb getter方法推断出的标量类型
+JSPB_HINT_TYPES = {
+    'string': 'string',
+    'number': 'int32',
+    'double': 'double',
+    'bool': 'bool',
+    'bytes': 'bytes',
+}
+
+
+def wire_type(method, message_type=None):
+    """writer/reader方法名（去掉write/read前缀）对应的proto类型，无法确定时返回None"""
+    repeated = method.startswith(('Repeated', 'Packed'))
+    if repeated:
+        method = method[8 if method.startswith('Repeated') else 6:]
+    if method in ('Message', 'Group'):
+        base = message_type
+    else:
+        base = JSPB_WRITER_TYPES.get(method)
+    if base is None:
+        return None
+    return f'repeated {base}' if repeated else base
+
+
+def wire_map_type(args, verb, serializer):
+    """map字段的 f.serializeBinary(N, writer, keyWriter, valueWriter[, valueSerializer]) 或
+    jspb.Map.deserializeBinary(map, reader, keyReader, valueReader[, valueDeserializer]) 参数对应的map类型"""
+    if len(args) < 4 or not args[2] or not args[3]:
+        return None
+    key = JSPB_WRITER_TYPES.get(args[2][-1].rpartition(verb)[2])
+    value_type = None
+    if len(args) > 4 and args[4] and args[4][-1].endswith(serializer):
+        value_type = proto_type_name(args[4][-1])
+    value = wire_type(args[3][-1].rpartition(verb)[2], value_type)
+    return f'map<{key}, {value}>' if key and value else None
+
+
+def oneof_group_name(case_name):
+    """ContactCase -> contact，PaymentMethodCase -> payment_method"""
+    return re.sub(r'(?<=[a-z0-9])(?=[A-Z])', '_', case_name).lower()
+
+
+class JspbIndex:
+    """tokens后端：单遍扫描protoc-gen-js生成的代码，按消息和字段编号收集字段信息
+
+    setter给出字段名和setter类型，getter、toObject中的jspb调用给出默认值和嵌套消息，
+    repeatedFields_给出repeated字段，Case枚举给出oneof，serializeBinaryToWriter中的writer方法
+    和deserializeBinaryFromReader中的reader方法给出线上类型，最终合并为与正则后端相同的
+    [字段名, 类型, 编号] 列表，或wire_types的 {字段编号: [proto类型, 字段名, oneof名]}。
+    """
+
+    def __init__(self):
+        self.messages = {}  # 消息名 -> {字段编号: 字段信息}
+        self.getters = {}  # 消息名 -> {getter名: 字段编号}
+        self.unresolved = []  # 只知道getter名的字段线索：(消息名, getter名, 字段信息)
+        self.serialized = set()  # 定义了serializeBinaryToWriter/deserializeBinaryFromReader的消息
+
+    def field(self, message, number):
+        return self.messages.setdefault(message, {}).setdefault(number, {})
+
+    def scan(self, content, definitions=None):
+        """扫描整个内容；definitions为正则时只从其各个匹配位置读取一个定义"""
+        if definitions is None:
+            self.read_definitions(iter_js_tokens(content))
+            return self
+        if not isinstance(content, str):
+            content = str(content, 'latin-1')
+        for match in definitions.finditer(content):
+            self.read_definitions(iter_js_tokens(content, match.start()), first_only=True)
+        return self
+
+    def read_definitions(self, tokens, first_only=False):
+        chain = None
+        for token in tokens:
+            if chain is not None and token == '=':
+                token = next(tokens, None)
+                if token == 'function':
+                    definition = read_js_function(tokens)
+                    if definition is not None:
+                        self.define(chain, *definition)
+                    token = None
+                elif token == '[' and chain.endswith('.repeatedFields_'):
+                    self.repeated_fields(proto_type_name(chain[:-16]), tokens)
+                    token = None
+                elif token == '{' and chain.endswith('Case'):
+                    self.oneof_cases(proto_type_name(chain), tokens)
+                    token = None
+                if first_only:
+                    return
+                if token is None:
+                    chain = None
+                    continue
+            chain = token if token.startswith('proto.') else None
+
+    def define(self, chain, params, body):
+        message, _, method = chain.partition('.prototype.')
+        if method:
+            message = proto_type_name(message)
+            if method.startswith('set') and '.' not in method:
+                self.setter(message, method[3:], body)
+            elif method.startswith('get') and '.' not in method:
+                self.getter(message, method[3:], body)
+        elif chain.endswith('.toObject') and len(params) > 1:
+            self.to_object(proto_type_name(chain), params[1], body)
+        elif chain.endswith('.serializeBinaryToWriter') and len(params) > 1:
+            self.writer(proto_type_name(chain), params[0], params[1], body)
+        elif chain.endswith('.deserializeBinaryFromReader') and len(params) > 1:
+            self.reader(proto_type_name(chain), params[0], params[1], body)
+
+    def setter(self, message, name, body):
+        for _, callee, args in iter_js_calls(body):
+            method = callee.rpartition('.')[2]
+            if method in JSPB_SETTERS or method.startswith('setProto3'):
+                number = js_number(args[1]) if len(args) > 1 else None
+                if number is not None:
+                    info = self.field(message, number)
+                    info['name'] = name
+                    info['setter'] = method[3:]
+                return
+
+    def getter(self, message, name, body):
+        for _, callee, args in iter_js_calls(body):
+            method = callee.rpartition('.')[2]
+            if method in ('bytesAsB64', 'bytesAsU8', 'bytesListAsB64', 'bytesListAsU8'):
+                # getX_asB64/getX_asU8：getX返回的字段是bytes
+                self.unresolved.append((message, jspb_getter_field(name), {'hint': 'bytes'}))
+                return
+            number, hints = self.getter_call(method, args)
+            if number is not None:
+                self.getters.setdefault(message, {})[name] = number
+                self.field(message, number).update(hints)
+                return
+
+    @staticmethod
+    def getter_call(method, args):
+        """jspb.Message的getter调用，返回 (字段编号, 类型线索)，不是getter调用时编号为None"""
+        if method in ('getWrapperField', 'getRepeatedWrapperField'):
+            if len(args) < 3:
+                return None, {}
+            hints = {'message': proto_type_name(''.join(args[1]))}
+            if method == 'getRepeatedWrapperField':
+                hints['repeated'] = True
+            return js_number(args[2]), hints
+        if not method.startswith('get') or 'Field' not in method or len(args) < 2:
+            return None, {}
+        hints = {}
+        if method == 'getFieldWithDefault' and len(args) > 2 and args[2]:
+            default = args[2][-1]
+            if default[0] in '"\'':
+                hints['hint'] = 'string'
+            elif default in ('true', 'false'):
+                hints['hint'] = 'bool'
+            elif default[0].isdigit():
+                hints['hint'] = 'double' if '.' in default else 'number'
+        elif 'Boolean' in method:
+            hints['hint'] = 'bool'
+        elif 'FloatingPoint' in method:
+            hints['hint'] = 'double'
+        if method.startswith('getRepeated'):
+            hints['repeated'] = True
+        elif method == 'getMapField':
+            hints['map'] = True
+        return js_number(args[1]), hints
+
+    def repeated_fields(self, message, tokens):
+        for token in tokens:
+            if token == ']':
+                return
+            if token.isdigit():
+                self.field(message, token)['repeated'] = True
+
+    def oneof_cases(self, chain, tokens):
+        """oneof的Case枚举：proto.pkg.Msg.ContactCase = {CONTACT_NOT_SET: 0, EMAIL: 10, ...}"""
+        cases = {}
+        key = None
+        for token in tokens:
+            if token == '}':
+                break
+            if token in (':', ','):
+                continue
+            if key is None:
+                key = token
+            else:
+                cases[key] = token
+                key = None
+        message, _, case_name = chain[:-len('Case')].rpartition('.')
+        if not message or not any(key.endswith('_NOT_SET') and value == '0' for key, value in cases.items()):
+            return
+        group = oneof_group_name(case_name)
+        for value in cases.values():
+            if value != '0' and value.isdigit():
+                self.field(message, value).setdefault('oneof', group)
+
+    def to_object(self, message, msg_param, body):
+        self.messages.setdefault(message, {})
+        try:
+            start = next(i for i in range(1, len(body)) if body[i] == '{' and body[i - 1] == '=')
+        except StopIteration:
+            return
+        getter_prefix = msg_param + '.get'
+        key = None
+        depth = 0
+        expression = []
+        for token in body[start + 1:]:
+            if token in JS_CLOSERS:
+                depth += 1
+            elif token in (')', ']', '}'):
+                if not depth:
+                    break
+                depth -= 1
+            elif token == ',' and not depth:
+                self.object_entry(message, key, expression, getter_prefix)
+                key = None
+                expression = []
+                continue
+            if key is None:
+                key = token.strip('"\'')
+            elif expression or token != ':':
+                expression.append(token)
+        if key is not None:
+            self.object_entry(message, key, expression, getter_prefix)
+
+    def object_entry(self, message, key, expression, getter_prefix):
+        """toObject中的一个 键: 表达式，键名（首字母大写）用作没有setter时的字段名"""
+        info = {'name': key[:1].upper() + key[1:]}
+        getter = None
+        for i, callee, args in iter_js_calls(expression):
+            method = callee.rpartition('.')[2]
+            number, hints = self.getter_call(method, args)
+            if number is not None:
+                info.update(hints)
+                self.merge_field(message, number, info)
+                return
+            if callee.startswith(getter_prefix):
+                getter = jspb_getter_field(callee[len(getter_prefix):])
+            elif method == 'toObjectList' and len(args) > 1:
+                info['repeated'] = True
+                info['message'] = proto_type_name(''.join(args[1]))
+            elif method == 'toObject' and callee.startswith('proto.'):
+                info['message'] = proto_type_name(callee)
+        if getter is not None:
+            self.unresolved.append((message, getter, info))
+
+    def writer(self, message, msg_param, writer_param, body):
+        self.messages.setdefault(message, {})
+        self.serialized.add(message)
+        getter_prefix = msg_param + '.get'
+        write_prefix = writer_param + '.write'
+        getter = None
+        for _, callee, args in iter_js_calls(body):
+            if callee.startswith(getter_prefix):
+                getter = jspb_getter_field(callee[len(getter_prefix):])
+                continue
+            if callee.startswith(write_prefix):
+                number = js_number(args[0]) if args else None
+                if number is None:
+                    continue
+                info = {'writer': callee[len(write_prefix):]}
+                if len(args) > 2 and args[2] and args[2][-1].endswith('.serializeBinaryToWriter'):
+                    info['message'] = proto_type_name(args[2][-1])
+                info['wire'] = wire_type(info['writer'], info.get('message'))
+            elif callee.endswith('.serializeBinary') and len(args) > 1 and args[1] == [writer_param]:
+                # map字段：f.serializeBinary(N, writer, keyWriter, valueWriter, valueSerializer)
+                number = js_number(args[0])
+                if number is None:
+                    continue
+                info = {'map': True, 'wire': wire_map_type(args, '.write', '.serializeBinaryToWriter')}
+            else:
+                continue
+            if getter is not None:
+                info['name'] = getter
+                self.getters.setdefault(message, {}).setdefault(getter, number)
+            self.merge_field(message, number, info)
+            getter = None
+
+    def reader(self, message, msg_param, reader_param, body):
+        """deserializeBinaryFromReader：case N之后的第一个read方法给出类型，msg.setX/addX给出字段名"""
+        self.messages.setdefault(message, {})
+        self.serialized.add(message)
+        read_prefix = reader_param + '.read'
+        cases = [(i, body[i + 1]) for i in range(len(body) - 2)
+                 if body[i] == 'case' and body[i + 1].isdigit() and body[i + 2] == ':']
+        case_index = 0
+        number = None
+        for i, callee, args in iter_js_calls(body):
+            while case_index < len(cases) and cases[case_index][0] < i:
+                number = cases[case_index][1]
+                case_index += 1
+            if number is None:
+                continue
+            info = self.field(message, number)
+            if callee.startswith(read_prefix):
+                if info.get('read') is None:
+                    message_type = None
+                    if len(args) > 1 and args[1] and args[1][-1].endswith('.deserializeBinaryFromReader'):
+                        message_type = proto_type_name(args[1][-1])
+                    info['read'] = wire_type(callee[len(read_prefix):], message_type)
+            elif callee.endswith('.deserializeBinary') and len(args) > 3:
+                # map字段：jspb.Map.deserializeBinary(map, reader, keyReader, valueReader, valueDeserializer)
+                info['read'] = wire_map_type(args, '.read', '.deserializeBinaryFromReader')
+            elif callee.startswith(msg_param + '.'):
+                verb, name = callee[len(msg_param) + 1:][:3], callee[len(msg_param) + 4:]
+                if verb in ('set', 'add', 'get') and name:
+                    self.merge_field(message, number, {'name': name + 'List' if verb == 'add'
+                                                       else jspb_getter_field(name)})
+                    if verb == 'add':
+                        info['repeated'] = True
+
+    def merge_field(self, message, number, info):
+        """合并字段线索，先前得到的字段名不被覆盖"""
+        field = self.field(message, number)
+        for key, value in info.items():
+            if key != 'name' or 'name' not in field:
+                field[key] = value
+
+    def resolve(self):
+        """把只知道getter名的线索按getter -> 编号关联到字段上"""
+        for message, getter, info in self.unresolved:
+            number = self.getters.get(message, {}).get(getter)
+            if number is not None:
+                self.merge_field(message, number, info)
+        self.unresolved = []
+
+    @staticmethod
+    def field_type(info):
+        """由字段线索得出类型：writer方法 > proto3 setter > getter默认值，repeated标量为Repeated<...>"""
+        setter = info.get('setter', '')
+        if info.get('map'):
+            return 'MapField'
+        if info.get('message'):
+            return setter or ('RepeatedWrapperField' if info.get('repeated') else 'WrapperField')
+        writer = info.get('writer', '')
+        repeated = info.get('repeated', False)
+        for prefix in ('Repeated', 'Packed'):
+            if writer.startswith(prefix):
+                writer = writer[len(prefix):]
+                repeated = True
+        proto_type = JSPB_WRITER_TYPES.get(writer)
+        if proto_type is None and setter.startswith('Proto3'):
+            return setter
+        if proto_type is None:
+            proto_type = JSPB_HINT_TYPES.get(info.get('hint'))
+        if proto_type is None:
+            return setter or 'Field'
+        base = JSPB_SETTER_TYPES[proto_type]
+        return f'Repeated<{base}>' if repeated else base
+
+    def merge_into(self, message_list):
+        """按字段编号去重合并到 {消息名: [[字段名, 类型, 编号], ...]}"""
+        self.resolve()
+        for message, fields in self.messages.items():
+            target = message_list.setdefault(message, [])
+            numbers = {field[2] for field in target}
+            for number in sorted(fields, key=int):
+                info = fields[number]
+                if number not in numbers and 'name' in info:
+                    target.append([info['name'], self.field_type(info), number])
+        return message_list
+
+    def merge_wire_types(self, wire_types):
+        """按字段编号去重合并到 {消息名: {字段编号: [proto类型, 字段名, oneof名]}}
+
+        以writer为准，reader补充writer中没有的字段；只输出定义了序列化函数的消息。
+        """
+        self.resolve()
+        for message, fields in self.messages.items():
+            if message not in self.serialized:
+                continue
+            merged = wire_types.setdefault(message, {})
+            for number in sorted(fields, key=int):
+                info = fields[number]
+                proto_type = info.get('wire')
+                if proto_type is None:
+                    proto_type = info.get('read')
+                    if proto_type and info.get('repeated') and not proto_type.startswith(('repeated ', 'map<')):
+                        proto_type = f'repeated {proto_type}'
+                if proto_type:
+                    merged.setdefault(number, [proto_type, info.get('name', ''), info.get('oneof', '')])
+        return wire_types
+
+
+def extract_message_tokens(content, message_list=None):
+    """tokens后端的消息提取：不需要beautify，对压缩和未压缩的代码结果相同"""
+    if message_list is None:
+        message_list = {}
+    return JspbIndex().scan(content).merge_into(message_list)
+
+
+# 线上类型只需要序列化函数和oneof的Case枚举：JspbIndex只从这些定义处开始分词，
+# 不必对整个bundle做词法分析
+JSPB_WIRE_DEFINITIONS = re.compile(
+    r'proto\.[\w$.]+?(?:\.(?:serializeBinaryToWriter|deserializeBinaryFromReader)\s*=\s*function\b|Case\s*=\s*\{)')
+
+
+def extract_wire_types(content, anchors=None, wire_types=None):
+    """由JspbIndex索引serializeBinaryToWriter中的writer调用和deserializeBinaryFromReader中的reader调用
+
+    得到 {消息名: {字段编号: [proto类型, 字段名, oneof名]}}，以writer为准，reader补充writer中没有的字段。
+    流式扫描时各窗口独立索引（函数不跨越重叠区即可），结果按字段编号去重合并到wire_types。
+    """
+    if wire_types is None:
+        wire_types = {}
+    marker = 'serializeBinary' if isinstance(content, str) else b'serializeBinary'
+    if content.find(marker) == -1:
+        return wire_types
+    return JspbIndex().scan(content, JSPB_WIRE_DEFINITIONS).merge_wire_types(wire_types)
+
+
+# webpack模块表的开括号：JSONP分块 .push([[ids],{...}])、webpack 4启动函数的参数 }({...}) / }([...])、
+# webpack 5运行时的 var e={...}；开括号之后必须紧跟一个模块函数
+WEBPACK_MODULE_TABLE = re.compile(
+    r'(?:\.push\(\[\[[^\[\]]*\]\s*,\s*|\}\s*\(\s*|\b(?:var|let|const)\s+[\w$]+\s*=\s*\(?\s*)([{\[])'
+    r'(?=[\s,]*(?:(?:\d+|"[^"\n]*"|\'[^\'\n]*\')\s*:\s*)?(?:function\b|\([\w$,\s]*\)\s*=>|[\w$]+\s*=>))')
+WEBPACK_MODULE_KEY = re.compile(r'\s*(\d+|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\')\s*:')
+
+# ESM分块中含gRPC特征的语句前后该长度内的语句一并纳入片段，同一原始模块中
+# 不含特征的元数据、错误处理等语句不会被单独丢弃
+ESM_RUN_GAP = 16 * 1024
+
+# Rollup/Vite的ESM分块：顶层的import/export语句
+ESM_SYNTAX = re.compile(r'(?:^|[;}])\s*(?:import\s*[\w${*"\']|export\s*[{*]|'
+                        r'export\s+(?:default|const|let|var|function|class|async)\b)', re.M)
+
+
+def iter_webpack_modules(content):
+    """识别webpack 4/5的模块表，逐个产出模块函数的 (模块ID, 起点, 终点)"""
+    pos = 0
+    while True:
+        table = WEBPACK_MODULE_TABLE.search(content, pos)
+        if table is None:
+            return
+        opening = table.group(1)
+        closer = JS_CLOSERS[opening]
+        index = pos = table.end(1)
+        number = 0
+        while True:
+            key = WEBPACK_MODULE_KEY.match(content, index) if opening == '{' else None
+            if key is not None:
+                module_id = key.group(1).strip('"\'')
+                start = key.end()
+            else:
+                module_id = str(number)  # 数组形式的模块表以下标为模块ID
+                start = index
+            end = find_js_delimiter(content, start, ',' + closer)
+            if end == -1:
+                break  # 括号不匹配，模块表的其余部分当作普通代码
+            if content[start:end].strip():
+                yield module_id, start, end
+            number += 1
+            pos = end + 1
+            if content[end] == closer:
+                break
+            index = end + 1
+
+
+def iter_toplevel_statements(content):
+    """按括号深度0的分号切分顶层语句，产出 (起点, 终点)"""
+    pos = 0
+    while pos < len(content):
+        end = find_js_delimiter(content, pos, ';')
+        if end == -1:
+            yield pos, len(content)
+            return
+        yield pos, end + 1
+        pos = end + 1
+
+
+def index_grpc_modules(content, marker):
+    """把bundle切分为模块，返回含gRPC特征的片段 [(模块ID, 起点, 终点)]
+
+    webpack模块表中的每个模块函数单独成片，模块之间的启动代码等片段的ID为None；
+    Rollup/Vite的ESM分块没有模块包装，按顶层语句切分，含特征的语句连同前后ESM_RUN_GAP
+    范围内的语句组成片段，重叠的片段合并，ID为片段起点的偏移。无法识别模块边界时返回None。
+    """
+    modules = list(iter_webpack_modules(content))
+    if modules:
+        slices = []
+        pos = 0
+        for module_id, start, end in modules:
+            if start > pos:
+                slices.append((None, pos, start))
+            slices.append((module_id, start, end))
+            pos = end
+        if pos < len(content):
+            slices.append((None, pos, len(content)))
+        return [piece for piece in slices if marker.search(content, piece[1], piece[2])]
+    
+    if not ESM_SYNTAX.search(content):
+        return None
+    statements = list(iter_toplevel_statements(content))
+    starts = [start for start, _ in statements]
+    ends = [end for _, end in statements]
+    runs = []
+    for start, end in statements:
+        if marker.search(content, start, end) is None:
+            continue
+        run_start = starts[bisect.bisect_left(starts, start - ESM_RUN_GAP)]
+        run_end = ends[bisect.bisect_right(ends, end + ESM_RUN_GAP) - 1]
+        if runs and run_start <= runs[-1][2]:
+            runs[-1] = (runs[-1][0], runs[-1][1], max(runs[-1][2], run_end))
+        else:
+            runs.append((f'@{run_start}', run_start, run_end))
+    return runs
+
+
+def scan_js_modules(content, file_path, options=None):
+    """只对含gRPC特征的模块执行beautify和提取，并按模块记录其中的消息
+
+    无法识别模块边界时返回None，由调用方回退到处理整个文件。
+    """
+    options = options or ScanOptions()
+    names = options.extractor_names()
+    with profile_stage('split'):
+        modules = index_grpc_modules(content, prefilter_pattern(names, binary=False))
+    if modules is None:
+        return None
+    minified = not options.beautify
+    values = {}
+    module_messages = {}
+    for module_id, start, end in modules:
+        with profile_stage('beautify'):
+            js_content = content[start:end] if minified else beautify_js_content(content[start:end])
+        found = run_extractors(names, js_content, minified, extractor_timeout=options.extractor_timeout,
+                               backend=options.backend)
+        merge_extracted(values, found)
+        if module_id is not None:
+            module_messages[module_id] = sorted(found.get('messages', {}))
+    result = build_js_result(file_path, values)
+    result.modules = module_messages
+    return result
+
+def process_single_file(file_path, print_results=True, cache=None, options=None):
+    options = options or ScanOptions()
+    if not options.profile:
+        return scan_single_file_with_budget(file_path, print_results, cache, options)
+    
+    # 在当前线程上启用计时，结果写入缓存之后才附加耗时，缓存中不保存计时数据
+    profiler = Profiler()
+    with profiler.activate(), profiler.stage('total'):
+        result = scan_single_file_with_budget(file_path, print_results, cache, options)
+    result.timings = profiler.report()
+    return result
+
+def scan_single_file_with_budget(file_path, print_results, cache, options):
+    """在单文件时间预算内扫描，超时记录为FileResult.error"""
+    if not options.timeout:
+        return scan_single_file(file_path, print_results, cache, options)
+    try:
+        with time_budget(options.timeout, 'file'):
+            return scan_single_file(file_path, print_results, cache, options)
+    except ScanTimeout as e:
+        # 超时也可能发生在scan_single_file的异常处理之外
+        if print_results:
+            print(f"{Fore.RED}Error processing file {file_path}: {e}{Style.RESET_ALL}")
+        return FileResult(file_path=file_path, error=str(e))
+
+def scan_single_file(file_path, print_results, cache, options):
+    try:
+        with profile_stage('prefilter'):
+            skip = (options.prefilter and file_path.endswith('.js')
+                    and not has_grpc_markers(file_path, options.extractors))
+        if skip:
+            if print_results:
+                print(f"\n{Fore.CYAN}=== Skipped {file_path} (no gRPC markers) ==={Style.RESET_ALL}")
+            return FileResult(file_path=file_path, skipped=True)
+        
+        # 流式和mmap模式下不整体读取JavaScript文件；归档成员已解压在内存中，流式模式下按普通内容扫描
+        streaming = ((options.mmap or (options.stream and not is_archive_member(file_path)))
+                     and file_path.endswith('.js'))
+        with profile_stage('read'):
+            content = None if streaming else read_file(file_path)
+        
+        # 根据文件类型选择处理方式
+        if file_path.endswith('.proto'):
+            # 处理proto文件，按内容哈希缓存解析结果
+            with profile_stage('cache'):
+                cache_key = ResultCache.make_key(content, 'proto') if cache else None
+                result = cache.get(cache_key, file_path) if cache else None
+            if result is None:
+                with profile_stage('parse'):
+                    result = scan_proto_content(content, file_path)
+                if cache:
+                    result.cache_hit = False
+                    cache.put(cache_key, result)
+            
+            if print_results:
+                print(f"\n{Fore.CYAN}=== Processing Proto File: {file_path} ==={Style.RESET_ALL}")
+                
+                if result.endpoints:
+                    print(f"\n{Fore.GREEN}Found Endpoints:{Style.RESET_ALL}")
+                    for endpoint in result.endpoints:
+                        print(f"  {Fore.YELLOW}{endpoint}{Style.RESET_ALL}")
+                
+                if result.messages:
+                    print(f"\n{Fore.GREEN}Found Messages:{Style.RESET_ALL}")
+                    for msg_name, msg_fields in result.messages.items():
+                        print(f"\n{Fore.YELLOW}{msg_name}:{Style.RESET_ALL}")
+                        if msg_fields:
+                            print(create_table(
+                                columns_list=['Field Name', 'Field Type', 'Field Number'],
+                                rows_list=msg_fields
+                            ))
+            
+            return result
+        
+        elif file_path.endswith('.ts'):
+            # 处理TypeScript文件，与JavaScript共用工作池和缓存
+            with profile_stage('cache'):
+                cache_key = ResultCache.make_key(content, f"ts:{options.cache_tag()}") if cache else None
+                result = cache.get(cache_key, file_path) if cache else None
+            if result is None:
+                with profile_stage('parse'):
+                    result = scan_ts_content(content, file_path)
+                if cache:
+                    result.cache_hit = False
+                    cache.put(cache_key, result)
+            
+            if print_results:
+                print(f"\n{Fore.CYAN}=== Processing TypeScript File: {file_path} ==={Style.RESET_ALL}")
+                
+                if result.services:
+                    print(f"\n{Fore.GREEN}Found Services:{Style.RESET_ALL}")
+                    for service in result.services:
+                        print(f"  {Fore.YELLOW}{service}{Style.RESET_ALL}")
+                
+                if result.messages:
+                    print(f"\n{Fore.GREEN}Found Messages:{Style.RESET_ALL}")
+                    for msg_name, fields in result.messages.items():
+                        print(f"\n{Fore.YELLOW}{msg_name}:{Style.RESET_ALL}")
+                        if fields:
+                            print(create_table(
+                                columns_list=['Field Name', 'Field Type', 'Field Number'],
+                                rows_list=fields
+                            ))
+                
+                if result.endpoints:
+                    print(f"\n{Fore.GREEN}Found Methods:{Style.RESET_ALL}")
+                    for method in result.endpoints:
+                        print(f"  {Fore.YELLOW}{method}{Style.RESET_ALL}")
+            
+            return result
+                        
+        else:
+            # 处理JavaScript文件，内容未变化时直接使用缓存结果
+            cache_key = None
+            source_map = None
+            if options.source_maps:
+                with profile_stage('sourcemap'):
+                    source_map = locate_source_map(file_path)
+            with profile_stage('cache'):
+                if cache:
+                    kind = f"js:{options.cache_tag()}"
+                    if source_map is not None and source_map[0] is not None:
+                        # 外部source map的内容也决定结果，摘要参与缓存键
+                        try:
+                            kind += ':' + ResultCache.make_file_key(source_map[0], 'map').split(':', 1)[0]
+                        except (OSError, ValueError, KeyError):
+                            source_map = None  # 读不到source map时按bundle本身缓存和扫描
+                    if streaming:
+                        cache_key = ResultCache.make_file_key(file_path, kind)
+                    else:
+                        cache_key = ResultCache.make_key(content, kind)
+                result = cache.get(cache_key, file_path) if cache else None
+            if result is None and source_map is not None:
+                try:
+                    result = scan_js_source_map(file_path, *source_map, options)
+                except (OSError, ValueError, KeyError) as e:
+                    # source map缺失或损坏时回退到扫描bundle本身（归档中缺少的成员为KeyError）
+                    if print_results:
+                        print(f"{Fore.YELLOW}Ignoring source map of {file_path}: {e}{Style.RESET_ALL}")
+                    result = None
+                if result is not None and cache:
+                    result.cache_hit = False
+                    cache.put(cache_key, result)
+            if result is None:
+                if options.mmap:
+                    result = scan_js_mmap(file_path, options)
+                elif streaming:
+                    result = scan_js_stream(file_path, options)
+                else:
+                    result = scan_js_content(content, file_path, options)
+                if cache:
+                    result.cache_hit = False
+                    cache.put(cache_key, result)
+            
+            endpoints = result.endpoints
+            messages = result.messages
+            services = result.services
+            proto_content = result.proto_content
+            
+            if print_results:
+                print(f"\n{Fore.CYAN}=== Processing {file_path} ==={Style.RESET_ALL}")
+                locations = result.locations or {}
+                
+                if endpoints:
+                    print(f"\n{Fore.GREEN}Found Endpoints:{Style.RESET_ALL}")
+                    for endpoint in endpoints:
+                        location = f" {Fore.BLUE}({locations[endpoint]})" if endpoint in locations else ""
+                        print(f"  {Fore.YELLOW}{endpoint}{location}{Style.RESET_ALL}")
+                
+                if services:
+                    print(f"\n{Fore.GREEN}Found Services:{Style.RESET_ALL}")
+                    for service in services:
+                        print(f"  {Fore.YELLOW}{service}{Style.RESET_ALL}")
+                
+                if result.modules:
+                    print(f"\n{Fore.GREEN}gRPC Modules:{Style.RESET_ALL}")
+                    for module_id, module_messages in result.modules.items():
+                        print(f"  {Fore.YELLOW}{module_id}{Style.RESET_ALL}: {len(module_messages)} messages")
+                
+                if messages:
+                    print(f"\n{Fore.GREEN}Found Messages:{Style.RESET_ALL}")
+                    for msg_name, msg_fields in messages.items():
+                        location = f" {Fore.BLUE}({locations[msg_name]})" if msg_name in locations else ""
+                        print(f"\n{Fore.YELLOW}{msg_name}:{location}{Style.RESET_ALL}")
+                        print(create_table(
+                            columns_list=['Field Name', 'Field Type', 'Field Number'],
+                            rows_list=msg_fields
+                        ))
+                        
+                        # 添加示例数据输出
+                        print(f"\n{Fore.BLUE}Example Data:{Style.RESET_ALL}")
+                        examples = generate_example_data(msg_fields)
+                        for example in examples:
+                            print(f"  {Fore.CYAN}{example}{Style.RESET_ALL}")
+                        print()  # 添加空行分隔
+                    
+                    # 添加proto文件内容输出
+                    if proto_content:
+                        print(f"\n{Fore.GREEN}Proto File Definition:{Style.RESET_ALL}")
+                        print(f"{Fore.CYAN}{proto_content}{Style.RESET_ALL}")
+            
+            return result
+            
+    except Exception as e:
+        error_msg = str(e)
+        if print_results:
+            print(f"{Fore.RED}Error processing file {file_path}: {error_msg}{Style.RESET_ALL}")
+        return FileResult(file_path=file_path, error=error_msg)
+
+def process_file_batch(file_paths, cache=None, options=None, contents=None):
+    """在工作进程中批量处理一组文件，返回可序列化的FileResult列表和各文件耗时
+
+    contents为遍历线程已读出的归档成员内容（虚拟路径 -> bytes）。
+    """
+    results = []
+    elapsed = []
+    for file_path in file_paths:
+        start = time.perf_counter()
+        preloaded = {file_path: contents[file_path]} if contents and file_path in contents else None
+        with archive_members(preloaded):
+            results.append(process_single_file(file_path, False, cache, options))
+        elapsed.append(time.perf_counter() - start)
+    return results, elapsed
+
+
+# 目录扫描时处理的文件类型
+SCAN_EXTENSIONS = ('.js', '.ts', '.proto')
+
+# 按大小调度时，小文件合并为一个任务的字节上限；超过该值的文件单独成为一个任务
+SMALL_BATCH_BYTES = 256 * 1024
+
+
+# 作为虚拟目录扫描的归档类型
+ARCHIVE_EXTENSIONS = {
+    'zip': ('.zip', '.apk', '.aab', '.ipa', '.jar', '.aar', '.xpi'),
+    'tar': ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz'),
+    'asar': ('.asar',),
+}
+
+# 虚拟路径中归档文件与成员路径的分隔符，如 app.tar.gz!/static/js/main.js
+ARCHIVE_SEPARATOR = '!/'
+
+
+def archive_kind(file_path):
+    """按扩展名判断归档类型，不是归档时返回None"""
+    lower = file_path.lower()
+    for kind, extensions in ARCHIVE_EXTENSIONS.items():
+        if lower.endswith(extensions):
+            return kind
+    return None
+
+
+def is_archive_member(file_path):
+    return ARCHIVE_SEPARATOR in file_path and split_archive_path(file_path) is not None
+
+
+def split_archive_path(file_path):
+    """把虚拟路径拆分为 (归档路径, 成员路径)，不是归档成员时返回None"""
+    index = file_path.find(ARCHIVE_SEPARATOR)
+    while index != -1:
+        archive_path = file_path[:index]
+        if archive_kind(archive_path) is not None:
+            return archive_path, file_path[index + len(ARCHIVE_SEPARATOR):]
+        index = file_path.find(ARCHIVE_SEPARATOR, index + 1)
+    return None
+
+
+def is_scan_member(name):
+    """归档成员是否需要扫描：只看名称，与目录遍历一样跳过node_modules"""
+    return name.endswith(SCAN_EXTENSIONS) and 'node_modules' not in name.split('/')[:-1]
+
+
+def open_zip_archive(archive_path):
+    """打开zip归档并按进程缓存：中央目录只解析一次，ZipFile支持多线程并发读取成员
+
+    fork出的工作进程继承父进程已打开的文件描述符，与父进程和其他工作进程共用同一个文件偏移，
+    并发读取时互相移动读取位置，因此每个进程使用自己打开的ZipFile。
+    """
+    return _open_zip_archive(archive_path, os.getpid())
+
+
+@functools.lru_cache(maxsize=16)
+def _open_zip_archive(archive_path, pid):
+    return zipfile.ZipFile(archive_path)
+
+
+@functools.lru_cache(maxsize=16)
+def asar_index(archive_path):
+    """解析Electron asar头部，返回 {成员路径: (数据偏移, 大小, 是否unpacked)}
+
+    asar以两个Chromium pickle开头：第一个记录头部pickle的长度，第二个是JSON文件树，
+    文件数据紧跟在头部之后，偏移量相对于数据区起点。
+    """
+    with open(archive_path, 'rb') as f:
+        _, header_size = struct.unpack('<II', f.read(8))
+        header = f.read(header_size)
+    _, json_size = struct.unpack('<II', header[:8])
+    tree = json.loads(header[8:8 + json_size].decode('utf-8'))
+    base = 8 + header_size
+    
+    index = {}
+    stack = [('', tree)]
+    while stack:
+        prefix, node = stack.pop()
+        for name, child in node.get('files', {}).items():
+            member = f'{prefix}{name}'
+            if 'files' in child:
+                stack.append((f'{member}/', child))
+            elif 'size' in child:
+                offset = base + int(child.get('offset', 0))
+                index[member] = (offset, child['size'], bool(child.get('unpacked')))
+    return index
+
+
+def read_asar_member(archive_path, member):
+    offset, size, unpacked = asar_index(archive_path)[member]
+    if unpacked:
+        # unpacked的文件存放在归档旁边的 <name>.asar.unpacked 目录中
+        with open(os.path.join(f'{archive_path}.unpacked', *member.split('/')), 'rb') as f:
+            return f.read()
+    with open(archive_path, 'rb') as f:
+        f.seek(offset)
+        return f.read(size)
+
+
+_archive_local = threading.local()
+
+
+@contextlib.contextmanager
+def archive_members(contents=None):
+    """在当前线程上登记归档成员内容，同一成员的预过滤和读取只解压一次
+
+    contents为遍历线程已顺序读出的成员（tar不支持廉价的随机访问）。
+    """
+    previous = getattr(_archive_local, 'members', None)
+    _archive_local.members = dict(contents or {})
+    try:
+        yield
+    finally:
+        _archive_local.members = previous
+
+
+def archive_member_exists(file_path):
+    """虚拟路径对应的归档成员是否存在且是普通文件，对应普通文件的os.path.isfile"""
+    members = getattr(_archive_local, 'members', None)
+    if members is not None and file_path in members:
+        return True
+    archive_path, member = split_archive_path(file_path)
+    kind = archive_kind(archive_path)
+    try:
+        if kind == 'zip':
+            return not open_zip_archive(archive_path).getinfo(member).is_dir()
+        if kind == 'asar':
+            return member in asar_index(archive_path)
+        with tarfile.open(archive_path, 'r:*') as archive:
+            return archive.getmember(member).isfile()
+    except (KeyError, OSError, ValueError, tarfile.TarError):
+        return False
+
+
+def read_archive_member(file_path):
+    """按虚拟路径读取归档成员的原始字节"""
+    members = getattr(_archive_local, 'members', None)
+    if members is not None and file_path in members:
+        return members[file_path]
+    archive_path, member = split_archive_path(file_path)
+    kind = archive_kind(archive_path)
+    if kind == 'zip':
+        data = open_zip_archive(archive_path).read(member)
+    elif kind == 'asar':
+        data = read_asar_member(archive_path, member)
+    else:
+        with tarfile.open(archive_path, 'r:*') as archive:
+            extracted = archive.extractfile(member)
+            if extracted is None:
+                raise ValueError(f'not a regular file in archive: {member}')
+            data = extracted.read()
+    if members is not None:
+        members[file_path] = data
+    return data
+
+
+def iter_archive_entries(archive_path):
+    """把归档当作虚拟目录遍历，逐个产出 (虚拟路径, 大小, 内容)
+
+    只根据成员名称过滤，不读取未命中的成员：zip读中央目录、asar读JSON头部，
+    内容为None，由工作线程/进程按需随机读取；tar只能顺序解压，命中的成员在此读出内容。
+    """
+    kind = archive_kind(archive_path)
+    prefix = f'{archive_path}{ARCHIVE_SEPARATOR}'
+    if kind == 'zip':
+        for info in open_zip_archive(archive_path).infolist():
+            if not info.is_dir() and is_scan_member(info.filename):
+                yield prefix + info.filename, info.file_size, None
+    elif kind == 'asar':
+        for member, (_, size, _) in sorted(asar_index(archive_path).items()):
+            if is_scan_member(member):
+                yield prefix + member, size, None
+    else:
+        with tarfile.open(archive_path, 'r|*') as archive:
+            for info in archive:
+                name = info.name[2:] if info.name.startswith('./') else info.name
+                if info.isfile() and is_scan_member(name):
+                    yield prefix + name, info.size, archive.extractfile(info).read()
+
+
+def walk_scan_files(dir_path, archives=True):
+    """遍历目录，逐个产出待扫描的文件路径（跳过node_modules）
+
+    archives为True时把遇到的归档当作虚拟目录，产出 (虚拟路径, 大小, 内容) 条目；
+    dir_path本身也可以是归档文件。
+    """
+    if archives and os.path.isfile(dir_path) and archive_kind(dir_path):
+        yield from iter_archive_entries(dir_path)
+        return
+    
+    for root, dirs, files in os.walk(dir_path):
+        if 'node_modules' in dirs:
+            dirs.remove('node_modules')
+            
         for file in files:
-            if file.endswith('.js'):
-                js_files.append(os.path.join(root, file))
-            elif file.endswith('.ts'):
-                ts_files.append(os.path.join(root, file))
-            elif file.endswith('.proto'):
-                proto_files.append(os.path.join(root, file))
-    
-    # 处理所有文件类型
-    all_files = js_files + ts_files
-    if all_files:
-        print(f"\n{Fore.CYAN}Processing Files...{Style.RESET_ALL}")
-        # 创建进度条
-        pbar = tqdm(total=len(all_files), desc="Scanning files", unit="file")
-        
-        # 使用线程池进行并发处理
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # 提交所有任务
-            future_to_file = {
-                executor.submit(process_single_file, file_path, False): file_path 
-                for file_path in all_files
-            }
+            if file.endswith(SCAN_EXTENSIONS):
+                yield os.path.join(root, file)
+            elif archives and archive_kind(file):
+                archive_path = os.path.join(root, file)
+                try:
+                    yield from iter_archive_entries(archive_path)
+                except (OSError, ValueError, KeyError, zipfile.BadZipFile, tarfile.TarError) as e:
+                    # 损坏的归档不影响其余文件的扫描
+                    tqdm.write(f"{Fore.RED}Error reading archive {archive_path}: {e}{Style.RESET_ALL}")
+
+
+def file_size(file_path):
+    """文件大小，无法stat时按0处理（读取错误由扫描阶段记录）"""
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
+class FileSource:
+    """待扫描文件的生产者：后台线程遍历路径并放入有界缓冲区
+
+    缓冲区满时遍历线程阻塞（背压），消费方边发现边提交任务，
+    无需等待整个目录遍历结束。order为'size'时遍历线程同时stat文件，
+    缓冲区是按大小排序的有界堆，消费方总是先取出已发现的最大文件（LPT），
+    少数大bundle不会排在最后形成长尾。
+    
+    条目可以是路径，也可以是归档成员的 (虚拟路径, 大小, 内容)；
+    携带内容的条目另按max_bytes限制缓冲的总字节数。
+    """
+
+    def __init__(self, file_paths, maxsize=1024, order='walk', max_bytes=64 * 1024 * 1024):
+        self.order = order
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.total = len(file_paths) if isinstance(file_paths, (list, tuple)) else None
+        self.count = 0  # 已取出的文件数
+        self.finished = False
+        self.error = None
+        self._items = [] if order == 'size' else deque()  # (-大小, 序号, 路径, 内容)
+        self._buffered = 0  # 缓冲区中成员内容的总字节数
+        self._done = False  # 遍历线程已结束
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._produce, args=(file_paths,), daemon=True)
+        self._thread.start()
+
+    def _produce(self, file_paths):
+        try:
+            for seq, item in enumerate(file_paths):
+                if isinstance(item, tuple):
+                    file_path, size, data = item
+                else:
+                    file_path, data = item, None
+                    size = file_size(file_path) if self.order == 'size' else 0
+                with self._cond:
+                    while self._items and (len(self._items) >= self.maxsize
+                                           or self._buffered >= self.max_bytes):
+                        self._cond.wait()
+                    if self.order == 'size':
+                        heapq.heappush(self._items, (-size, seq, file_path, data))
+                    else:
+                        self._items.append((-size, seq, file_path, data))
+                    if data is not None:
+                        self._buffered += len(data)
+                    self._cond.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            with self._cond:
+                self._done = True
+                self._cond.notify_all()
+
+    def _pop(self):
+        if self.order == 'size':
+            return heapq.heappop(self._items)
+        return self._items.popleft()
+
+    def get_batch(self, max_size, block=True, max_bytes=None):
+        """取出至多max_size个 (路径, 内容)，内容仅归档成员可能非None
+
+        block为True时至少等待一个路径或遍历结束；按大小调度的第一批还会等待缓冲区填满
+        （条目数或归档成员的字节数达到上限），从尽可能多的候选中挑出最大的文件。max_bytes限制一批文件的总大小：
+        大文件单独成批，小文件合并成批以减少任务调度开销。
+        """
+        batch = []
+        with self._cond:
+            if self.finished:
+                return batch
+            if block:
+                warmup = self.order == 'size' and self.count == 0
+                # 缓冲区按条目数或字节数达到上限时遍历线程已阻塞，不能再等待
+                while not self._done and (not self._items or
+                                          (warmup and len(self._items) < self.maxsize
+                                           and self._buffered < self.max_bytes)):
+                    self._cond.wait()
+            batch_bytes = 0
+            while self._items and len(batch) < max_size:
+                size = -self._items[0][0] if self.order == 'size' else 0
+                if batch and max_bytes is not None and batch_bytes + size > max_bytes:
+                    break
+                _, _, file_path, data = self._pop()
+                if data is not None:
+                    self._buffered -= len(data)
+                batch.append((file_path, data))
+                batch_bytes += size
+                if max_bytes is not None and batch_bytes >= max_bytes:
+                    break
+            if self._done and not self._items:
+                self.finished = True
+            self.count += len(batch)
+            self._cond.notify_all()
+        return batch
+
+
+def process_batch_size(total_files, max_workers, max_batch_size=32):
+    """每个任务的文件数上限：合并小文件以减少进程间通信和调度开销，总数未知时使用固定值"""
+    if total_files is None:
+        return 8
+    return max(1, min(max_batch_size, total_files // (max_workers * 4)))
+
+
+class ScheduleStats:
+    """并发扫描的调度统计：墙钟时间、工作者忙碌时间、最慢文件和最后一次派发后的收尾时间"""
+
+    def __init__(self, max_workers, order):
+        self.max_workers = max_workers
+        self.order = order
+        self.tasks = 0
+        self.files = 0
+        self.busy = 0.0  # 各文件扫描耗时之和
+        self.slowest = (0.0, None)  # (耗时, 文件路径)
+        self.start = None
+        self.last_dispatch = None
+        self.end = None
+
+    def record(self, file_path, seconds):
+        self.files += 1
+        self.busy += seconds
+        if seconds > self.slowest[0]:
+            self.slowest = (seconds, file_path)
+
+    def rows(self):
+        wall = (self.end or time.perf_counter()) - self.start
+        tail = (self.end or time.perf_counter()) - (self.last_dispatch or self.start)
+        # 任何调度的墙钟时间都不会短于最慢的单个文件，也不会短于忙碌时间均分给所有工作者
+        bound = max(self.slowest[0], self.busy / self.max_workers)
+        utilization = self.busy / (wall * self.max_workers) if wall > 0 else 0.0
+        slowest_seconds, slowest_path = self.slowest
+        return [
+            ['Schedule', f'{self.order} ({self.files} files in {self.tasks} tasks)'],
+            ['Wall time', f'{wall:.2f}s'],
+            ['Worker busy time', f'{self.busy:.2f}s'],
+            ['Worker utilization', f'{utilization:.0%} of {self.max_workers} workers'],
+            ['Slowest file', f'{slowest_seconds:.2f}s {slowest_path or "-"}'],
+            ['Tail after last dispatch', f'{tail:.2f}s'],
+            ['Wall time lower bound', f'{bound:.2f}s'],
+        ]
+
+
+def iter_file_results(files, max_workers=10, executor='thread', cache=None,
+                      options=None, batch_bytes=SMALL_BATCH_BYTES, stats=None):
+    """并发扫描文件，按完成顺序产出 (文件路径, 结果, 异常)
+
+    files可以是路径列表或FileSource。thread模式逐个文件提交到线程池；
+    process模式按批次提交到进程池，以绕过GIL并行执行beautify和正则提取。
+    按大小调度时两种模式都先派发最大的文件，小于batch_bytes的文件合并成批。
+    在途任务数有上限，遍历、读取和提取相互重叠，内存占用保持平稳。
+    """
+    source = files if isinstance(files, FileSource) else FileSource(files)
+    if executor == 'process':
+        pool_cls = ProcessPoolExecutor
+    else:
+        pool_cls = ThreadPoolExecutor
+    if executor == 'process' or source.order == 'size':
+        batch_size = process_batch_size(source.total, max_workers)
+    else:
+        batch_size = 1
+    max_bytes = batch_bytes if source.order == 'size' else None
+    max_pending = max_workers * 2
+    if stats is not None:
+        stats.start = time.perf_counter()
+    
+    pool_kwargs = {}
+    if executor == 'process' and options is not None and (options.pattern_files or options.plugin_files):
+        # spawn方式启动的工作进程不继承主进程注册的自定义规则和插件
+        pool_kwargs = {'initializer': load_extensions,
+                       'initargs': (options.pattern_files, options.plugin_files)}
+    elif executor != 'process' and CodeProfiler.active is not None and CodeProfiler.active.kind == 'cprofile':
+        # cProfile只剖析调用它的线程，工作线程各自启用，报告时合并
+        pool_kwargs = {'initializer': CodeProfiler.active.start_worker}
+    
+    with pool_cls(max_workers=max_workers, **pool_kwargs) as pool:
+        pending = {}
+        while True:
+            # 补充任务：没有在途任务时阻塞等待新路径，否则只取已发现的路径
+            while len(pending) < max_pending:
+                entries = source.get_batch(batch_size, block=not pending, max_bytes=max_bytes)
+                if not entries:
+                    break
+                batch = [file_path for file_path, _ in entries]
+                contents = {file_path: data for file_path, data in entries if data is not None}
+                pending[pool.submit(process_file_batch, batch, cache, options, contents or None)] = batch
+                if stats is not None:
+                    stats.tasks += 1
+                    stats.last_dispatch = time.perf_counter()
+            if not pending:
+                break
             
-            # 处理完成的任务
-            for future in as_completed(future_to_file):
-                file_path = future_to_file[future]
+            # 遍历未结束时定时返回，及时提交新发现的文件
+            done, _ = wait(pending, timeout=None if source.finished else 0.05,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = pending.pop(future)
                 try:
-                    result = future.result()
-                    if result:  # 确保结果不为None
-                        scan_result.add_file_result(result)
-                    
-                    # 更新进度条
-                    pbar.update(1)
-                    
-                    # 如果需要打印结果，在这里打印
-                    if print_results and result:
-                        rel_path = os.path.relpath(file_path, dir_path)
-                        if result.error:
-                            pbar.write(f"{Fore.RED}Error in {rel_path}: {result.error}{Style.RESET_ALL}")
-                        else:
-                            pbar.write(f"\n{Fore.CYAN}=== Results for {rel_path} ==={Style.RESET_ALL}")
-                            if result.endpoints:
-                                pbar.write(f"{Fore.GREEN}Found Endpoints:{Style.RESET_ALL}")
-                                for endpoint in result.endpoints:
-                                    pbar.write(f"  {Fore.YELLOW}{endpoint}{Style.RESET_ALL}")
-                            if result.services:
-                                pbar.write(f"{Fore.GREEN}Found Services:{Style.RESET_ALL}")
-                                for service in result.services:
-                                    pbar.write(f"  {Fore.YELLOW}{service}{Style.RESET_ALL}")
-                            if result.messages:
-                                pbar.write(f"{Fore.GREEN}Found Messages:{Style.RESET_ALL}")
-                                for msg_name, msg_fields in result.messages.items():
-                                    pbar.write(f"\n{Fore.YELLOW}{msg_name}:{Style.RESET_ALL}")
-                                    pbar.write(create_table(
-                                        columns_list=['Field Name', 'Field Type', 'Field Number'],
-                                        rows_list=msg_fields
-                                    ))
-                                    
-                                    # 添加示例数据输出
-                                    pbar.write(f"\n{Fore.BLUE}Example Data:{Style.RESET_ALL}")
-                                    examples = generate_example_data(msg_fields)
-                                    for example in examples:
-                                        pbar.write(f"  {Fore.CYAN}{example}{Style.RESET_ALL}")
-                                    pbar.write("")  # 添加空行分隔
-                
+                    results, elapsed = future.result()
                 except Exception as e:
-                    pbar.write(f"{Fore.RED}Error processing {file_path}: {str(e)}{Style.RESET_ALL}")
+                    for file_path in batch:
+                        yield file_path, None, e
+                    continue
+                for file_path, result, seconds in zip(batch, results, elapsed):
+                    if stats is not None:
+                        stats.record(file_path, seconds)
+                    yield file_path, result, None
+    
+    if stats is not None:
+        stats.end = time.perf_counter()
+    if source.error is not None:
+        raise source.error
+
+
+def process_directory(dir_path, print_results=True, max_workers=10, executor='thread',
+                      cache=None, options=None, writers=(), keep_files=True,
+                      schedule='walk', batch_bytes=SMALL_BATCH_BYTES, archives=True):
+    """使用并发处理目录，archives为True时zip/tar/asar等归档作为虚拟目录扫描"""
+    if not os.path.exists(dir_path):
+        print(f"{Fore.RED}Directory not found: {dir_path}{Style.RESET_ALL}")
+        return ScanResult()  # 返回空的扫描结果而不是退出
+        
+    scan_result = ScanResult(keep_files=keep_files)
+    
+    if print_results:
+        print(f"\n{Fore.CYAN}=== Scanning directory: {dir_path} ==={Style.RESET_ALL}\n")
+    
+    # 后台线程边遍历边产出文件，扫描无需等待遍历完成
+    source = FileSource(walk_scan_files(dir_path, archives), order=schedule)
+    scan_result.schedule = ScheduleStats(max_workers, schedule)
+    print(f"\n{Fore.CYAN}Processing Files...{Style.RESET_ALL}")
+    # 创建进度条
+    pbar = tqdm(desc="Scanning files", unit="file")
+    
+    # 使用线程池或进程池进行并发处理
+    for file_path, result, exc in iter_file_results(source, max_workers, executor, cache, options,
+                                                    batch_bytes, scan_result.schedule):
+        # 更新进度条，遍历结束后确定总数
+        if source.finished and pbar.total is None:
+            pbar.total = source.count
+        pbar.update(1)
+        
+        if exc is not None:
+            pbar.write(f"{Fore.RED}Error processing {file_path}: {str(exc)}{Style.RESET_ALL}")
+            continue
+        
+        if result:  # 确保结果不为None
+            scan_result.add_file_result(result)
+            for writer in writers:
+                writer.write(result)
         
-        pbar.close()
+        # 如果需要打印结果，在这里打印
+        if print_results and result:
+            rel_path = os.path.relpath(file_path, dir_path) if os.path.isdir(dir_path) else file_path
+            if result.error:
+                pbar.write(f"{Fore.RED}Error in {rel_path}: {result.error}{Style.RESET_ALL}")
+            elif not result.skipped:
+                pbar.write(f"\n{Fore.CYAN}=== Results for {rel_path} ==={Style.RESET_ALL}")
+                locations = result.locations or {}
+                if result.endpoints:
+                    pbar.write(f"{Fore.GREEN}Found Endpoints:{Style.RESET_ALL}")
+                    for endpoint in result.endpoints:
+                        location = f" {Fore.BLUE}({locations[endpoint]})" if endpoint in locations else ""
+                        pbar.write(f"  {Fore.YELLOW}{endpoint}{location}{Style.RESET_ALL}")
+                if result.services:
+                    pbar.write(f"{Fore.GREEN}Found Services:{Style.RESET_ALL}")
+                    for service in result.services:
+                        pbar.write(f"  {Fore.YELLOW}{service}{Style.RESET_ALL}")
+                if result.messages:
+                    pbar.write(f"{Fore.GREEN}Found Messages:{Style.RESET_ALL}")
+                    for msg_name, msg_fields in result.messages.items():
+                        location = f" {Fore.BLUE}({locations[msg_name]})" if msg_name in locations else ""
+                        pbar.write(f"\n{Fore.YELLOW}{msg_name}:{location}{Style.RESET_ALL}")
+                        pbar.write(create_table(
+                            columns_list=['Field Name', 'Field Type', 'Field Number'],
+                            rows_list=msg_fields
+                        ))
+                        
+                        # 添加示例数据输出
+                        pbar.write(f"\n{Fore.BLUE}Example Data:{Style.RESET_ALL}")
+                        examples = generate_example_data(msg_fields)
+                        for example in examples:
+                            pbar.write(f"  {Fore.CYAN}{example}{Style.RESET_ALL}")
+                        pbar.write("")  # 添加空行分隔
+
+    pbar.close()
     
     return scan_result  # 保总是返回scan_result
 
 
-def process_files(file_pattern, print_results=True, max_workers=10):
+def process_files(file_pattern, print_results=True, max_workers=10, executor='thread',
+                  cache=None, options=None, writers=(), keep_files=True,
+                  schedule='walk', batch_bytes=SMALL_BATCH_BYTES):
     """使用并发处理多个文件"""
     matched_files = glob.glob(file_pattern)
     if not matched_files:
         print(f"{Fore.RED}No files found matching pattern: {file_pattern}{Style.RESET_ALL}")
         exit(1)
     
-    scan_result = ScanResult()
+    scan_result = ScanResult(keep_files=keep_files)
+    scan_result.schedule = ScheduleStats(max_workers, schedule)
     pbar = tqdm(total=len(matched_files), desc="Scanning files", unit="file")
     
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_file = {
-            executor.submit(process_single_file, file_path, False): file_path 
-            for file_path in matched_files
-        }
+    source = FileSource(matched_files, order=schedule)
+    for file_path, result, exc in iter_file_results(source, max_workers, executor, cache, options,
+                                                    batch_bytes, scan_result.schedule):
+        pbar.update(1)
         
-        for future in as_completed(future_to_file):
-            file_path = future_to_file[future]
-            try:
-                result = future.result()
-                scan_result.add_file_result(result)
-                
-                pbar.update(1)
-                
-                if print_results and result:
-                    if result.error:
-                        pbar.write(f"{Fore.RED}Error in {file_path}: {result.error}{Style.RESET_ALL}")
-                    else:
-                        pbar.write(f"\n{Fore.CYAN}=== Results for {file_path} ==={Style.RESET_ALL}")
-                        # ... (与上面相同的结果打印辑)
-                
-            except Exception as e:
-                pbar.write(f"{Fore.RED}Error processing {file_path}: {str(e)}{Style.RESET_ALL}")
+        if exc is not None:
+            pbar.write(f"{Fore.RED}Error processing {file_path}: {str(exc)}{Style.RESET_ALL}")
+            continue
+        
+        scan_result.add_file_result(result)
+        for writer in writers:
+            writer.write(result)
+        
+        if print_results and result:
+            if result.error:
+                pbar.write(f"{Fore.RED}Error in {file_path}: {result.error}{Style.RESET_ALL}")
+            elif not result.skipped:
+                pbar.write(f"\n{Fore.CYAN}=== Results for {file_path} ==={Style.RESET_ALL}")
+                # ... (与上面相同的结果打印辑)
     
     pbar.close()
     return scan_result
 
 
-def generate_html_report(scan_result: ScanResult, output_path: str):
-    file_sections = []
-    
-    for file_result in scan_result.files:
-        if file_result.error:
-            error_section = f'<div class="alert alert-danger">错误: {file_result.error}</div>'
-            messages_section = ""
-            proto_section = ""
-        else:
-            error_section = ""
-            
-            # Messages section
-            messages_html = ""
-            if file_result.messages:
-                messages_html = "<h4 class='mb-4'>发现的消息定义</h4>"
-                for msg_name, msg_fields in file_result.messages.items():
-                    messages_html += f"<h5 class='mt-4'>{msg_name}</h5>"
-                    messages_html += '<table class="table table-striped">'
-                    messages_html += "<thead><tr><th>字段名称</th><th>字段类型</th><th>字段编号</th></tr></thead>"
-                    messages_html += "<tbody>"
-                    for field in msg_fields:
-                        messages_html += f"<tr><td>{field[0]}</td><td>{field[1]}</td><td>{field[2]}</td></tr>"
-                    messages_html += "</tbody></table>"
-                    
-                    # 示例数据部分使用新的样式
-                    messages_html += '<div class="example-data">'
-                    messages_html += '<div class="example-title">示例数据</div>'
-                    messages_html += '<pre><code class="language-json">'
-                    examples = generate_example_data(msg_fields)
-                    messages_html += '\n'.join(examples)
-                    messages_html += '</code></pre></div>'
-            messages_section = messages_html
-            
-            # Proto section使用新的样式
-            proto_section = ""
-            if file_result.proto_content:
-                proto_section = '<div class="proto-section">'
-                proto_section += '<div class="proto-title">Proto文件定义</div>'
-                proto_section += '<pre><code class="language-protobuf">'
-                proto_section += file_result.proto_content
-                proto_section += '</code></pre></div>'
+def print_scan_summary(scan_result: ScanResult):
+    """在控制台输出扫描概要"""
+    rows = [
+        ['Files', scan_result.total_files],
+        ['Endpoints', scan_result.total_endpoints],
+        ['Services', scan_result.total_services],
+        ['Messages', scan_result.total_messages],
+        ['Skipped (no gRPC markers)', scan_result.total_skipped],
+    ]
+    if scan_result.cache_hits or scan_result.cache_misses:
+        rows.append(['Cache hits', scan_result.cache_hits])
+        rows.append(['Cache misses', scan_result.cache_misses])
+    print(f"\n{Fore.CYAN}=== Scan Summary ==={Style.RESET_ALL}")
+    print(create_table(columns_list=['Item', 'Count'], rows_list=rows))
+    if scan_result.schedule is not None and scan_result.schedule.files:
+        print(f"\n{Fore.CYAN}=== Schedule ==={Style.RESET_ALL}")
+        print(create_table(columns_list=['Item', 'Value'], rows_list=scan_result.schedule.rows()))
+
+
+def render_file_section(file_result: FileResult):
+    """渲染单个文件的报告区块，没有可展示内容时返回空字符串"""
+    if file_result.error:
+        error_section = f'<div class="alert alert-danger">错误: {html.escape(file_result.error, quote=False)}</div>'
+        messages_section = ""
+        proto_section = ""
+    else:
+        error_section = ""
         
-        # 只有当有内容时才添加section
-        if messages_section or error_section or proto_section:
-            file_sections.append(FILE_SECTION_TEMPLATE.format(
-                file_path=file_result.file_path,
-                error_section=error_section,
-                messages_section=messages_section,
-                proto_section=proto_section
-            ))
+        # Messages section
+        parts = []
+        if file_result.locations:
+            # --source-maps时列出各发现项在原始源码中的位置
+            parts.append("<h4 class='mb-4'>原始源码位置</h4>")
+            parts.append('<table class="table table-striped">')
+            parts.append("<thead><tr><th>名称</th><th>源文件:行号</th></tr></thead>")
+            parts.append("<tbody>")
+            for name, location in file_result.locations.items():
+                parts.append(f"<tr><td>{html.escape(name, quote=False)}</td>"
+                             f"<td>{html.escape(location, quote=False)}</td></tr>")
+            parts.append("</tbody></table>")
+        if file_result.modules:
+            # --split-modules时按模块列出含gRPC特征的模块及其中的消息
+            parts.append("<h4 class='mb-4'>gRPC模块</h4>")
+            parts.append('<table class="table table-striped">')
+            parts.append("<thead><tr><th>模块ID</th><th>消息</th></tr></thead>")
+            parts.append("<tbody>")
+            for module_id, module_messages in file_result.modules.items():
+                names = ', '.join(html.escape(name, quote=False) for name in module_messages)
+                parts.append(f"<tr><td>{html.escape(module_id, quote=False)}</td><td>{names}</td></tr>")
+            parts.append("</tbody></table>")
+        if file_result.messages:
+            parts.append("<h4 class='mb-4'>发现的消息定义</h4>")
+            for msg_name, msg_fields in file_result.messages.items():
+                parts.append(f"<h5 class='mt-4'>{html.escape(msg_name, quote=False)}</h5>")
+                parts.append('<table class="table table-striped">')
+                parts.append("<thead><tr><th>字段名称</th><th>字段类型</th><th>字段编号</th></tr></thead>")
+                parts.append("<tbody>")
+                for field in msg_fields:
+                    cells = ''.join(f"<td>{html.escape(str(value), quote=False)}</td>" for value in field[:3])
+                    parts.append(f"<tr>{cells}</tr>")
+                parts.append("</tbody></table>")
+                
+                # 示例数据部分使用新的样式
+                parts.append('<div class="example-data">')
+                parts.append('<div class="example-title">示例数据</div>')
+                parts.append('<pre><code class="language-json">')
+                parts.append('\n'.join(generate_example_data(msg_fields)))
+                parts.append('</code></pre></div>')
+        messages_section = ''.join(parts)
+        
+        # Proto section使用新的样式
+        proto_section = ""
+        if file_result.proto_content:
+            proto_section = ('<div class="proto-section">'
+                             '<div class="proto-title">Proto文件定义</div>'
+                             '<pre><code class="language-protobuf">'
+                             f'{html.escape(file_result.proto_content, quote=False)}'
+                             '</code></pre></div>')
     
-    html_content = HTML_TEMPLATE.format(
-        timestamp=scan_result.timestamp,
-        total_files=scan_result.total_files,
-        total_services=scan_result.total_services,
-        total_messages=scan_result.total_messages,
-        file_results="\n".join(file_sections)
+    # 只有当有内容时才输出section
+    if not (messages_section or error_section or proto_section):
+        return ""
+    return FILE_SECTION_TEMPLATE.format(
+        file_path=html.escape(file_result.file_path, quote=False),
+        error_section=error_section,
+        messages_section=messages_section,
+        proto_section=proto_section
     )
+
+
+class HtmlReportWriter:
+    """流式写出HTML报告：页头、逐个文件区块、页尾依次写入文件，统计数字结束时回填"""
+    
+    TOTAL_FIELDS = ('total_files', 'total_services', 'total_messages', 'total_skipped')
+    TOTAL_WIDTH = 12  # 统计数字预留的定宽占位
+    
+    def __init__(self, output_path, timestamp):
+        self.output_path = output_path
+        self.summary = ScanResult(timestamp=timestamp, keep_files=False)
+        header, footer = HTML_TEMPLATE.split('{file_results}')
+        self.footer = footer.format().encode('utf-8')
+        
+        markers = {name: f'\x00{name}\x00' for name in self.TOTAL_FIELDS}
+        header = header.format(timestamp=html.escape(timestamp, quote=False), **markers)
+        self.file = open(output_path, 'wb')
+        self.offsets = {}
+        self.sections = 0
+        for name in self.TOTAL_FIELDS:
+            before, header = header.split(markers[name], 1)
+            self.file.write(before.encode('utf-8'))
+            self.offsets[name] = self.file.tell()
+            self.file.write(b' ' * self.TOTAL_WIDTH)
+        self.file.write(header.encode('utf-8'))
+    
+    def write(self, result: FileResult):
+        self.summary.add_file_result(result)
+        section = render_file_section(result)
+        if section:
+            if self.sections:
+                section = '\n' + section
+            self.file.write(section.encode('utf-8'))
+            self.sections += 1
+    
+    def close(self):
+        self.file.write(self.footer)
+        for name, offset in self.offsets.items():
+            self.file.seek(offset)
+            self.file.write(str(getattr(self.summary, name)).ljust(self.TOTAL_WIDTH).encode('utf-8'))
+        self.file.close()
+
+
+class PagedReportWriter(HtmlReportWriter):
+    """分页报告：索引页只含概要、文件列表与搜索框，文件区块写入分片脚本，展开时才加载"""
+    
+    SHARD_SIZE = 1024 * 1024  # 单个分片脚本的目标大小
+    PAGE_SIZE = 50  # 索引页每页显示的文件数
+    
+    def __init__(self, output_path, timestamp):
+        super().__init__(output_path, timestamp)
+        self.shard_dir = os.path.splitext(output_path)[0] + '_files'
+        os.makedirs(self.shard_dir, exist_ok=True)
+        shard_name = os.path.basename(self.shard_dir)
+        self.file.write(PAGED_REPORT_TEMPLATE.format(
+            shard_dir=json.dumps(shard_name),
+            shard_src=html.escape(shard_name),
+            page_size=self.PAGE_SIZE,
+        ).encode('utf-8'))
+        
+        # 文件清单和搜索索引边扫描边追加，结束时补全JSONP调用
+        self.files_index = open(os.path.join(self.shard_dir, 'files.js'), 'w', encoding='utf-8')
+        self.files_index.write('__grpcScanFiles([')
+        self.search_index = open(os.path.join(self.shard_dir, 'search.js'), 'w', encoding='utf-8')
+        self.search_index.write('__grpcScanSearch([')
+        self.file_count = 0
+        self.search_count = 0
+        self.shard_id = 0
+        self.shard = {}
+        self.shard_bytes = 0
+    
+    @staticmethod
+    def append_entry(index_file, count, entry):
+        index_file.write((',\n' if count else '\n') + json.dumps(entry))
+    
+    def write(self, result: FileResult):
+        self.summary.add_file_result(result)
+        section = render_file_section(result)
+        names = []
+        if result.error is None:
+            names = ([('service', name) for name in result.services] +
+                     [('endpoint', name) for name in result.endpoints] +
+                     [('message', name) for name in result.messages])
+        if not (section or names):
+            return
+        
+        shard = None
+        if section:
+            if self.shard and self.shard_bytes + len(section) > self.SHARD_SIZE:
+                self.flush_shard()
+            self.shard[self.file_count] = section
+            self.shard_bytes += len(section)
+            shard = self.shard_id
+        
+        self.append_entry(self.files_index, self.file_count, [
+            result.file_path, shard, len(result.endpoints), len(result.services),
+            len(result.messages), result.error is not None,
+        ])
+        for kind, name in names:
+            self.append_entry(self.search_index, self.search_count, [kind, name, self.file_count])
+            self.search_count += 1
+        self.file_count += 1
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    def flush_shard(self):
+        if not self.shard:
+            return
+        shard_path = os.path.join(self.shard_dir, f'shard_{self.shard_id:05d}.js')
+        with open(shard_path, 'w', encoding='utf-8') as f:
+            f.write(f'__grpcScanShard({self.shard_id}, {json.dumps(self.shard)});\n')
+        self.shard_id += 1
+        self.shard = {}
+        self.shard_bytes = 0
+    
+    def close(self):
+        self.flush_shard()
+        for index_file in (self.files_index, self.search_index):
+            index_file.write('\n]);\n')
+            index_file.close()
+        super().close()
+
+
+def generate_html_report(scan_result: ScanResult, output_path: str):
+    writer = HtmlReportWriter(output_path, scan_result.timestamp)
+    for file_result in scan_result.files:
+        writer.write(file_result)
+    writer.close()
     
     print(f"\nHTML报告已生成: {output_path}")
 
 
-def extract_typescript_grpc(content):
+# TypeScript提取规则
+TS_SERVICE_PATTERNS = compile_patterns([
+    ('@GrpcService(', r'@GrpcService\(\s*\{[^)]*?name:\s*[\'"]([^\'\"]+)[\'"]'),  # gRPC服务装饰器（选项对象）
+    ('@GrpcService(', r'@GrpcService\(\s*[\'"]([^\'\"]+)[\'"]'),  # gRPC服务装饰器（字符串参数）
+    ('Service', r'class\s+([a-zA-Z0-9_]+)Service\s+implements\s+([a-zA-Z0-9_]+)'),  # 服务实现
+    ('Client', r'interface\s+([a-zA-Z0-9_]+)Client\s*{'),  # 客户端接口
+    ('@Injectable()', r'@Injectable\(\)\s*export\s+class\s+([a-zA-Z0-9_]+)Service'),  # Angular服务
+])
+
+TS_MESSAGE_PATTERNS = compile_patterns([
+    ('interface', r'interface\s+([a-zA-Z0-9_]+)\s*{([^}]+)}'),  # 接口定义
+    ('type', r'type\s+([a-zA-Z0-9_]+)\s*=\s*{([^}]+)}'),  # 类型定义
+    ('Message', r'class\s+([a-zA-Z0-9_]+)\s+implements\s+([a-zA-Z0-9_]+Message)'),  # 消息类
+])
+
+TS_FIELD_PATTERN = re.compile(r'(\w+)\s*:\s*(\w+)(?:\s*;?\s*\/\/\s*@field\((\d+)\))?')
+
+TS_METHOD_PATTERNS = compile_patterns([
+    ('@GrpcMethod(', r'@GrpcMethod\([\'"]([^\'\"]+)[\'"]\)'),  # gRPC方法装饰器
+    ('@GrpcStreamMethod(', r'@GrpcStreamMethod\([\'"]([^\'\"]+)[\'"]\)'),  # 流式方法装饰器
+    ('Observable<', r'abstract\s+([a-zA-Z0-9_]+)\(.*\):\s*Observable<.*>;'),  # 抽象方法
+])
+
+TS_ANCHOR_SCANNER = AnchorScanner(
+    anchor
+    for patterns in (TS_SERVICE_PATTERNS, TS_MESSAGE_PATTERNS, TS_METHOD_PATTERNS)
+    for anchor, _ in patterns
+)
+
+
+def extract_typescript_grpc(content, anchors=None):
     """提取TypeScript中的gRPC定义"""
-    patterns = {
-        'services': [
-            r'@GrpcService\((.*?)\)',  # gRPC服务装饰器
-            r'class\s+([a-zA-Z0-9_]+)Service\s+implements\s+([a-zA-Z0-9_]+)',  # 服务实现
-            r'interface\s+([a-zA-Z0-9_]+)Client\s*{',  # 客户端接口
-            r'@Injectable\(\)\s*export\s+class\s+([a-zA-Z0-9_]+)Service',  # Angular服务
-        ],
-        'messages': [
-            r'interface\s+([a-zA-Z0-9_]+)\s*{([^}]+)}',  # 接口定义
-            r'type\s+([a-zA-Z0-9_]+)\s*=\s*{([^}]+)}',  # 类型定义
-            r'class\s+([a-zA-Z0-9_]+)\s+implements\s+([a-zA-Z0-9_]+Message)',  # 消息类
-        ],
-        'methods': [
-            r'@GrpcMethod\([\'"]([^\'\"]+)[\'"]\)',  # gRPC方法装饰器
-            r'@GrpcStreamMethod\([\'"]([^\'\"]+)[\'"]\)',  # 流式方法装饰器
-            r'abstract\s+([a-zA-Z0-9_]+)\(.*\):\s*Observable<.*>;',  # 抽象方法
-        ]
-    }
+    if anchors is None:
+        anchors = TS_ANCHOR_SCANNER.scan(content)
     
     results = {
         'services': set(),
@@ -921,175 +3673,626 @@ def extract_typescript_grpc(content):
         'methods': set()
     }
     
-    # 提取服务
-    for pattern in patterns['services']:
-        matches = re.finditer(pattern, content)
-        for match in matches:
-            service_name = match.group(1)
-            if '(' in service_name:  # 处理装饰器参数
-                service_name = re.search(r'name:\s*[\'"]([^\'\"]+)[\'"]', service_name)
-                if service_name:
-                    service_name = service_name.group(1)
-            results['services'].add(service_name)
+    # 提取服务（装饰器参数中的服务名由规则直接捕获）
+    for match in iter_pattern_matches(TS_SERVICE_PATTERNS, content, anchors):
+        results['services'].add(match.group(1))
     
     # 提取消息
-    for pattern in patterns['messages']:
-        matches = re.finditer(pattern, content)
-        for match in matches:
-            msg_name = match.group(1)
-            if msg_name not in results['messages']:
-                results['messages'][msg_name] = []
-            
-            if len(match.groups()) > 1:
-                fields_content = match.group(2)
-                # 解析字段定义
-                field_pattern = r'(\w+)\s*:\s*(\w+)(?:\s*\/\/\s*@field\((\d+)\))?'
-                field_matches = re.finditer(field_pattern, fields_content)
-                for field_match in field_matches:
-                    field_name = field_match.group(1)
-                    field_type = field_match.group(2)
-                    field_number = field_match.group(3) or '0'  # 如果没有指定字段编号
-                    results['messages'][msg_name].append([field_name, field_type, field_number])
+    for match in iter_pattern_matches(TS_MESSAGE_PATTERNS, content, anchors):
+        msg_name = match.group(1)
+        if msg_name not in results['messages']:
+            results['messages'][msg_name] = []
+        
+        if len(match.groups()) > 1:
+            fields_content = match.group(2)
+            # 解析字段定义
+            for field_match in TS_FIELD_PATTERN.finditer(fields_content):
+                field_name = field_match.group(1)
+                field_type = field_match.group(2)
+                field_number = field_match.group(3) or '0'  # 如果没有指定字段编号
+                results['messages'][msg_name].append([field_name, field_type, field_number])
     
     # 提取方法
-    for pattern in patterns['methods']:
-        matches = re.finditer(pattern, content)
-        for match in matches:
-            results['methods'].add(match.group(1))
+    for match in iter_pattern_matches(TS_METHOD_PATTERNS, content, anchors):
+        results['methods'].add(match.group(1))
     
     return results
 
+def scan_ts_content(content, file_path):
+    """扫描TypeScript内容并生成完整的FileResult：方法映射为端点，接口字段映射为消息"""
+    ts_results = extract_typescript_grpc(content)
+    
+    endpoints = sorted(
+        method if method.startswith('/') else f"/{method}"
+        for method in ts_results['methods']
+    )
+    services = sorted(ts_results['services'])
+    messages = ts_results['messages']
+    
+    proto_content = None
+    if messages:
+        proto_content = generate_proto_content(messages, services)
+    
+    return FileResult(
+        file_path=file_path,
+        endpoints=endpoints,
+        messages=messages,
+        services=services,
+        proto_content=proto_content
+    )
+
+# 版本信息提取规则
+VERSION_PATTERNS = {
+    'grpc': compile_patterns([
+        ('"@grpc/grpc-js"', r'\"@grpc/grpc-js\"\s*:\s*\"([^\"]+)\"'),  # package.json中的版本
+        ('"grpc-web"', r'\"grpc-web\"\s*:\s*\"([^\"]+)\"'),
+        ('"@grpc/web"', r'\"@grpc/web\"\s*:\s*\"([^\"]+)\"'),
+        ('@grpc/grpc-js@', r'from\s+[\'"]@grpc/grpc-js@([^\'\"]+)[\'"]'),  # import语句的版本
+        ('GRPC_VERSION', r'GRPC_VERSION\s*=\s*[\'"]([^\'\"]+)[\'"]'),  # 版本常量
+    ]),
+    'protobuf': compile_patterns([
+        ('"google-protobuf"', r'\"google-protobuf\"\s*:\s*\"([^\"]+)\"'),  # package.json中的版本
+        ('"protobufjs"', r'\"protobufjs\"\s*:\s*\"([^\"]+)\"'),
+        ('google-protobuf@', r'from\s+[\'"]google-protobuf@([^\'\"]+)[\'"]'),
+        ('PROTOBUF_VERSION', r'PROTOBUF_VERSION\s*=\s*[\'"]([^\'\"]+)[\'"]'),
+    ]),
+}
+
+
 def extract_version_info(content):
     """提取gRPC和protobuf的版本信息"""
-    version_patterns = {
-        'grpc': [
-            r'\"@grpc/grpc-js\"\s*:\s*\"([^\"]+)\"',  # package.json中的版本
-            r'\"grpc-web\"\s*:\s*\"([^\"]+)\"',
-            r'\"@grpc/web\"\s*:\s*\"([^\"]+)\"',
-            r'from\s+[\'"]@grpc/grpc-js@([^\'\"]+)[\'"]',  # import语句的版本
-            r'GRPC_VERSION\s*=\s*[\'"]([^\'\"]+)[\'"]',  # 版本常量
-        ],
-        'protobuf': [
-            r'\"google-protobuf\"\s*:\s*\"([^\"]+)\"',  # package.json中的版本
-            r'\"protobufjs\"\s*:\s*\"([^\"]+)\"',
-            r'from\s+[\'"]google-protobuf@([^\'\"]+)[\'"]',
-            r'PROTOBUF_VERSION\s*=\s*[\'"]([^\'\"]+)[\'"]',
-        ]
-    }
-    
     versions = {
         'grpc': set(),
         'protobuf': set()
     }
     
-    for lib, patterns in version_patterns.items():
-        for pattern in patterns:
-            matches = re.finditer(pattern, content)
-            for match in matches:
-                versions[lib].add(match.group(1))
+    for lib, patterns in VERSION_PATTERNS.items():
+        for match in iter_pattern_matches(patterns, content):
+            versions[lib].add(match.group(1))
     
     return versions
 
+
+# 规则注册表：所有规则表在导入时编译一次，由全部工作线程/进程共享。
+# 表名即--patterns规则文件中的键，分组约定与对应的内置规则相同
+PATTERN_REGISTRY = {
+    'endpoints': ENDPOINT_PATTERNS,
+    'minified_endpoints': MINIFIED_ENDPOINT_PATTERNS,
+    'message_setters': MESSAGE_SETTER_PATTERNS,
+    'minified_message_setters': MINIFIED_MESSAGE_SETTER_PATTERNS,
+    'messages': MESSAGE_PATTERNS,
+    'services': SERVICE_PATTERNS,
+    'metadata': METADATA_PATTERNS,
+    'error_handlers': ERROR_HANDLER_PATTERNS,
+    'interceptors': INTERCEPTOR_PATTERNS,
+    'ts_services': TS_SERVICE_PATTERNS,
+    'ts_messages': TS_MESSAGE_PATTERNS,
+    'ts_methods': TS_METHOD_PATTERNS,
+    'grpc_versions': VERSION_PATTERNS['grpc'],
+    'protobuf_versions': VERSION_PATTERNS['protobuf'],
+}
+
+# 参与锚点扫描的规则表
+JS_PATTERN_TABLES = ('endpoints', 'minified_endpoints', 'message_setters', 'minified_message_setters',
+                     'messages', 'services', 'metadata', 'error_handlers', 'interceptors')
+TS_PATTERN_TABLES = ('ts_services', 'ts_messages', 'ts_methods')
+
+LOADED_PATTERN_FILES = set()
+LOADED_PLUGIN_FILES = set()
+
+
+# --patterns追加的预过滤特征
+EXTRA_MARKERS = []
+
+
+def register_patterns(table, specs):
+    """向注册表中的规则表追加 (锚点字面量, 正则) 规则，并重建锚点扫描器"""
+    global TS_ANCHOR_SCANNER
+    if table not in PATTERN_REGISTRY:
+        raise ValueError(f"Unknown pattern table: {table}")
+    # 原地扩展，提取函数引用的模块级规则表随之生效
+    PATTERN_REGISTRY[table].extend(compile_patterns(specs))
+    anchor_scanner.cache_clear()
+    TS_ANCHOR_SCANNER = AnchorScanner(
+        anchor for name in TS_PATTERN_TABLES for anchor, _ in PATTERN_REGISTRY[name]
+    )
+
+
+def register_markers(markers):
+    """追加预过滤使用的gRPC特征字面量"""
+    EXTRA_MARKERS.extend(markers)
+    prefilter_pattern.cache_clear()
+
+
+@dataclass
+class Extractor:
+    """JavaScript提取器插件
+
+    extract(content, anchors, minified, window, into)把结果累积到into中：
+    messages字段为 {消息名: 字段列表}，wire_types字段为 {消息名: {字段编号: 线上类型}}，其余字段为集合。
+    """
+    name: str
+    field: str  # 填充的FileResult字段
+    extract: Callable
+    tables: tuple = ()  # 使用的规则表（PATTERN_REGISTRY中的名称），锚点由此得出
+    markers: tuple = ()  # 预过滤特征字面量，文件中至少出现一个时才会扫描
+    backends: dict = field(default_factory=dict)  # --backend的名称 -> 对应实现，未注册的后端使用extract
+
+
+EXTRACTORS = {}
+
+# 可由提取器填充的FileResult字段
+EXTRACTOR_FIELDS = ('endpoints', 'messages', 'services', 'metadata', 'error_handlers', 'interceptors',
+                    'wire_types')
+# 其中以字典累积的字段，其余字段为集合
+DICT_EXTRACTOR_FIELDS = ('messages', 'wire_types')
+
+
+def register_extractor(extractor: Extractor):
+    """注册（或替换同名的）JavaScript提取器"""
+    if extractor.field not in EXTRACTOR_FIELDS:
+        raise ValueError(f"Extractor {extractor.name}: unsupported field {extractor.field}")
+    unknown_tables = [table for table in extractor.tables if table not in PATTERN_REGISTRY]
+    if unknown_tables:
+        raise ValueError(f"Extractor {extractor.name}: unknown pattern tables {unknown_tables}")
+    EXTRACTORS[extractor.name] = extractor
+    anchor_scanner.cache_clear()
+    prefilter_pattern.cache_clear()
+
+
+@functools.lru_cache(maxsize=None)
+def anchor_scanner(names):
+    """启用的提取器所用规则表的锚点扫描器，提取器没有声明规则表时返回None"""
+    anchors = {anchor for name in names for table in EXTRACTORS[name].tables
+               for anchor, _ in PATTERN_REGISTRY[table]}
+    return AnchorScanner(anchors) if anchors else None
+
+
+@functools.lru_cache(maxsize=None)
+def prefilter_pattern(names, binary=True):
+    """启用的提取器声明的预过滤特征合并成的正则，binary为False时匹配str"""
+    markers = {marker for name in names for marker in EXTRACTORS[name].markers}
+    markers.update(EXTRA_MARKERS)
+    if not binary:
+        return re.compile('|'.join(re.escape(marker) for marker in sorted(markers)))
+    return re.compile(b'|'.join(re.escape(marker.encode('utf-8')) for marker in sorted(markers)))
+
+
+register_extractor(Extractor(
+    'endpoints', 'endpoints',
+    lambda content, anchors, minified, window, into:
+        into.update(extract_endpoints(content, anchors, minified, window)),
+    ('endpoints', 'minified_endpoints'), ('MethodDescriptor', 'Service', 'grpc'),
+))
+register_extractor(Extractor(
+    'messages', 'messages',
+    lambda content, anchors, minified, window, into:
+        extract_messages(content, anchors, minified, window, into),
+    ('message_setters', 'minified_message_setters', 'messages'), ('.prototype.set', 'proto.', 'protobuf'),
+    {'tokens': lambda content, anchors, minified, window, into:
+        extract_messages(content, anchors, minified, window, into, backend='tokens')},
+))
+register_extractor(Extractor(
+    'services', 'services',
+    lambda content, anchors, minified, window, into:
+        into.update(extract_services(content, anchors, window)),
+    ('services',), ('Service', 'proto.'),
+))
+register_extractor(Extractor(
+    'metadata', 'metadata',
+    lambda content, anchors, minified, window, into:
+        into.update(extract_metadata(content, anchors, window)),
+    ('metadata',), ('grpc',),
+))
+register_extractor(Extractor(
+    'error_handlers', 'error_handlers',
+    lambda content, anchors, minified, window, into:
+        into.update(extract_error_handlers(content, anchors, window)),
+    ('error_handlers',), ('grpc',),
+))
+register_extractor(Extractor(
+    'interceptors', 'interceptors',
+    lambda content, anchors, minified, window, into:
+        into.update(extract_interceptors(content, anchors, window)),
+    ('interceptors',), ('grpc',),
+))
+register_extractor(Extractor(
+    'wire_types', 'wire_types',
+    lambda content, anchors, minified, window, into:
+        extract_wire_types(content, anchors, into),
+    (), ('serializeBinary',),
+))
+
+
+def load_pattern_file(file_path):
+    """加载自定义规则文件（YAML或JSON），返回文件内容摘要
+
+    格式：{表名: [{anchor: 锚点字面量, pattern: 正则}, ...], markers: [预过滤特征, ...]}
+    """
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()[:16]
+    if file_path in LOADED_PATTERN_FILES:
+        return digest
+    
+    if file_path.endswith('.json'):
+        spec = json.loads(raw)
+    elif yaml is None:
+        raise ImportError("PyYAML is required for YAML pattern files (pip install pyyaml)")
+    else:
+        spec = yaml.safe_load(raw) or {}
+    if not isinstance(spec, dict):
+        raise ValueError(f"{file_path}: expected a mapping of pattern tables")
+    
+    for table, entries in spec.items():
+        if table == 'markers':
+            register_markers(entries)
+            continue
+        try:
+            register_patterns(table, [(entry['anchor'], entry['pattern']) for entry in entries])
+        except (KeyError, TypeError):
+            raise ValueError(f"{file_path}: entries of '{table}' need 'anchor' and 'pattern'")
+        except re.error as e:
+            raise ValueError(f"{file_path}: invalid pattern in '{table}': {e}")
+    LOADED_PATTERN_FILES.add(file_path)
+    return digest
+
+
+def load_plugin(file_path):
+    """加载提取器插件：插件模块需定义register(scanner)，通过scanner.register_extractor注册提取器
+
+    返回插件文件内容摘要。
+    """
+    with open(file_path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:16]
+    if file_path in LOADED_PLUGIN_FILES:
+        return digest
+    
+    module_name = 'grpc_scan_plugin_' + os.path.splitext(os.path.basename(file_path))[0]
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    if spec is None:
+        raise ValueError(f"{file_path}: not a Python module")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if not hasattr(module, 'register'):
+        raise ValueError(f"{file_path}: plugin must define register(scanner)")
+    module.register(sys.modules[__name__])
+    LOADED_PLUGIN_FILES.add(file_path)
+    return digest
+
+
+def load_extensions(pattern_files=(), plugin_files=()):
+    """加载自定义规则文件和提取器插件，返回合并后的摘要"""
+    digests = ([load_pattern_file(file_path) for file_path in pattern_files] +
+               [load_plugin(file_path) for file_path in plugin_files])
+    return hashlib.sha256(':'.join(digests).encode()).hexdigest()[:16] if digests else ''
+
+
+# proto源码记号：字符串、标识符（含带点的全限定名）、数字和符号，空白与注释直接跳过
+PROTO_TOKEN_PATTERN = re.compile(r'''
+      \s+
+    | //[^\n]*
+    | /\*.*?\*/
+    | (?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+    | (?P<word>\.?[A-Za-z_][\w.]*)
+    | (?P<number>[-+]?(?:0[xX][0-9a-fA-F]+|\d+(?:\.\d*)?(?:[eE][-+]?\d+)?))
+    | (?P<symbol>[{}\[\]()<>;,=:.-])
+''', re.VERBOSE | re.DOTALL)
+
+
+def tokenize_proto(content):
+    """单次遍历将proto源码切分为记号文本列表"""
+    return [match.group(match.lastgroup) for match in PROTO_TOKEN_PATTERN.finditer(content)
+            if match.lastgroup]
+
+
+class ProtoParser:
+    """基于记号流的递归下降proto解析器，支持嵌套消息、枚举、oneof和map字段"""
+
+    FIELD_LABELS = ('repeated', 'optional', 'required')
+
+    def __init__(self, content):
+        self.tokens = tokenize_proto(content)
+        self.pos = 0
+        self.result = ProtoResult(package='')
+
+    def peek(self, offset=0):
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def next(self):
+        token = self.peek()
+        if token is None:
+            raise ValueError('unexpected end of proto file')
+        self.pos += 1
+        return token
+
+    def accept(self, token):
+        if self.peek() == token:
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, token):
+        if not self.accept(token):
+            raise ValueError(f"expected {token!r} but got {self.peek()!r}")
+
+    def skip_statement(self):
+        """跳过一条语句：到同层的';'为止，或跳过完整的{}块；不消费外层块的'}'"""
+        depth = 0
+        while self.peek() is not None:
+            token = self.peek()
+            if token == '}' and depth == 0:
+                return
+            self.pos += 1
+            if token == '{':
+                depth += 1
+            elif token == '}':
+                depth -= 1
+                if depth == 0:
+                    return
+            elif token == ';' and depth == 0:
+                return
+
+    def skip_brackets(self):
+        """跳过字段选项 [...]"""
+        depth = 1
+        while depth:
+            token = self.next()
+            if token == '[':
+                depth += 1
+            elif token == ']':
+                depth -= 1
+
+    @staticmethod
+    def unquote(token):
+        if token and token[0] in '"\'':
+            return token[1:-1]
+        return token
+
+    def parse(self):
+        while self.peek() is not None:
+            token = self.next()
+            if token == 'package':
+                self.result.package = self.next()
+                self.expect(';')
+            elif token == 'import':
+                if self.peek() in ('public', 'weak'):
+                    self.next()
+                self.result.imports.append(self.unquote(self.next()))
+                self.expect(';')
+            elif token == 'option':
+                self.parse_option(self.result.options)
+            elif token == 'message':
+                self.parse_message('')
+            elif token == 'enum':
+                self.parse_enum('')
+            elif token == 'service':
+                self.parse_service()
+            elif token != ';':
+                # syntax、edition、extend等语句
+                self.pos -= 1
+                self.skip_statement()
+        return self.result
+
+    def parse_option(self, options):
+        name = []
+        while self.peek() not in ('=', None):
+            name.append(self.next())
+        self.expect('=')
+        if self.peek() == '{':
+            self.skip_statement()  # 聚合值
+            value = ''
+        else:
+            value = self.unquote(self.next())
+        self.accept(';')
+        options[''.join(name)] = value
+
+    def parse_message(self, prefix):
+        name = prefix + self.next()
+        message = {'name': name, 'fields': []}
+        self.result.messages.append(message)
+        self.expect('{')
+        while not self.accept('}'):
+            token = self.peek()
+            if token == 'message':
+                self.next()
+                self.parse_message(name + '.')
+            elif token == 'enum':
+                self.next()
+                self.parse_enum(name + '.')
+            elif token == 'oneof':
+                self.next()
+                oneof = self.next()
+                self.expect('{')
+                while not self.accept('}'):
+                    if self.peek() in ('option', ';'):
+                        self.skip_statement()
+                    else:
+                        self.parse_field(message, oneof)
+            elif token in ('option', 'reserved', 'extensions', 'extend', ';'):
+                self.skip_statement()
+            else:
+                self.parse_field(message)
+
+    def parse_field(self, message, oneof=None):
+        label = 'optional'
+        if self.peek() in self.FIELD_LABELS:
+            label = self.next()
+        if self.peek() == 'group':
+            self.skip_statement()  # proto2 group
+            return
+        if self.peek() == 'map' and self.peek(1) == '<':
+            self.next()
+            self.expect('<')
+            key_type = self.next()
+            self.expect(',')
+            value_type = self.next()
+            self.expect('>')
+            field_type = f"map<{key_type}, {value_type}>"
+        else:
+            field_type = self.next()
+        field_name = self.next()
+        self.expect('=')
+        number = self.next()
+        if self.accept('['):
+            self.skip_brackets()
+        self.expect(';')
+        field_info = {'label': label, 'type': field_type, 'name': field_name, 'number': number}
+        if oneof:
+            field_info['oneof'] = oneof
+        message['fields'].append(field_info)
+
+    def parse_enum(self, prefix):
+        enum = {'name': prefix + self.next(), 'values': []}
+        self.result.enums.append(enum)
+        self.expect('{')
+        while not self.accept('}'):
+            if self.peek() in ('option', 'reserved', ';'):
+                self.skip_statement()
+                continue
+            value_name = self.next()
+            self.expect('=')
+            number = self.next()
+            if self.accept('['):
+                self.skip_brackets()
+            self.expect(';')
+            enum['values'].append({'name': value_name, 'number': number})
+
+    def parse_service(self):
+        service = {'name': self.next(), 'methods': []}
+        self.result.services.append(service)
+        self.expect('{')
+        while not self.accept('}'):
+            if self.peek() != 'rpc':
+                self.skip_statement()
+                continue
+            self.next()
+            method = {'name': self.next()}
+            self.expect('(')
+            method['client_streaming'] = self.accept('stream')
+            method['input_type'] = self.next()
+            self.expect(')')
+            self.expect('returns')
+            self.expect('(')
+            method['server_streaming'] = self.accept('stream')
+            method['output_type'] = self.next()
+            self.expect(')')
+            if self.peek() == '{':
+                self.skip_statement()
+            else:
+                self.expect(';')
+            service['methods'].append(method)
+
+
+def parse_proto_content(content):
+    """解析proto源码，返回ProtoResult"""
+    return ProtoParser(content).parse()
+
+
 def parse_proto_file(file_path):
     """解析.proto文件"""
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
-            
-        # 使用正则表达式解析proto文件
-        results = {
-            'package': '',
-            'services': [],
-            'messages': [],
-            'imports': [],
-            'options': {}
-        }
-        
-        # 提取包名
-        package_match = re.search(r'package\s+([^;]+);', content)
-        if package_match:
-            results['package'] = package_match.group(1)
-        
-        # 提取导入
-        import_matches = re.finditer(r'import\s+[\'"]([^\'\"]+)[\'"];', content)
-        for match in import_matches:
-            results['imports'].append(match.group(1))
-        
-        # 提取服务定义
-        service_matches = re.finditer(
-            r'service\s+(\w+)\s*{([^}]+)}',
-            content
-        )
-        for match in service_matches:
-            service_name = match.group(1)
-            service_content = match.group(2)
-            
-            # 提取方法
-            methods = []
-            method_matches = re.finditer(
-                r'rpc\s+(\w+)\s*\(([^)]+)\)\s*returns\s*\(([^)]+)\)',
-                service_content
-            )
-            for method_match in method_matches:
-                method = {
-                    'name': method_match.group(1),
-                    'input_type': method_match.group(2).strip(),
-                    'output_type': method_match.group(3).strip(),
-                    'client_streaming': 'stream' in method_match.group(2),
-                    'server_streaming': 'stream' in method_match.group(3)
-                }
-                methods.append(method)
-            
-            results['services'].append({
-                'name': service_name,
-                'methods': methods
-            })
-        
-        # 提取消息定义
-        message_matches = re.finditer(
-            r'message\s+(\w+)\s*{([^}]+)}',
-            content
-        )
-        for match in message_matches:
-            message_name = match.group(1)
-            message_content = match.group(2)
-            
-            # 提取字段
-            fields = []
-            field_matches = re.finditer(
-                r'(repeated|optional|required)?\s*(\w+)\s+(\w+)\s*=\s*(\d+)',
-                message_content
-            )
-            for field_match in field_matches:
-                field = {
-                    'label': field_match.group(1) or 'optional',
-                    'type': field_match.group(2),
-                    'name': field_match.group(3),
-                    'number': field_match.group(4)
-                }
-                fields.append(field)
-            
-            results['messages'].append({
-                'name': message_name,
-                'fields': fields
-            })
-        
-        # 提取选项
-        option_matches = re.finditer(
-            r'option\s+(\w+)\s*=\s*[\'"]([^\'\"]+)[\'"];',
-            content
-        )
-        for match in option_matches:
-            results['options'][match.group(1)] = match.group(2)
-            
-        return results
+        return parse_proto_content(content)
         
     except Exception as e:
         print(f"{Fore.RED}Error parsing proto file {file_path}: {str(e)}{Style.RESET_ALL}")
         return None
 
-def generate_proto_content(messages, services=None, package_name=None):
-    """Generate proto file content"""
+
+PROTO_SCALAR_TYPES = frozenset(('double', 'float', 'int32', 'int64', 'uint32', 'uint64', 'sint32', 'sint64',
+                                'fixed32', 'fixed64', 'sfixed32', 'sfixed64', 'bool', 'string', 'bytes'))
+
+
+def resolve_proto_type(type_name, scope, message_names, enum_names):
+    """按proto的作用域规则把类型引用解析为全限定名，scope为引用处所在的消息或包
+
+    本文件中定义的枚举返回enum（线上编码与int32相同），标量类型和无法解析的外部类型原样返回。
+    """
+    if type_name in PROTO_SCALAR_TYPES:
+        return type_name
+    if type_name.startswith('.'):
+        candidates = [type_name[1:]]
+    else:
+        parts = scope.split('.') if scope else []
+        candidates = ['.'.join(parts[:i] + [type_name]) for i in range(len(parts), -1, -1)]
+    for candidate in candidates:
+        if candidate in enum_names:
+            return 'enum'
+        if candidate in message_names:
+            return candidate
+    return candidates[-1]
+
+
+def scan_proto_content(content, file_path):
+    """将.proto文件的解析结果转换为FileResult，消息名使用包名限定
+
+    字段类型保留proto原生类型（嵌套消息解析为全限定名），同时写入wire_types以保留oneof；
+    rpc_types记录各方法的请求/响应类型。
+    """
+    proto = parse_proto_content(content)
+    prefix = f"{proto.package}." if proto.package else ''
+    message_names = {prefix + message['name'] for message in proto.messages}
+    enum_names = {prefix + enum['name'] for enum in proto.enums}
+    
+    def resolve(type_name, scope):
+        return resolve_proto_type(type_name, scope, message_names, enum_names)
+    
+    endpoints = []
+    rpc_types = {}
+    for service in proto.services:
+        for method in service['methods']:
+            endpoint = f"/{prefix}{service['name']}/{method['name']}"
+            endpoints.append(endpoint)
+            rpc_types[endpoint] = [
+                ('stream ' if method['client_streaming'] else '') + resolve(method['input_type'], proto.package),
+                ('stream ' if method['server_streaming'] else '') + resolve(method['output_type'], proto.package),
+            ]
+    services = sorted(service['name'] for service in proto.services)
+    messages = {}
+    wire_types = {}
+    for message in proto.messages:
+        name = prefix + message['name']
+        messages[name] = []
+        wire_types[name] = {}
+        for f in message['fields']:
+            if f['type'].startswith('map<'):
+                key_type, _, value_type = f['type'][4:-1].partition(', ')
+                field_type = f"map<{key_type}, {resolve(value_type, name)}>"
+            else:
+                field_type = resolve(f['type'], name)
+                if f['label'] == 'repeated':
+                    field_type = f'repeated {field_type}'
+            messages[name].append([f['name'], field_type, f['number']])
+            wire_types[name][f['number']] = [field_type, f['name'], f.get('oneof', '')]
+    
+    return FileResult(
+        file_path=file_path,
+        endpoints=sorted(endpoints),
+        messages=messages,
+        services=services,
+        wire_types=wire_types,
+        proto_content=content,
+        rpc_types=rpc_types
+    )
+
+# wire_types中不是proto类型名的线上类型
+WIRE_PROTO_ALIASES = {'enum': 'int32'}
+
+
+def generate_proto_content(messages, services=None, package_name=None, wire_types=None, service_methods=None):
+    """Generate proto file content
+
+    wire_types为serializeBinaryToWriter/deserializeBinaryFromReader（或.proto输入）得到的线上类型，
+    有线上类型的字段优先使用它，并补充setter中没有的字段和oneof。
+    service_methods为 {服务名: {方法名: [请求类型, 响应类型]或None}} 时输出其中的每个服务，不再从消息名推断。
+    """
+    wire_types = wire_types or {}
+    messages = dict(messages)
+    for name in wire_types:
+        messages.setdefault(name, [])
     proto_content = []
     
     proto_content.append('syntax = "proto3";\n')
@@ -1098,7 +4301,7 @@ def generate_proto_content(messages, services=None, package_name=None):
     if package_name:
         proto_content.append(f'package {package_name};')
     else:
-        first_msg = next(iter(messages))
+        first_msg = next(iter(messages), '')
         if '.' in first_msg:
             package_name = first_msg.split('.')[0]
             proto_content.append(f'package {package_name};')
@@ -1129,8 +4332,24 @@ def generate_proto_content(messages, services=None, package_name=None):
     if not service_name and package_name:
         service_name = package_name.capitalize() + 'Service'
     
+    # 本文件中定义的消息按短名引用，其余保留全限定名；枚举定义不在生成代码中，按线上编码相同的int32输出
+    short_names = {name: name.split('.')[-1] for name in messages}
+    
+    def local_type(type_name):
+        return re.sub(r'[\w.]+', lambda m: short_names.get(m.group(), WIRE_PROTO_ALIASES.get(m.group(), m.group())),
+                      type_name)
+    
     # 生成服务定义
-    if service_name:
+    if service_methods:
+        for name, methods in service_methods.items():
+            proto_content.append(f'service {name} {{')
+            for method_name, types in methods.items():
+                # 没有解析到类型时，请求/响应类型按grpc-web的惯例命名为 方法名Request / 方法名Response
+                request, response = types or (f'{method_name}Request', f'{method_name}Response')
+                proto_content.append(f'  // {method_name} method')
+                proto_content.append(f'  rpc {method_name} ({local_type(request)}) returns ({local_type(response)}) {{}}\n')
+            proto_content.append('}\n')
+    elif service_name:
         proto_content.append(f'service {service_name} {{')
         
         # Find Request/Response pairs
@@ -1148,16 +4367,44 @@ def generate_proto_content(messages, services=None, package_name=None):
         proto_content.append('}\n')
     
     # Message definitions
-    for msg_name, msg_fields in messages.items():
-        if '.' in msg_name:
-            msg_name = msg_name.split('.')[-1]
+    for full_name, msg_fields in messages.items():
+        msg_name = short_names[full_name]
+        wire_fields = wire_types.get(full_name, {})
         
         proto_content.append(f'message {msg_name} {{')
         
-        for field in msg_fields:
+        lines = []
+        oneof_lines = {}
+        numbers = {str(field[2]) for field in msg_fields}
+        extra = [[wire_field[1] or f'field_{number}', None, number]
+                 for number, wire_field in sorted(wire_fields.items(), key=lambda item: int(item[0]))
+                 if number not in numbers]
+        for field in list(msg_fields) + extra:
             field_name, field_type, field_number = field
-            proto_type = convert_field_type_to_proto(field_type)
-            proto_content.append(f'  {proto_type} {field_name.lower()} = {field_number};')
+            wire_field = wire_fields.get(str(field_number))
+            if wire_field:
+                proto_type = local_type(wire_field[0])
+                oneof = wire_field[2]
+            else:
+                proto_type = convert_field_type_to_proto(field_type)
+                oneof = ''
+            line = f'{proto_type} {field_name.lower()} = {field_number};'
+            if not oneof:
+                lines.append(line)
+            elif oneof in oneof_lines:
+                oneof_lines[oneof].append(line)
+            else:
+                # oneof块放在第一个成员的位置
+                oneof_lines[oneof] = [line]
+                lines.append((oneof, oneof_lines[oneof]))
+        
+        for line in lines:
+            if isinstance(line, tuple):
+                proto_content.append(f'  oneof {line[0]} {{')
+                proto_content.extend(f'    {member}' for member in line[1])
+                proto_content.append('  }')
+            else:
+                proto_content.append(f'  {line}')
         
         proto_content.append('}\n')
     
@@ -1179,8 +4426,23 @@ def convert_field_type_to_proto(field_type):
         'Proto3EnumField': 'int32',  # 默认枚举类型
         'Proto3TimestampField': 'google.protobuf.Timestamp',
         'Proto3DurationField': 'google.protobuf.Duration',
+        # 没有线上类型时：嵌套消息和map条目都是length-delimited，用bytes可保持线上兼容
+        'WrapperField': 'bytes',
+        'OneofWrapperField': 'bytes',
+        'RepeatedWrapperField': 'repeated bytes',
+        'MapField': 'repeated bytes',
+        # TypeScript接口字段类型
+        'string': 'string',
+        'number': 'double',
+        'boolean': 'bool',
+        'Uint8Array': 'bytes',
     }
     
+    # .proto输入的原生类型（标量、repeated、map、消息全限定名）原样保留，枚举按int32输出
+    if field_type in PROTO_SCALAR_TYPES or field_type == 'enum' or field_type.startswith(('repeated ', 'map<')) \
+            or '.' in field_type:
+        return re.sub(r'[\w.]+', lambda m: WIRE_PROTO_ALIASES.get(m.group(), m.group()), field_type)
+    
     if field_type.startswith('Array<') or field_type.startswith('Repeated<'):
         inner_type = field_type[field_type.find('<')+1:field_type.find('>')]
         base_type = type_mapping.get(inner_type, 'string')
@@ -1197,8 +4459,65 @@ if __name__ == "__main__":
     parser.add_argument('--dir')
     parser.add_argument('--stdin', action='store_true', default=False)
     parser.add_argument('--report', help='Output report file name (default: grpc_scan_YYYYMMDD_HHMMSS.html)')
+    parser.add_argument('--report-pages', action='store_true', default=False,
+                       help='Write a small index page plus lazily loaded section shards next to the report')
+    parser.add_argument('--proto-dir',
+                       help='Write one deduplicated .proto per package, merged across all scanned files')
+    parser.add_argument('--output-format', choices=['ndjson', 'json'],
+                       help='Stream each file result to disk as it completes instead of building an HTML report')
+    parser.add_argument('--output', help='Output file of --output-format (default: grpc_scan_YYYYMMDD_HHMMSS.<format>)')
     parser.add_argument('--workers', type=int, default=10,
                        help='Number of worker threads (default: 10)')
+    parser.add_argument('--executor', choices=['thread', 'process'], default='thread',
+                       help='Concurrency backend for directory scans (default: thread)')
+    parser.add_argument('--schedule', choices=['walk', 'size'], default='walk',
+                       help='Dispatch files in directory walk order as they are found, or largest first (LPT, '
+                            'stats and buffers the tree before the first dispatch) (default: walk)')
+    parser.add_argument('--batch-kb', type=int, default=SMALL_BATCH_BYTES // 1024,
+                       help='Batch files smaller than this into one task, up to this many KB (default: 256)')
+    parser.add_argument('--no-archives', action='store_true', default=False,
+                       help='Do not scan zip/apk/tar/asar archives found in --dir as virtual directories')
+    parser.add_argument('--cache-dir', help='Directory of the persistent result cache (disabled by default)')
+    parser.add_argument('--cache-size', type=int, default=512,
+                       help='Maximum result cache size in MB (default: 512)')
+    parser.add_argument('--no-prefilter', action='store_true', default=False,
+                       help='Scan every file even without gRPC markers')
+    parser.add_argument('--no-beautify', action='store_true', default=False,
+                       help='Skip jsbeautifier and match minified code directly')
+    parser.add_argument('--stream', action='store_true', default=False,
+                       help='Scan JS files in overlapping windows with bounded memory (implies --no-beautify)')
+    parser.add_argument('--window-size', type=int, default=4,
+                       help='Streaming window size in MB (default: 4)')
+    parser.add_argument('--window-overlap', type=int, default=64,
+                       help='Streaming window overlap in KB, must cover the longest match (default: 64)')
+    parser.add_argument('--timeout', type=float,
+                       help='Per-file time budget in seconds; over-budget files are recorded as errors')
+    parser.add_argument('--extractor-timeout', type=float,
+                       help='Per-extractor time budget in seconds')
+    parser.add_argument('--profile', action='store_true', default=False,
+                       help='Record wall/CPU time per stage and per pattern for every file')
+    parser.add_argument('--profile-top', type=int, default=10,
+                       help='Number of slowest files listed by --profile (default: 10)')
+    parser.add_argument('--profile-output',
+                       help='JSON file of the --profile summary (default: grpc_profile_YYYYMMDD_HHMMSS.json)')
+    parser.add_argument('--profiler', choices=['cprofile', 'pyinstrument'],
+                       help='Run the whole scan under cProfile (including thread-pool workers) or '
+                            'pyinstrument (main thread only); process-pool workers are not profiled')
+    parser.add_argument('--patterns', action='append', default=[],
+                       help='Extra extraction patterns from a YAML/JSON file (repeatable)')
+    parser.add_argument('--plugin', action='append', default=[],
+                       help='Python file defining register(scanner) to add extractors (repeatable)')
+    parser.add_argument('--extractors',
+                       help='Comma-separated JavaScript extractors to run (default: all registered)')
+    parser.add_argument('--backend', choices=['regex', 'tokens'], default='regex',
+                       help='Message extraction backend; tokens tokenizes protoc-gen-js code in one pass '
+                            'and implies --no-beautify (default: regex)')
+    parser.add_argument('--source-maps', action='store_true', default=False,
+                       help='Scan grpc-web modules from the sourcesContent of bundle source maps instead of the bundle')
+    parser.add_argument('--split-modules', action='store_true', default=False,
+                       help='Split webpack/Rollup bundles into modules and only process modules with gRPC markers')
+    parser.add_argument('--mmap', action='store_true', default=False,
+                       help='Run bytes patterns on memory-mapped JS files (implies --no-beautify)')
 
     args, unknown = parser.parse_known_args()
 
@@ -1207,21 +4526,117 @@ if __name__ == "__main__":
             print_parser_help(prog=parser.prog)
             exit(0)
 
-    scan_result = ScanResult()
+    extension_digest = ''
+    if args.patterns or args.plugin:
+        try:
+            extension_digest = load_extensions(args.patterns, args.plugin)
+        except (OSError, ValueError, ImportError) as e:
+            print(f"{Fore.RED}Failed to load extensions: {e}{Style.RESET_ALL}")
+            exit(1)
+    
+    code_profiler = None
+    if args.profiler is not None:
+        try:
+            code_profiler = CodeProfiler(args.profiler)
+        except ImportError as e:
+            print(f"{Fore.RED}{e}{Style.RESET_ALL}")
+            exit(1)
+    
+    extractors = None
+    if args.extractors is not None:
+        extractors = tuple(name.strip() for name in args.extractors.split(',') if name.strip())
+        unknown_extractors = [name for name in extractors if name not in EXTRACTORS]
+        if unknown_extractors or not extractors:
+            print(f"{Fore.RED}Unknown extractors: {', '.join(unknown_extractors)} "
+                  f"(available: {', '.join(EXTRACTORS)}){Style.RESET_ALL}")
+            exit(1)
+    
+    scan_result = ScanResult(keep_files=False)
+    options = ScanOptions(
+        prefilter=not args.no_prefilter,
+        beautify=not (args.no_beautify or args.stream or args.mmap or args.backend == 'tokens'),
+        stream=args.stream,
+        mmap=args.mmap,
+        source_maps=args.source_maps,
+        split_modules=args.split_modules,
+        window_size=args.window_size * 1024 * 1024,
+        window_overlap=args.window_overlap * 1024,
+        extractors=extractors,
+        backend=args.backend,
+        profile=args.profile,
+        timeout=args.timeout,
+        extractor_timeout=args.extractor_timeout,
+        pattern_files=tuple(args.patterns),
+        plugin_files=tuple(args.plugin),
+        extension_digest=extension_digest,
+    )
+    
+    cache = None
+    if args.cache_dir is not None:
+        cache = ResultCache(args.cache_dir, max_size=args.cache_size * 1024 * 1024)
+
+    # 结果逐个写出到NDJSON/JSON和HTML报告，内存中只保留计数
+    result_writer = None
+    if args.output_format is not None:
+        output_path = args.output
+        if output_path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_path = f"grpc_scan_{timestamp}.{args.output_format}"
+        result_writer = ResultWriter(output_path, args.output_format)
+    
+    # 生成HTML报告，指定--output-format且未指定--report时不生成
+    report_writer = None
+    if args.output_format is None or args.report is not None:
+        if args.report is not None:
+            report_path = args.report
+        else:
+            # 使用当前时间生成默认报告名称
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            report_path = f"grpc_scan_{timestamp}.html"
+        report_class = PagedReportWriter if args.report_pages else HtmlReportWriter
+        report_writer = report_class(report_path, scan_result.timestamp)
+    
+    # 跨文件去重后按包输出proto
+    global_index = GlobalIndex() if args.proto_dir is not None else None
+    
+    profile_summary = ProfileSummary(args.profile_top) if args.profile else None
+    
+    writers = [writer for writer in (result_writer, report_writer, global_index, profile_summary)
+               if writer is not None]
+    
+    if code_profiler is not None:
+        code_profiler.start()
 
+    if (args.timeout or args.extractor_timeout) and args.dir is not None and args.executor == 'thread':
+        print(f"{Fore.YELLOW}Note: thread workers check time budgets between patterns only; "
+              f"use --executor process to interrupt a runaway regex{Style.RESET_ALL}")
+    
     if args.dir is not None:
-        scan_result = process_directory(args.dir, print_results=True, max_workers=args.workers)
+        scan_result = process_directory(args.dir, print_results=True, max_workers=args.workers,
+                                        executor=args.executor, cache=cache,
+                                        options=options, writers=writers,
+                                        keep_files=False, schedule=args.schedule,
+                                        batch_bytes=args.batch_kb * 1024,
+                                        archives=not args.no_archives)
             
     elif args.file is not None:
-        result = process_single_file(args.file, print_results=True)
+        result = process_single_file(args.file, print_results=True, cache=cache,
+                                     options=options)
         scan_result.add_file_result(result)
+        for writer in writers:
+            writer.write(result)
         
     else:
         # 处理标准输入
         js_content = read_standard_input()
-        js_content = beautify_js_content(js_content)
-        endpoints = extract_endpoints(js_content)
-        messages = extract_messages(js_content)
+        if options.beautify:
+            try:
+                js_content = beautify_js_content(js_content)
+            except ValueError as e:
+                print(f"{Fore.RED}{e}{Style.RESET_ALL}")
+                exit(1)
+        endpoints = extract_endpoints(js_content, minified=not options.beautify)
+        messages = extract_messages(js_content, minified=not options.beautify, backend=options.backend)
         services = extract_services(js_content)
         
         print(f"{Fore.GREEN}Found Endpoints:{Style.RESET_ALL}")
@@ -1247,13 +4662,31 @@ if __name__ == "__main__":
             services=services
         )
         scan_result.add_file_result(result)
-
-    # 生成HTML报告
-    if args.report is not None:
-        report_path = args.report
-    else:
-        # 使用当前时间生成默认报告名称
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_path = f"grpc_scan_{timestamp}.html"
+        for writer in writers:
+            writer.write(result)
     
-    generate_html_report(scan_result, report_path)
+    if code_profiler is not None:
+        code_profiler.stop()
+    if cache is not None:
+        cache.evict()
+    if result_writer is not None:
+        result_writer.close()
+        print(f"\n{args.output_format.upper()}结果已写入: {output_path}")
+    if global_index is not None:
+        proto_paths = global_index.write_protos(args.proto_dir)
+        print(f"\n已生成 {len(proto_paths)} 个去重proto文件: {args.proto_dir} "
+              f"({len(global_index.messages)} 个唯一消息，合并前 {global_index.occurrences} 个)")
+    print_scan_summary(scan_result)
+    if profile_summary is not None:
+        profile_summary.print_tables()
+        profile_path = args.profile_output
+        if profile_path is None:
+            profile_path = f"grpc_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        profile_summary.save(profile_path)
+        print(f"\n耗时分析已写入: {profile_path}")
+    if code_profiler is not None:
+        code_profiler.report()
+
+    if report_writer is not None:
+        report_writer.close()
+        print(f"\nHTML报告已生成: {report_path}")
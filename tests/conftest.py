@@ -0,0 +1,22 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_scanner():
+    """按文件路径导入gRPC-Web-scan.py（文件名含连字符，不能直接import）"""
+    if 'grpc_web_scan' not in sys.modules:
+        spec = importlib.util.spec_from_file_location('grpc_web_scan', os.path.join(ROOT, 'gRPC-Web-scan.py'))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['grpc_web_scan'] = module  # dataclass需要能在sys.modules中找到模块
+        spec.loader.exec_module(module)
+    return sys.modules['grpc_web_scan']
+
+
+@pytest.fixture(scope='session')
+def scanner():
+    return load_scanner()
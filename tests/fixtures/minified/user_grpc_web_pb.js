@@ -0,0 +1,136 @@
+/**
+ * @fileoverview gRPC-Web generated client stub for acme.user.v1
+ * @enhanceable
+ * @public
+ */
+
+// GENERATED CODE -- DO NOT EDIT!
+
+/* eslint-disable */
+// @ts-nocheck
+
+const grpc = {};
+grpc.web = require('grpc-web');
+
+const proto = {};
+proto.acme = {};
+proto.acme.user = {};
+proto.acme.user.v1 = require('./user_pb.js');
+
+/**
+ * @param {string} hostname
+ * @param {?Object} credentials
+ * @param {?grpc.web.ClientOptions} options
+ * @constructor
+ * @struct
+ * @final
+ */
+proto.acme.user.v1.UserServiceClient =
+    function(hostname, credentials, options) {
+  if (!options) options = {};
+  options.format = 'binary';
+
+  /**
+   * @private @const {!grpc.web.GrpcWebClientBase} The client
+   */
+  this.client_ = new grpc.web.GrpcWebClientBase(options);
+
+  /**
+   * @private @const {string} The hostname
+   */
+  this.hostname_ = hostname.replace(/\/+$/, '');
+
+};
+
+
+/**
+ * @const
+ * @type {!grpc.web.MethodDescriptor<
+ *   !proto.acme.user.v1.GetUserRequest,
+ *   !proto.acme.user.v1.User>}
+ */
+const methodDescriptor_UserService_GetUser = new grpc.web.MethodDescriptor(
+  "/acme.user.v1.UserService/GetUser",
+  grpc.web.MethodType.UNARY,
+  proto.acme.user.v1.GetUserRequest,
+  proto.acme.user.v1.User,
+  /**
+   * @param {!proto.acme.user.v1.GetUserRequest} request
+   * @return {!Uint8Array}
+   */
+  function(request) {
+    return request.serializeBinary();
+  },
+  proto.acme.user.v1.User.deserializeBinary
+);
+
+
+/**
+ * @param {!proto.acme.user.v1.GetUserRequest} request The
+ *     request proto
+ * @param {?Object<string, string>} metadata User defined
+ *     call metadata
+ * @param {function(?grpc.web.RpcError, ?proto.acme.user.v1.User)}
+ *     callback The callback function(error, response)
+ * @return {!grpc.web.ClientReadableStream<!proto.acme.user.v1.User>|undefined}
+ *     The XHR Node Readable Stream
+ */
+proto.acme.user.v1.UserServiceClient.prototype.getUser =
+    function(request, metadata, callback) {
+  return this.client_.rpcCall(this.hostname_ +
+      "/acme.user.v1.UserService/GetUser",
+      request,
+      metadata || {},
+      methodDescriptor_UserService_GetUser,
+      callback);
+};
+
+
+/**
+ * @const
+ * @type {!grpc.web.MethodDescriptor<
+ *   !proto.acme.user.v1.Empty,
+ *   !proto.acme.user.v1.User>}
+ */
+const methodDescriptor_UserService_WatchUsers = new grpc.web.MethodDescriptor(
+  "/acme.user.v1.UserService/WatchUsers",
+  grpc.web.MethodType.SERVER_STREAMING,
+  proto.acme.user.v1.Empty,
+  proto.acme.user.v1.User,
+  function(request) {
+    return request.serializeBinary();
+  },
+  proto.acme.user.v1.User.deserializeBinary
+);
+
+
+proto.acme.user.v1.UserServiceClient.prototype.watchUsers =
+    function(request, metadata) {
+  return this.client_.serverStreaming(this.hostname_ +
+      '/acme.user.v1.UserService/WatchUsers',
+      request,
+      metadata || {},
+      methodDescriptor_UserService_WatchUsers);
+};
+
+
+/**
+ * @const
+ * @type {!grpc.web.MethodDescriptor<
+ *   !proto.acme.user.v1.User,
+ *   !proto.acme.user.v1.Empty>}
+ */
+const methodDescriptor_UserService_UpdateUser = new grpc.web.MethodDescriptor(
+  "/acme.user.v1.UserService/UpdateUser",
+  grpc.web.MethodType.UNARY,
+  proto.acme.user.v1.User,
+  proto.acme.user.v1.Empty,
+  function(request) {
+    return request.serializeBinary();
+  },
+  proto.acme.user.v1.Empty.deserializeBinary
+);
+
+
+module.exports = proto.acme.user.v1;
+
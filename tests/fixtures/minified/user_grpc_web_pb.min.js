@@ -0,0 +1 @@
+const t={};t.web=require("grpc-web");const r={};r.acme={},r.acme.user={},r.acme.user.v1=require("./user_pb.js"),r.acme.user.v1.UserServiceClient=function(e,s,n){n||(n={}),n.format="binary",this.client_=new t.web.GrpcWebClientBase(n),this.hostname_=e.replace(/\/+$/,"")};const a=new t.web.MethodDescriptor("/acme.user.v1.UserService/GetUser",t.web.MethodType.UNARY,r.acme.user.v1.GetUserRequest,r.acme.user.v1.User,function(e){return e.serializeBinary()},r.acme.user.v1.User.deserializeBinary);r.acme.user.v1.UserServiceClient.prototype.getUser=function(e,s,n){return this.client_.rpcCall(this.hostname_+"/acme.user.v1.UserService/GetUser",e,s||{},a,n)};const o=new t.web.MethodDescriptor("/acme.user.v1.UserService/WatchUsers",t.web.MethodType.SERVER_STREAMING,r.acme.user.v1.Empty,r.acme.user.v1.User,function(e){return e.serializeBinary()},r.acme.user.v1.User.deserializeBinary);r.acme.user.v1.UserServiceClient.prototype.watchUsers=function(e,s){return this.client_.serverStreaming(this.hostname_+"/acme.user.v1.UserService/WatchUsers",e,s||{},o)};const i=new t.web.MethodDescriptor("/acme.user.v1.UserService/UpdateUser",t.web.MethodType.UNARY,r.acme.user.v1.User,r.acme.user.v1.Empty,function(e){return e.serializeBinary()},r.acme.user.v1.Empty.deserializeBinary);module.exports=r.acme.user.v1;
\ No newline at end of file
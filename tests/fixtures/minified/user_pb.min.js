@@ -0,0 +1 @@
+var s=require('google-protobuf');var goog=s;var global=(function(){return this||window||global||self||Function('return this')();}).call(null);goog.exportSymbol('proto.acme.user.v1.User',null,global);goog.exportSymbol('proto.acme.user.v1.GetUserRequest',null,global);goog.exportSymbol('proto.acme.user.v1.Empty',null,global);proto.acme.user.v1.User=function(opt_data){s.Message.initialize(this,opt_data,0,-1,proto.acme.user.v1.User.repeatedFields_,proto.acme.user.v1.User.oneofGroups_);};goog.inherits(proto.acme.user.v1.User,s.Message);proto.acme.user.v1.User.repeatedFields_=[4,5,9];proto.acme.user.v1.User.oneofGroups_=[[10,11]];proto.acme.user.v1.User.ContactCase={CONTACT_NOT_SET:0,EMAIL:10,PHONE:11};if(s.Message.GENERATE_TO_OBJECT){proto.acme.user.v1.User.prototype.toObject=function(opt_includeInstance){return proto.acme.user.v1.User.toObject(opt_includeInstance,this);};proto.acme.user.v1.User.toObject=function(e,t){var r,o={id:s.Message.getFieldWithDefault(t,1,"0"),displayName:s.Message.getFieldWithDefault(t,2,""),profile:(r=t.getProfile())&&proto.acme.user.v1.Profile.toObject(e,r),tagsList:(r=s.Message.getRepeatedField(t,4))==null?undefined:r,addressesList:s.Message.toObjectList(t.getAddressesList(),proto.acme.user.v1.Address.toObject,e),labelsMap:(r=t.getLabelsMap())?r.toObject(e,undefined):[],active:s.Message.getBooleanFieldWithDefault(t,7,false),score:s.Message.getFloatingPointFieldWithDefault(t,8,0.0),scoresList:(r=s.Message.getRepeatedFloatingPointField(t,9))==null?undefined:r,email:(r=s.Message.getField(t,10))==null?undefined:r,phone:(r=s.Message.getField(t,11))==null?undefined:r,avatar:t.getAvatar_asB64(),role:s.Message.getFieldWithDefault(t,13,0)};if(e){o.$jspbMessageInstance=t;}return o;};}proto.acme.user.v1.User.deserializeBinaryFromReader=function(t,reader){while(reader.nextField()){if(reader.isEndGroup()){break;}var field=reader.getFieldNumber();switch(field){case 1:var e=(reader.readInt64String());t.setId(e);break;case 3:var e=new proto.acme.user.v1.Profile;reader.readMessage(e,proto.acme.user.v1.Profile.deserializeBinaryFromReader);t.setProfile(e);break;default:reader.skipField();break;}}return t;};proto.acme.user.v1.User.serializeBinaryToWriter=function(e,t){var r=undefined;r=e.getId();if(parseInt(r,10)!==0){t.writeInt64String(1,r);}r=e.getDisplayName();if(r.length>0){t.writeString(2,r);}r=e.getProfile();if(r!=null){t.writeMessage(3,r,proto.acme.user.v1.Profile.serializeBinaryToWriter);}r=e.getTagsList();if(r.length>0){t.writeRepeatedString(4,r);}r=e.getAddressesList();if(r.length>0){t.writeRepeatedMessage(5,r,proto.acme.user.v1.Address.serializeBinaryToWriter);}r=e.getLabelsMap(true);if(r&&r.getLength()>0){r.serializeBinary(6,t,s.BinaryWriter.prototype.writeString,s.BinaryWriter.prototype.writeString);}r=e.getActive();if(r){t.writeBool(7,r);}r=e.getScore();if(r!==0.0){t.writeDouble(8,r);}r=e.getScoresList();if(r.length>0){t.writePackedFloat(9,r);}r=(s.Message.getField(e,10));if(r!=null){t.writeString(10,r);}r=(s.Message.getField(e,11));if(r!=null){t.writeString(11,r);}r=e.getAvatar_asU8();if(r.length>0){t.writeBytes(12,r);}r=e.getRole();if(r!==0.0){t.writeEnum(13,r);}};proto.acme.user.v1.User.prototype.getId=function(){return(s.Message.getFieldWithDefault(this,1,"0"));};proto.acme.user.v1.User.prototype.setId=function(e){return s.Message.setProto3StringIntField(this,1,e);};proto.acme.user.v1.User.prototype.getDisplayName=function(){return(s.Message.getFieldWithDefault(this,2,""));};proto.acme.user.v1.User.prototype.setDisplayName=function(e){return s.Message.setProto3StringField(this,2,e);};proto.acme.user.v1.User.prototype.getProfile=function(){return(s.Message.getWrapperField(this,proto.acme.user.v1.Profile,3));};proto.acme.user.v1.User.prototype.setProfile=function(e){return s.Message.setWrapperField(this,3,e);};proto.acme.user.v1.User.prototype.clearProfile=function(){return this.setProfile(undefined);};proto.acme.user.v1.User.prototype.getTagsList=function(){return(s.Message.getRepeatedField(this,4));};proto.acme.user.v1.User.prototype.setTagsList=function(e){return s.Message.setField(this,4,e||[]);};proto.acme.user.v1.User.prototype.addTags=function(e,n){return s.Message.addToRepeatedField(this,4,e,n);};proto.acme.user.v1.User.prototype.getAddressesList=function(){return(s.Message.getRepeatedWrapperField(this,proto.acme.user.v1.Address,5));};proto.acme.user.v1.User.prototype.setAddressesList=function(e){return s.Message.setRepeatedWrapperField(this,5,e);};proto.acme.user.v1.User.prototype.getLabelsMap=function(n){return(s.Message.getMapField(this,6,n,null));};proto.acme.user.v1.User.prototype.clearLabelsMap=function(){this.getLabelsMap().clear();return this;};proto.acme.user.v1.User.prototype.getActive=function(){return(s.Message.getBooleanFieldWithDefault(this,7,false));};proto.acme.user.v1.User.prototype.setActive=function(e){return s.Message.setProto3BooleanField(this,7,e);};proto.acme.user.v1.User.prototype.getScore=function(){return(s.Message.getFloatingPointFieldWithDefault(this,8,0.0));};proto.acme.user.v1.User.prototype.setScore=function(e){return s.Message.setProto3FloatField(this,8,e);};proto.acme.user.v1.User.prototype.getScoresList=function(){return(s.Message.getRepeatedFloatingPointField(this,9));};proto.acme.user.v1.User.prototype.setScoresList=function(e){return s.Message.setField(this,9,e||[]);};proto.acme.user.v1.User.prototype.getEmail=function(){return(s.Message.getFieldWithDefault(this,10,""));};proto.acme.user.v1.User.prototype.setEmail=function(e){return s.Message.setOneofField(this,10,proto.acme.user.v1.User.oneofGroups_[0],e);};proto.acme.user.v1.User.prototype.getPhone=function(){return(s.Message.getFieldWithDefault(this,11,""));};proto.acme.user.v1.User.prototype.setPhone=function(e){return s.Message.setOneofField(this,11,proto.acme.user.v1.User.oneofGroups_[0],e);};proto.acme.user.v1.User.prototype.getAvatar=function(){return(s.Message.getFieldWithDefault(this,12,""));};proto.acme.user.v1.User.prototype.getAvatar_asB64=function(){return(s.Message.bytesAsB64(this.getAvatar()));};proto.acme.user.v1.User.prototype.setAvatar=function(e){return s.Message.setProto3BytesField(this,12,e);};proto.acme.user.v1.User.prototype.getRole=function(){return(s.Message.getFieldWithDefault(this,13,0));};proto.acme.user.v1.User.prototype.setRole=function(e){return s.Message.setProto3EnumField(this,13,e);};proto.acme.user.v1.Empty=function(opt_data){s.Message.initialize(this,opt_data,0,-1,null,null);};proto.acme.user.v1.Empty.toObject=function(e,t){var r,o={};return o;};proto.acme.user.v1.Empty.serializeBinaryToWriter=function(e,t){var r=undefined;};proto.acme.user.v1.GetUserRequest.prototype.getUserId=function(){var tpl=`user/${this.x+`${"}"}`}`;var re=/[}{]+/g;return(s.Message.getFieldWithDefault(this,1,""));};proto.acme.user.v1.GetUserRequest.prototype.setUserId=function(e){return s.Message.setProto3StringField(this,1,e);};goog.object.extend(exports,proto.acme.user.v1);
\ No newline at end of file
@@ -0,0 +1,435 @@
+!function(e){var t={};function n(r){if(t[r])return t[r].exports;var o=t[r]={i:r,l:!1,exports:{}};return e[r].call(o.exports,o,o.exports,n),o.l=!0,o.exports}n(n.s=0)}([function(e,t,n){var e=n(7);t.debounce=function(e,t){var n;return function(){clearTimeout(n),n=setTimeout(e,t)}},t.clamp=function(e,t,n){return Math.min(Math.max(e,t),n)};},
+function(module, exports, require) {
+// source: user.proto
+/**
+ * @fileoverview
+ * @enhanceable
+ * @public
+ */
+// GENERATED CODE -- DO NOT EDIT!
+/* eslint-disable */
+var jspb = require('google-protobuf');
+var goog = jspb;
+var global = (function() { return this || window || global || self || Function('return this')(); }).call(null);
+
+goog.exportSymbol('proto.acme.user.v1.User', null, global);
+goog.exportSymbol('proto.acme.user.v1.GetUserRequest', null, global);
+goog.exportSymbol('proto.acme.user.v1.Empty', null, global);
+
+proto.acme.user.v1.User = function(opt_data) {
+  jspb.Message.initialize(this, opt_data, 0, -1, proto.acme.user.v1.User.repeatedFields_, proto.acme.user.v1.User.oneofGroups_);
+};
+goog.inherits(proto.acme.user.v1.User, jspb.Message);
+proto.acme.user.v1.User.repeatedFields_ = [4,5,9];
+proto.acme.user.v1.User.oneofGroups_ = [[10,11]];
+proto.acme.user.v1.User.ContactCase = {
+  CONTACT_NOT_SET: 0,
+  EMAIL: 10,
+  PHONE: 11
+};
+
+if (jspb.Message.GENERATE_TO_OBJECT) {
+proto.acme.user.v1.User.prototype.toObject = function(opt_includeInstance) {
+  return proto.acme.user.v1.User.toObject(opt_includeInstance, this);
+};
+
+proto.acme.user.v1.User.toObject = function(includeInstance, msg) {
+  var f, obj = {
+    id: jspb.Message.getFieldWithDefault(msg, 1, "0"),
+    displayName: jspb.Message.getFieldWithDefault(msg, 2, ""),
+    profile: (f = msg.getProfile()) && proto.acme.user.v1.Profile.toObject(includeInstance, f),
+    tagsList: (f = jspb.Message.getRepeatedField(msg, 4)) == null ? undefined : f,
+    addressesList: jspb.Message.toObjectList(msg.getAddressesList(),
+    proto.acme.user.v1.Address.toObject, includeInstance),
+    labelsMap: (f = msg.getLabelsMap()) ? f.toObject(includeInstance, undefined) : [],
+    active: jspb.Message.getBooleanFieldWithDefault(msg, 7, false),
+    score: jspb.Message.getFloatingPointFieldWithDefault(msg, 8, 0.0),
+    scoresList: (f = jspb.Message.getRepeatedFloatingPointField(msg, 9)) == null ? undefined : f,
+    email: (f = jspb.Message.getField(msg, 10)) == null ? undefined : f,
+    phone: (f = jspb.Message.getField(msg, 11)) == null ? undefined : f,
+    avatar: msg.getAvatar_asB64(),
+    role: jspb.Message.getFieldWithDefault(msg, 13, 0)
+  };
+
+  if (includeInstance) {
+    obj.$jspbMessageInstance = msg;
+  }
+  return obj;
+};
+}
+
+proto.acme.user.v1.User.deserializeBinaryFromReader = function(msg, reader) {
+  while (reader.nextField()) {
+    if (reader.isEndGroup()) {
+      break;
+    }
+    var field = reader.getFieldNumber();
+    switch (field) {
+    case 1:
+      var value = /** @type {string} */ (reader.readInt64String());
+      msg.setId(value);
+      break;
+    case 3:
+      var value = new proto.acme.user.v1.Profile;
+      reader.readMessage(value,proto.acme.user.v1.Profile.deserializeBinaryFromReader);
+      msg.setProfile(value);
+      break;
+    default:
+      reader.skipField();
+      break;
+    }
+  }
+  return msg;
+};
+
+proto.acme.user.v1.User.serializeBinaryToWriter = function(message, writer) {
+  var f = undefined;
+  f = message.getId();
+  if (parseInt(f, 10) !== 0) {
+    writer.writeInt64String(
+      1,
+      f
+    );
+  }
+  f = message.getDisplayName();
+  if (f.length > 0) {
+    writer.writeString(
+      2,
+      f
+    );
+  }
+  f = message.getProfile();
+  if (f != null) {
+    writer.writeMessage(
+      3,
+      f,
+      proto.acme.user.v1.Profile.serializeBinaryToWriter
+    );
+  }
+  f = message.getTagsList();
+  if (f.length > 0) {
+    writer.writeRepeatedString(
+      4,
+      f
+    );
+  }
+  f = message.getAddressesList();
+  if (f.length > 0) {
+    writer.writeRepeatedMessage(
+      5,
+      f,
+      proto.acme.user.v1.Address.serializeBinaryToWriter
+    );
+  }
+  f = message.getLabelsMap(true);
+  if (f && f.getLength() > 0) {
+    f.serializeBinary(6, writer, jspb.BinaryWriter.prototype.writeString, jspb.BinaryWriter.prototype.writeString);
+  }
+  f = message.getActive();
+  if (f) {
+    writer.writeBool(
+      7,
+      f
+    );
+  }
+  f = message.getScore();
+  if (f !== 0.0) {
+    writer.writeDouble(
+      8,
+      f
+    );
+  }
+  f = message.getScoresList();
+  if (f.length > 0) {
+    writer.writePackedFloat(
+      9,
+      f
+    );
+  }
+  f = /** @type {string} */ (jspb.Message.getField(message, 10));
+  if (f != null) {
+    writer.writeString(
+      10,
+      f
+    );
+  }
+  f = /** @type {string} */ (jspb.Message.getField(message, 11));
+  if (f != null) {
+    writer.writeString(
+      11,
+      f
+    );
+  }
+  f = message.getAvatar_asU8();
+  if (f.length > 0) {
+    writer.writeBytes(
+      12,
+      f
+    );
+  }
+  f = message.getRole();
+  if (f !== 0.0) {
+    writer.writeEnum(
+      13,
+      f
+    );
+  }
+};
+
+proto.acme.user.v1.User.prototype.getId = function() {
+  return /** @type {string} */ (jspb.Message.getFieldWithDefault(this, 1, "0"));
+};
+proto.acme.user.v1.User.prototype.setId = function(value) {
+  return jspb.Message.setProto3StringIntField(this, 1, value);
+};
+proto.acme.user.v1.User.prototype.getDisplayName = function() {
+  return /** @type {string} */ (jspb.Message.getFieldWithDefault(this, 2, ""));
+};
+proto.acme.user.v1.User.prototype.setDisplayName = function(value) {
+  return jspb.Message.setProto3StringField(this, 2, value);
+};
+proto.acme.user.v1.User.prototype.getProfile = function() {
+  return /** @type{?proto.acme.user.v1.Profile} */ (
+    jspb.Message.getWrapperField(this, proto.acme.user.v1.Profile, 3));
+};
+proto.acme.user.v1.User.prototype.setProfile = function(value) {
+  return jspb.Message.setWrapperField(this, 3, value);
+};
+proto.acme.user.v1.User.prototype.clearProfile = function() {
+  return this.setProfile(undefined);
+};
+proto.acme.user.v1.User.prototype.getTagsList = function() {
+  return /** @type {!Array<string>} */ (jspb.Message.getRepeatedField(this, 4));
+};
+proto.acme.user.v1.User.prototype.setTagsList = function(value) {
+  return jspb.Message.setField(this, 4, value || []);
+};
+proto.acme.user.v1.User.prototype.addTags = function(value, opt_index) {
+  return jspb.Message.addToRepeatedField(this, 4, value, opt_index);
+};
+proto.acme.user.v1.User.prototype.getAddressesList = function() {
+  return /** @type{!Array<!proto.acme.user.v1.Address>} */ (
+    jspb.Message.getRepeatedWrapperField(this, proto.acme.user.v1.Address, 5));
+};
+proto.acme.user.v1.User.prototype.setAddressesList = function(value) {
+  return jspb.Message.setRepeatedWrapperField(this, 5, value);
+};
+proto.acme.user.v1.User.prototype.getLabelsMap = function(opt_noLazyCreate) {
+  return /** @type {!jspb.Map<string,string>} */ (
+      jspb.Message.getMapField(this, 6, opt_noLazyCreate,
+      null));
+};
+proto.acme.user.v1.User.prototype.clearLabelsMap = function() {
+  this.getLabelsMap().clear();
+  return this;
+};
+proto.acme.user.v1.User.prototype.getActive = function() {
+  return /** @type {boolean} */ (jspb.Message.getBooleanFieldWithDefault(this, 7, false));
+};
+proto.acme.user.v1.User.prototype.setActive = function(value) {
+  return jspb.Message.setProto3BooleanField(this, 7, value);
+};
+proto.acme.user.v1.User.prototype.getScore = function() {
+  return /** @type {number} */ (jspb.Message.getFloatingPointFieldWithDefault(this, 8, 0.0));
+};
+proto.acme.user.v1.User.prototype.setScore = function(value) {
+  return jspb.Message.setProto3FloatField(this, 8, value);
+};
+proto.acme.user.v1.User.prototype.getScoresList = function() {
+  return /** @type {!Array<number>} */ (jspb.Message.getRepeatedFloatingPointField(this, 9));
+};
+proto.acme.user.v1.User.prototype.setScoresList = function(value) {
+  return jspb.Message.setField(this, 9, value || []);
+};
+proto.acme.user.v1.User.prototype.getEmail = function() {
+  return /** @type {string} */ (jspb.Message.getFieldWithDefault(this, 10, ""));
+};
+proto.acme.user.v1.User.prototype.setEmail = function(value) {
+  return jspb.Message.setOneofField(this, 10, proto.acme.user.v1.User.oneofGroups_[0], value);
+};
+proto.acme.user.v1.User.prototype.getPhone = function() {
+  return /** @type {string} */ (jspb.Message.getFieldWithDefault(this, 11, ""));
+};
+proto.acme.user.v1.User.prototype.setPhone = function(value) {
+  return jspb.Message.setOneofField(this, 11, proto.acme.user.v1.User.oneofGroups_[0], value);
+};
+proto.acme.user.v1.User.prototype.getAvatar = function() {
+  return /** @type {!(string|Uint8Array)} */ (jspb.Message.getFieldWithDefault(this, 12, ""));
+};
+proto.acme.user.v1.User.prototype.getAvatar_asB64 = function() {
+  return /** @type {string} */ (jspb.Message.bytesAsB64(
+      this.getAvatar()));
+};
+proto.acme.user.v1.User.prototype.setAvatar = function(value) {
+  return jspb.Message.setProto3BytesField(this, 12, value);
+};
+proto.acme.user.v1.User.prototype.getRole = function() {
+  return /** @type {!proto.acme.user.v1.Role} */ (jspb.Message.getFieldWithDefault(this, 13, 0));
+};
+proto.acme.user.v1.User.prototype.setRole = function(value) {
+  return jspb.Message.setProto3EnumField(this, 13, value);
+};
+
+proto.acme.user.v1.Empty = function(opt_data) {
+  jspb.Message.initialize(this, opt_data, 0, -1, null, null);
+};
+proto.acme.user.v1.Empty.toObject = function(includeInstance, msg) {
+  var f, obj = {
+
+  };
+  return obj;
+};
+proto.acme.user.v1.Empty.serializeBinaryToWriter = function(message, writer) {
+  var f = undefined;
+};
+
+proto.acme.user.v1.GetUserRequest.prototype.getUserId = function() {
+  var tpl = `user/${this.x + `${"}"}`}`;  // template with nested braces
+  var re = /[}{]+/g;
+  return /** @type {string} */ (jspb.Message.getFieldWithDefault(this, 1, ""));
+};
+proto.acme.user.v1.GetUserRequest.prototype.setUserId = function(value) {
+  return jspb.Message.setProto3StringField(this, 1, value);
+};
+goog.object.extend(exports, proto.acme.user.v1);
+
+},
+function(module, exports, require) {
+/**
+ * @fileoverview gRPC-Web generated client stub for acme.user.v1
+ * @enhanceable
+ * @public
+ */
+
+// GENERATED CODE -- DO NOT EDIT!
+
+/* eslint-disable */
+// @ts-nocheck
+
+const grpc = {};
+grpc.web = require('grpc-web');
+
+const proto = {};
+proto.acme = {};
+proto.acme.user = {};
+proto.acme.user.v1 = require('./user_pb.js');
+
+/**
+ * @param {string} hostname
+ * @param {?Object} credentials
+ * @param {?grpc.web.ClientOptions} options
+ * @constructor
+ * @struct
+ * @final
+ */
+proto.acme.user.v1.UserServiceClient =
+    function(hostname, credentials, options) {
+  if (!options) options = {};
+  options.format = 'binary';
+
+  /**
+   * @private @const {!grpc.web.GrpcWebClientBase} The client
+   */
+  this.client_ = new grpc.web.GrpcWebClientBase(options);
+
+  /**
+   * @private @const {string} The hostname
+   */
+  this.hostname_ = hostname.replace(/\/+$/, '');
+
+};
+
+
+/**
+ * @const
+ * @type {!grpc.web.MethodDescriptor<
+ *   !proto.acme.user.v1.GetUserRequest,
+ *   !proto.acme.user.v1.User>}
+ */
+const methodDescriptor_UserService_GetUser = new grpc.web.MethodDescriptor(
+  "/acme.user.v1.UserService/GetUser",
+  grpc.web.MethodType.UNARY,
+  proto.acme.user.v1.GetUserRequest,
+  proto.acme.user.v1.User,
+  /**
+   * @param {!proto.acme.user.v1.GetUserRequest} request
+   * @return {!Uint8Array}
+   */
+  function(request) {
+    return request.serializeBinary();
+  },
+  proto.acme.user.v1.User.deserializeBinary
+);
+
+
+/**
+ * @param {!proto.acme.user.v1.GetUserRequest} request The
+ *     request proto
+ * @param {?Object<string, string>} metadata User defined
+ *     call metadata
+ * @param {function(?grpc.web.RpcError, ?proto.acme.user.v1.User)}
+ *     callback The callback function(error, response)
+ * @return {!grpc.web.ClientReadableStream<!proto.acme.user.v1.User>|undefined}
+ *     The XHR Node Readable Stream
+ */
+proto.acme.user.v1.UserServiceClient.prototype.getUser =
+    function(request, metadata, callback) {
+  return this.client_.rpcCall(this.hostname_ +
+      "/acme.user.v1.UserService/GetUser",
+      request,
+      metadata || {},
+      methodDescriptor_UserService_GetUser,
+      callback);
+};
+
+
+/**
+ * @const
+ * @type {!grpc.web.MethodDescriptor<
+ *   !proto.acme.user.v1.Empty,
+ *   !proto.acme.user.v1.User>}
+ */
+const methodDescriptor_UserService_WatchUsers = new grpc.web.MethodDescriptor(
+  "/acme.user.v1.UserService/WatchUsers",
+  grpc.web.MethodType.SERVER_STREAMING,
+  proto.acme.user.v1.Empty,
+  proto.acme.user.v1.User,
+  function(request) {
+    return request.serializeBinary();
+  },
+  proto.acme.user.v1.User.deserializeBinary
+);
+
+
+proto.acme.user.v1.UserServiceClient.prototype.watchUsers =
+    function(request, metadata) {
+  return this.client_.serverStreaming(this.hostname_ +
+      '/acme.user.v1.UserService/WatchUsers',
+      request,
+      metadata || {},
+      methodDescriptor_UserService_WatchUsers);
+};
+
+
+/**
+ * @const
+ * @type {!grpc.web.MethodDescriptor<
+ *   !proto.acme.user.v1.User,
+ *   !proto.acme.user.v1.Empty>}
+ */
+const methodDescriptor_UserService_UpdateUser = new grpc.web.MethodDescriptor(
+  "/acme.user.v1.UserService/UpdateUser",
+  grpc.web.MethodType.UNARY,
+  proto.acme.user.v1.User,
+  proto.acme.user.v1.Empty,
+  function(request) {
+    return request.serializeBinary();
+  },
+  proto.acme.user.v1.Empty.deserializeBinary
+);
+
+
+module.exports = proto.acme.user.v1;
+
+
+}]);
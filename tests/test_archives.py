@@ -0,0 +1,34 @@
+"""归档作为虚拟目录扫描时，结果应与扫描解压后的目录相同"""
+import os
+import zipfile
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'minified', 'user_pb.js')
+
+
+def scan(scanner, path):
+    result = scanner.process_directory(path, print_results=False, max_workers=4, executor='process',
+                                       options=scanner.ScanOptions(beautify=False))
+    return {file.file_path.replace(path, '').split('!')[-1].lstrip(os.sep + '/'): (file.error, file.messages)
+            for file in result.files}
+
+
+def test_zip_members_match_unpacked_scan_with_process_executor(scanner, tmp_path):
+    # fork出的工作进程不能共用父进程打开的ZipFile（共享文件偏移会读出错误的数据）
+    with open(FIXTURE, encoding='utf-8') as f:
+        content = f.read()
+    unpacked = tmp_path / 'unpacked' / 'static'
+    unpacked.mkdir(parents=True)
+    archive_dir = tmp_path / 'archive'
+    archive_dir.mkdir()
+    with zipfile.ZipFile(archive_dir / 'app.zip', 'w', zipfile.ZIP_DEFLATED) as archive:
+        for i in range(120):
+            member = content.replace('acme.user', f'acme.user{i}')
+            (unpacked / f'm{i}.js').write_text(member, encoding='utf-8')
+            archive.writestr(f'static/m{i}.js', member)
+    # 遍历线程先在父进程中打开归档，再fork工作进程
+    scanner.open_zip_archive(str(archive_dir / 'app.zip'))
+
+    expected = scan(scanner, str(tmp_path / 'unpacked'))
+    assert len(expected) == 120
+    assert all(error is None and messages for error, messages in expected.values())
+    assert scan(scanner, str(archive_dir)) == expected
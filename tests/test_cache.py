@@ -0,0 +1,13 @@
+TS_SOURCE = 'export interface HelloRequest {\n  name: string;\n}\n'
+
+
+def test_ts_cache_key_includes_pattern_digest(scanner, tmp_path):
+    # --patterns可以扩展ts_*规则表，规则文件变化后不能命中旧结果
+    ts_file = tmp_path / 'api.ts'
+    ts_file.write_text(TS_SOURCE, encoding='utf-8')
+    cache = scanner.ResultCache(str(tmp_path / 'cache'))
+
+    first = scanner.scan_single_file(str(ts_file), False, cache, scanner.ScanOptions(extension_digest='a'))
+    same = scanner.scan_single_file(str(ts_file), False, cache, scanner.ScanOptions(extension_digest='a'))
+    changed = scanner.scan_single_file(str(ts_file), False, cache, scanner.ScanOptions(extension_digest='b'))
+    assert (first.cache_hit, same.cache_hit, changed.cache_hit) == (False, True, False)
@@ -0,0 +1,44 @@
+"""--no-beautify在压缩代码上的提取结果应与beautify之后相同（差分测试）
+
+fixtures/minified中每个 *.min.js 是同名可读文件去掉空白、缩短标识符后的版本。
+"""
+import glob
+import os
+
+import pytest
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'minified')
+MINIFIED = sorted(glob.glob(os.path.join(FIXTURES, '*.min.js')))
+
+
+def extract(scanner, path, beautify):
+    with open(path, encoding='utf-8') as f:
+        content = f.read()
+    result = scanner.scan_js_content(content, path, scanner.ScanOptions(beautify=beautify))
+    return result.endpoints, result.messages
+
+
+@pytest.mark.parametrize('path', MINIFIED, ids=os.path.basename)
+def test_no_beautify_matches_beautified(scanner, path):
+    endpoints, messages = extract(scanner, path, beautify=False)
+    assert endpoints or messages
+    assert (endpoints, messages) == extract(scanner, path, beautify=True)
+
+
+@pytest.mark.parametrize('path', MINIFIED, ids=os.path.basename)
+def test_minified_matches_readable_source(scanner, path):
+    # 去掉空白和缩短参数名不影响提取结果
+    readable = path[:-len('.min.js')] + '.js'
+    assert extract(scanner, path, beautify=False) == extract(scanner, readable, beautify=False)
+
+
+def test_beautify_failure_is_a_file_error(scanner, monkeypatch, tmp_path):
+    # beautify失败不能以SystemExit终止整个扫描，应记录为该文件的错误
+    def fail(content):
+        raise RuntimeError('unbalanced braces')
+
+    monkeypatch.setattr(scanner.jsbeautifier, 'beautify', fail)
+    path = tmp_path / 'bad.js'
+    path.write_text('proto.a.B.prototype.setC = function(value) { return jspb.Message.setField(this, 1, value); };')
+    result = scanner.process_single_file(str(path), print_results=False, options=scanner.ScanOptions())
+    assert result.error and 'unbalanced braces' in result.error
@@ -0,0 +1,18 @@
+import time
+
+import pytest
+
+# 函数体中没有set调用的setter：旧规则会从每个定义扫描到行尾，耗时与行长成平方关系
+NO_CALL = 'proto.a.M{0}.prototype.setF = function(v){{this.f=v;}};'
+SETTER = 'proto.a.N{0}.prototype.setId = function(v){{return jspb.Message.setProto3IntField(this, 1, v);}};'
+
+
+@pytest.mark.parametrize('minified', [False, True])
+def test_setter_patterns_are_linear_on_one_long_line(scanner, minified):
+    line = SETTER.format(0) + ''.join(NO_CALL.format(i) for i in range(4000))
+    assert len(line) > 200 * 1024
+    start = time.perf_counter()
+    messages = scanner.extract_messages(line, minified=minified)
+    # 平方级的规则在这个长度上需要数十秒
+    assert time.perf_counter() - start < 2
+    assert messages == {'a.N0': [['Id', 'Proto3IntField', '1']]}
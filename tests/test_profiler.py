@@ -0,0 +1,22 @@
+import glob
+import pstats
+
+
+def test_cprofile_covers_thread_pool_workers(scanner, tmp_path, monkeypatch, capsys):
+    js_file = tmp_path / 'api_pb.js'
+    js_file.write_text('proto.acme.User.prototype.setName=function(e){'
+                       'return s.Message.setProto3StringField(this,1,e)};\n', encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+
+    profiler = scanner.CodeProfiler('cprofile')
+    profiler.start()
+    results = list(scanner.iter_file_results([str(js_file)], max_workers=2, executor='thread',
+                                             options=scanner.ScanOptions(beautify=False)))
+    profiler.stop()
+    profiler.report()
+    capsys.readouterr()
+
+    assert results and results[0][2] is None
+    stats = pstats.Stats(glob.glob(str(tmp_path / 'grpc_cprofile_*.prof'))[0])
+    functions = {name for _, _, name in stats.stats}
+    assert 'scan_single_file' in functions
@@ -0,0 +1,91 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_global_index_keeps_unnumbered_fields_and_all_services(scanner, tmp_path):
+    index = scanner.GlobalIndex()
+    index.write(scanner.FileResult(
+        file_path='api.ts',
+        endpoints=['/pkg.UserService/GetUser', '/pkg.UserService/ListUsers', '/pkg.AdminService/Ban'],
+        # TS接口字段没有字段编号，都记为'0'
+        messages={'UserRequest': [['userId', 'string', '0'], ['pageSize', 'number', '0'],
+                                  ['verbose', 'boolean', '0']]},
+    ))
+    index.write_protos(str(tmp_path))
+
+    default = (tmp_path / 'default.proto').read_text(encoding='utf-8')
+    for line in ('string userid = 0;', 'double pagesize = 0;', 'bool verbose = 0;'):
+        assert line in default
+    fields = json.loads((tmp_path / 'index.json').read_text(encoding='utf-8'))['messages']['UserRequest']['fields']
+    assert [field[0] for field in fields] == ['userId', 'pageSize', 'verbose']
+
+    pkg = (tmp_path / 'pkg.proto').read_text(encoding='utf-8')
+    assert 'service UserService {' in pkg and 'service AdminService {' in pkg
+    for method in ('GetUser', 'ListUsers', 'Ban'):
+        assert f'rpc {method} ({method}Request) returns ({method}Response)' in pkg
+
+
+DEMO_PROTO = '''syntax = "proto3";
+package demo.v1;
+
+message Outer {
+  message Inner { int64 id = 1; }
+  enum Kind { KIND_UNSPECIFIED = 0; KIND_A = 1; }
+  Inner inner = 1;
+  repeated string tags = 2;
+  map<string, Inner> m = 3;
+  oneof choice {
+    string a = 4;
+    Inner b = 5;
+  }
+  Kind c = 8;
+  repeated .demo.v1.Outer.Inner items = 9;
+  sint64 delta = 10;
+}
+
+message GetRequest { string name = 1; }
+
+service Store {
+  rpc Get (GetRequest) returns (Outer);
+  rpc Watch (GetRequest) returns (stream Outer) {}
+}
+'''
+
+
+def test_proto_input_round_trips_through_proto_dir(scanner, tmp_path):
+    # .proto输入的原生类型、repeated/map/oneof结构和rpc的请求/响应类型都应原样写出
+    (tmp_path / 'demo.proto').write_text(DEMO_PROTO, encoding='utf-8')
+    out = tmp_path / 'protos'
+    subprocess.run([sys.executable, os.path.join(ROOT, 'gRPC-Web-scan.py'), '--file', 'demo.proto',
+                    '--proto-dir', str(out)], cwd=tmp_path, check=True, capture_output=True)
+
+    merged = scanner.parse_proto_content((out / 'demo.v1.proto').read_text(encoding='utf-8'))
+    assert merged.package == 'demo.v1'
+    messages = {message['name']: message['fields'] for message in merged.messages}
+    outer = {f['name']: (f['label'], f['type'], f['number'], f.get('oneof')) for f in messages['Outer']}
+    assert outer == {
+        'inner': ('optional', 'Inner', '1', None),
+        'tags': ('repeated', 'string', '2', None),
+        'm': ('optional', 'map<string, Inner>', '3', None),
+        'a': ('optional', 'string', '4', 'choice'),
+        'b': ('optional', 'Inner', '5', 'choice'),
+        'c': ('optional', 'int32', '8', None),  # 枚举按线上编码相同的int32输出
+        'items': ('repeated', 'Inner', '9', None),
+        'delta': ('optional', 'sint64', '10', None),
+    }
+    assert set(messages) == {'Outer', 'Inner', 'GetRequest'}
+    methods = {method['name']: method for method in merged.services[0]['methods']}
+    assert (methods['Get']['input_type'], methods['Get']['output_type']) == ('GetRequest', 'Outer')
+    assert methods['Watch']['server_streaming'] and not methods['Watch']['client_streaming']
+
+    if shutil.which('protoc') is None:
+        pytest.skip('protoc is not installed')
+    subprocess.run(['protoc', f'--proto_path={out}', '--descriptor_set_out=' + os.devnull, 'demo.v1.proto'],
+                   check=True, capture_output=True)
@@ -0,0 +1,13 @@
+PAYLOAD = '"<img src=x onerror=alert(1)>"'
+
+
+def test_example_data_is_escaped(scanner):
+    # 字段编号由setter规则从被扫描的JS中捕获，报告中不能出现可执行的标签
+    content = ('proto.acme.User.prototype.setName = function(value) {\n'
+               f'  return jspb.Message.setProto3StringField(this, {PAYLOAD}, value);\n'
+               '};\n')
+    result = scanner.scan_js_content(content, 'evil.js', scanner.ScanOptions())
+    assert result.messages
+    section = scanner.render_file_section(result)
+    assert '<img' not in section
+    assert '&lt;img src=x onerror=alert(1)&gt;' in section
@@ -0,0 +1,39 @@
+import inspect
+import threading
+
+
+def test_size_order_warmup_stops_at_buffered_bytes(scanner):
+    # 归档成员的内容超过max_bytes时遍历线程阻塞，第一批不能一直等到缓冲区有maxsize个条目
+    items = [(f'app.tar!/m{i}.js', 10, b'x' * 10) for i in range(4)]
+    source = scanner.FileSource(items, order='size', max_bytes=25)
+    paths = []
+
+    def consume():
+        for batch in iter(lambda: source.get_batch(1), []):
+            paths.extend(path for path, _ in batch)
+
+    worker = threading.Thread(target=consume, daemon=True)
+    worker.start()
+    worker.join(timeout=10)
+    assert not worker.is_alive()
+    assert sorted(paths) == [item[0] for item in items]
+
+
+def test_default_schedule_dispatches_before_walk_finishes(scanner):
+    # 默认调度边遍历边派发：遍历还没结束时第一个文件就能取出
+    walking = threading.Event()
+
+    def walk():
+        yield 'first.js'
+        walking.wait(10)
+        yield 'second.js'
+
+    for func in (scanner.process_directory, scanner.process_files):
+        order = inspect.signature(func).parameters['schedule'].default
+        assert order == 'walk'
+    source = scanner.FileSource(walk(), order=order)
+    try:
+        assert source.get_batch(1) == [('first.js', None)]
+        assert not source.finished
+    finally:
+        walking.set()
@@ -0,0 +1,22 @@
+import zipfile
+
+import pytest
+
+BUNDLE = ('proto.acme.User.prototype.setName=function(e){return s.Message.setProto3StringField(this,1,e)};\n'
+          '//# sourceMappingURL=main.js.map\n')
+
+
+@pytest.mark.parametrize('use_cache', [False, True])
+def test_missing_map_member_falls_back_to_bundle(scanner, tmp_path, use_cache):
+    # 发布产物常删掉.map而保留sourceMappingURL注释
+    archive = tmp_path / 'app.zip'
+    with zipfile.ZipFile(archive, 'w') as zf:
+        zf.writestr('static/main.js', BUNDLE)
+    file_path = f'{archive}!/static/main.js'
+    assert scanner.locate_source_map(file_path) is None
+
+    cache = scanner.ResultCache(str(tmp_path / 'cache')) if use_cache else None
+    options = scanner.ScanOptions(beautify=False, source_maps=True)
+    result = scanner.scan_single_file(file_path, False, cache, options)
+    assert result.error is None
+    assert 'acme.User' in result.messages
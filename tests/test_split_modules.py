@@ -0,0 +1,23 @@
+"""--split-modules只处理含gRPC特征的模块，提取结果应与处理整个bundle相同"""
+import glob
+import os
+
+import pytest
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), 'fixtures', 'webpack', '*.js')))
+COMPARED = ('endpoints', 'messages', 'services', 'metadata', 'error_handlers', 'interceptors', 'wire_types')
+
+
+@pytest.mark.parametrize('path', FIXTURES, ids=os.path.basename)
+@pytest.mark.parametrize('beautify', [True, False])
+def test_split_modules_matches_whole_bundle(scanner, path, beautify):
+    with open(path, encoding='utf-8') as f:
+        content = f.read()
+    whole = scanner.scan_js_content(content, path, scanner.ScanOptions(beautify=beautify))
+    split = scanner.scan_js_content(content, path, scanner.ScanOptions(beautify=beautify, split_modules=True))
+    assert whole.messages
+    for name in COMPARED:
+        assert getattr(split, name) == getattr(whole, name), name
+    # 只有两个生成代码模块被处理，工具函数模块被跳过
+    assert len(split.modules) == 2
+    assert any(messages for messages in split.modules.values())
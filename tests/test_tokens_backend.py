@@ -0,0 +1,58 @@
+"""tokens后端（JspbIndex）与正则后端在protoc-gen-js生成代码上的提取结果应一致"""
+import os
+
+import pytest
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'minified')
+READABLE = os.path.join(FIXTURES, 'user_pb.js')
+
+
+def scan_messages(scanner, path, backend, beautify=True):
+    with open(path, encoding='utf-8') as f:
+        content = f.read()
+    return scanner.scan_js_content(content, path, scanner.ScanOptions(beautify=beautify, backend=backend)).messages
+
+
+def by_number(fields):
+    return {number: (name, field_type) for name, field_type, number in fields}
+
+
+def test_tokens_backend_agrees_with_regex_backend(scanner):
+    regex = scan_messages(scanner, READABLE, 'regex')
+    tokens = scan_messages(scanner, READABLE, 'tokens')
+    assert set(regex) <= set(tokens)
+    for message, fields in regex.items():
+        # 正则后端找到的每个字段，tokens后端给出相同的字段名和编号
+        token_fields = by_number(tokens[message])
+        for number, (name, _) in by_number(fields).items():
+            assert token_fields[number][0] == name
+    # setter类型已经确定proto类型的字段，两个后端的proto类型相同
+    # （setProto3FloatField同时用于float和double、setField用于repeated，这些字段tokens后端按writer方法细分）
+    regex_user = by_number(regex['acme.user.v1.User'])
+    token_user = by_number(tokens['acme.user.v1.User'])
+    for number in ('2', '7', '12', '13'):
+        assert scanner.convert_field_type_to_proto(token_user[number][1]) == \
+            scanner.convert_field_type_to_proto(regex_user[number][1])
+
+
+def test_tokens_backend_field_types(scanner):
+    user = by_number(scan_messages(scanner, READABLE, 'tokens')['acme.user.v1.User'])
+    assert user['1'] == ('Id', 'Proto3Int64Field')  # writeInt64String，setter为Proto3StringIntField
+    assert user['4'] == ('TagsList', 'Repeated<Proto3StringField>')  # repeated
+    assert user['5'] == ('AddressesList', 'RepeatedWrapperField')
+    assert user['6'] == ('LabelsMap', 'MapField')  # map字段没有setter，正则后端找不到
+    assert user['9'] == ('ScoresList', 'Repeated<Proto3FloatField>')  # packed
+    assert user['10'] == ('Email', 'Proto3StringField')  # oneof
+    assert user['11'] == ('Phone', 'Proto3StringField')
+    assert user['12'] == ('Avatar', 'Proto3BytesField')  # bytes
+    assert user['13'] == ('Role', 'Proto3EnumField')  # enum
+    regex = by_number(scan_messages(scanner, READABLE, 'regex')['acme.user.v1.User'])
+    assert '6' not in regex
+
+
+@pytest.mark.parametrize('beautify', [True, False])
+def test_tokens_backend_ignores_formatting(scanner, beautify):
+    # 不依赖beautify：压缩前后、beautify与否结果都相同
+    expected = scan_messages(scanner, READABLE, 'tokens')
+    assert scan_messages(scanner, READABLE, 'tokens', beautify) == expected
+    assert scan_messages(scanner, os.path.join(FIXTURES, 'user_pb.min.js'), 'tokens', beautify) == expected
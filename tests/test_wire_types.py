@@ -0,0 +1,84 @@
+"""wire_types提取器：serializeBinaryToWriter/deserializeBinaryFromReader中的线上类型"""
+import os
+
+import pytest
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'minified')
+
+READER_ONLY = '''
+proto.shop.Order.deserializeBinaryFromReader = function(msg, reader) {
+  while (reader.nextField()) {
+    var field = reader.getFieldNumber();
+    switch (field) {
+    case 1:
+      var value = /** @type {string} */ (reader.readUint64String());
+      msg.setId(value);
+      break;
+    case 2:
+      var values = /** @type {!Array<number>} */ (reader.isDelimited() ? reader.readPackedSint32() : [reader.readSint32()]);
+      for (var i = 0; i < values.length; i++) {
+        msg.addQuantities(values[i]);
+      }
+      break;
+    case 3:
+      var value = /** @type {string} */ (reader.readString());
+      msg.addNotes(value);
+      break;
+    case 4:
+      var value = msg.getItemsMap();
+      reader.readMessage(value, function(message, reader) {
+        jspb.Map.deserializeBinary(message, reader, jspb.BinaryReader.prototype.readString, jspb.BinaryReader.prototype.readMessage, proto.shop.Item.deserializeBinaryFromReader, "", new proto.shop.Item());
+         });
+      break;
+    default:
+      reader.skipField();
+      break;
+    }
+  }
+  return msg;
+};
+'''
+
+
+def read(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('name', ['user_pb.js', 'user_pb.min.js'])
+def test_writer_types(scanner, name):
+    user = scanner.extract_wire_types(read(name))['acme.user.v1.User']
+    assert user['1'] == ['int64', 'Id', '']  # writeInt64String
+    assert user['3'] == ['acme.user.v1.Profile', 'Profile', '']
+    assert user['4'] == ['repeated string', 'TagsList', '']
+    assert user['5'] == ['repeated acme.user.v1.Address', 'AddressesList', '']
+    assert user['6'] == ['map<string, string>', 'LabelsMap', '']
+    assert user['9'] == ['repeated float', 'ScoresList', '']  # writePackedFloat
+    assert user['10'][0::2] == user['11'][0::2] == ['string', 'contact']
+    assert user['12'] == ['bytes', 'Avatar', '']
+    assert user['13'] == ['enum', 'Role', '']
+
+
+def test_reader_supplements_fields_without_writer(scanner):
+    order = scanner.extract_wire_types(READER_ONLY)['shop.Order']
+    assert order == {
+        '1': ['uint64', 'Id', ''],
+        '2': ['repeated sint32', 'QuantitiesList', ''],
+        '3': ['repeated string', 'NotesList', ''],
+        '4': ['map<string, shop.Item>', 'ItemsMap', ''],
+    }
+
+
+def test_mmap_and_stream_match_in_memory_scan(scanner):
+    path = os.path.join(FIXTURES, 'user_pb.js')
+    expected = scanner.extract_wire_types(read('user_pb.js'))
+    for options in (scanner.ScanOptions(mmap=True), scanner.ScanOptions(stream=True)):
+        result = scanner.process_single_file(path, print_results=False, options=options)
+        assert result.wire_types == expected
+
+
+def test_enum_is_written_as_int32(scanner):
+    wire_types = scanner.extract_wire_types(read('user_pb.js'))
+    proto = scanner.generate_proto_content({}, wire_types=wire_types)
+    assert 'int32 role = 13;' in proto
+    assert 'map<string, string> labelsmap = 6;' in proto